@@ -0,0 +1,377 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/git_benchmarks.py
+
+This file declares the GitBenchmarks class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+from pythoneda.shared.git import (
+    GitAdd,
+    GitCheckAttr,
+    GitCommit,
+    GitDiff,
+    GitRepo,
+    GitRepoRegistry,
+    GitTag,
+    GitTagIndex,
+)
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_repo import SyntheticRepo  # noqa: E402
+
+
+class GitBenchmarks:
+    """
+    Times git operations against synthetic repositories of several sizes.
+
+    Usage:
+        python benchmarks/git_benchmarks.py --profile small --output results.json
+        python benchmarks/git_benchmarks.py --profile small --baseline results.json
+
+    Class name: GitBenchmarks
+
+    Responsibilities:
+        - Generates (or reuses) a repository per profile.
+        - Times each benchmarked operation several times.
+        - Saves the timings as JSON, and compares them against a baseline.
+
+    Collaborators:
+        - SyntheticRepo: The benchmarked repositories.
+    """
+
+    PROFILES = {
+        "small": {"tags": 10, "files": 1000, "commits": 10},
+        "medium": {"tags": 1000, "files": 10000, "commits": 10000},
+        "large": {"tags": 10000, "files": 100000, "commits": 100000},
+        "huge": {"tags": 100000, "files": 1000000, "commits": 1000000},
+    }
+
+    COLD_CASES = ["GitTag.latest_tag (cold)"]
+
+    WARM_CASES = ["GitTag.latest_tag (warm)"]
+
+    THRESHOLD = 0.25
+
+    NOISE_FLOOR = 0.005
+
+    def __init__(self, workdir: str, repeat: int = 5):
+        """
+        Creates a new GitBenchmarks instance.
+        :param workdir: The folder to generate the repositories in.
+        :type workdir: str
+        :param repeat: The number of timed runs of each operation.
+        :type repeat: int
+        """
+        self._workdir = workdir
+        self._repeat = repeat
+
+    def cases(self) -> Dict[str, Callable]:
+        """
+        Retrieves the benchmarked operations.
+        :return: A function per case name, receiving the repository folder and
+          the run index, and returning the value or awaitable to time.
+        :rtype: Dict[str, Callable]
+        """
+        return {
+            "GitTag.latest_tag (cold)": lambda folder, run: GitTag(folder).latest_tag(),
+            "GitTag.latest_tag (warm)": lambda folder, run: GitTag(folder).latest_tag(),
+            "GitTag.current_tag": lambda folder, run: GitTag(folder).current_tag(),
+            "GitCommit.latest_commit": lambda folder, run: GitCommit(
+                folder
+            ).latest_commit(),
+            "GitDiff.diff": lambda folder, run: GitDiff(folder).diff(),
+            "GitCheckAttr.check_attr": lambda folder, run: GitCheckAttr(
+                folder
+            ).check_attr("diff", SyntheticRepo.path(run)),
+            "GitAdd.add": lambda folder, run: GitAdd(folder).add(
+                SyntheticRepo.path(run)
+            ),
+            "GitRepo.from_folder": lambda folder, run: GitRepo.from_folder(folder),
+            "GitRepo.remote_urls": lambda folder, run: GitRepo.remote_urls(folder),
+        }
+
+    @staticmethod
+    def _prepare(folder: str, runs: int):
+        """
+        Modifies the files the runs use, so diff and add have work to do.
+        :param folder: The repository folder.
+        :type folder: str
+        :param runs: The number of runs.
+        :type runs: int
+        """
+        for index in range(runs):
+            path = os.path.join(folder, SyntheticRepo.path(index))
+            if os.path.exists(path):
+                with open(path, "a") as file:
+                    file.write(f"benchmark change {time.time()}\n")
+
+    @staticmethod
+    def _restore(folder: str):
+        """
+        Undoes the changes made by a benchmark.
+        :param folder: The repository folder.
+        :type folder: str
+        """
+        subprocess.run(["git", "reset", "-q", "--hard", "HEAD"], cwd=folder, check=True)
+
+    @staticmethod
+    def _forget_tag_indexes():
+        """
+        Drops the tag indexes, both in memory and persisted.
+        """
+        with GitTagIndex._lock:
+            GitTagIndex._indexes.clear()
+        shutil.rmtree(GitTagIndex.default_folder(), ignore_errors=True)
+
+    def time_case(
+        self, folder: str, case: Callable, cold: bool = False, warm: bool = False
+    ) -> Dict[str, float]:
+        """
+        Times an operation.
+        :param folder: The repository folder.
+        :type folder: str
+        :param case: The operation, as returned by cases().
+        :type case: Callable
+        :param cold: Whether each run starts without tag indexes.
+        :type cold: bool
+        :param warm: Whether to run the operation once, untimed, beforehand.
+        :type warm: bool
+        :return: The minimum, median, mean and maximum times, in seconds.
+        :rtype: Dict[str, float]
+        """
+        loop = asyncio.new_event_loop()
+        timings = []
+        try:
+            if warm:
+                outcome = case(folder, 0)
+                if asyncio.iscoroutine(outcome):
+                    loop.run_until_complete(outcome)
+            for run in range(self._repeat):
+                # each run starts without cached repository handles
+                GitRepoRegistry.instance().close_all()
+                if cold:
+                    self._forget_tag_indexes()
+                started = time.perf_counter()
+                outcome = case(folder, run)
+                if asyncio.iscoroutine(outcome):
+                    loop.run_until_complete(outcome)
+                timings.append(time.perf_counter() - started)
+        finally:
+            loop.close()
+
+        return {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+            "runs": len(timings),
+        }
+
+    def run(self, profiles: List[str], only: List[str] = None) -> Dict:
+        """
+        Runs the benchmarks.
+        :param profiles: The repository profiles.
+        :type profiles: List[str]
+        :param only: The cases to run, or None for all of them.
+        :type only: List[str]
+        :return: The results, per profile and case, and the environment.
+        :rtype: Dict
+        """
+        # the tag indexes persist under $XDG_CACHE_HOME; keep them out of the
+        # user's cache, and away from earlier runs
+        previous = os.environ.get("XDG_CACHE_HOME", None)
+        cache = tempfile.TemporaryDirectory(prefix="pythoneda-git-benchmarks-")
+        os.environ["XDG_CACHE_HOME"] = cache.name
+        try:
+            results = self._run(profiles, only)
+        finally:
+            if previous is None:
+                os.environ.pop("XDG_CACHE_HOME", None)
+            else:
+                os.environ["XDG_CACHE_HOME"] = previous
+            cache.cleanup()
+
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "git": subprocess.run(
+                    ["git", "--version"], capture_output=True, text=True
+                ).stdout.strip(),
+                "timestamp": time.time(),
+            },
+            "results": results,
+        }
+
+    def _run(self, profiles: List[str], only: List[str] = None) -> Dict:
+        """
+        Runs the benchmarks, with the cache folder already in place.
+        :param profiles: The repository profiles.
+        :type profiles: List[str]
+        :param only: The cases to run, or None for all of them.
+        :type only: List[str]
+        :return: The results, per profile and case.
+        :rtype: Dict
+        """
+        results = {}
+        for profile in profiles:
+            shape = self.__class__.PROFILES[profile]
+            repo = SyntheticRepo(os.path.join(self._workdir, profile), **shape)
+            started = time.perf_counter()
+            repo.generate()
+            print(
+                f"{profile}: {shape} ready in {time.perf_counter() - started:.1f}s",
+                file=sys.stderr,
+            )
+            results[profile] = {}
+            for name, case in self.cases().items():
+                if only and name not in only:
+                    continue
+                self._prepare(repo.folder, self._repeat)
+                try:
+                    results[profile][name] = self.time_case(
+                        repo.folder,
+                        case,
+                        cold=name in self.__class__.COLD_CASES,
+                        warm=name in self.__class__.WARM_CASES,
+                    )
+                except Exception as err:
+                    results[profile][name] = {"error": f"{type(err).__name__}: {err}"}
+                finally:
+                    self._restore(repo.folder)
+                print(f"  {name}: {results[profile][name]}", file=sys.stderr)
+
+        return results
+
+    @classmethod
+    def compare(
+        cls, results: Dict, baseline: Dict, threshold: float = None
+    ) -> List[str]:
+        """
+        Compares results against a baseline.
+        A case regresses when its median grows beyond the threshold, and by
+        more than the noise floor, or when it fails but did not before.
+        :param results: The results.
+        :type results: Dict
+        :param baseline: The baseline results.
+        :type baseline: Dict
+        :param threshold: The tolerated relative slowdown. Defaults to THRESHOLD.
+        :type threshold: float
+        :return: A description of each regression.
+        :rtype: List[str]
+        """
+        if threshold is None:
+            threshold = cls.THRESHOLD
+        regressions = []
+        for profile, cases in results["results"].items():
+            for name, current in cases.items():
+                previous = baseline["results"].get(profile, {}).get(name, None)
+                if previous is None or "error" in previous:
+                    continue
+                if "error" in current:
+                    regressions.append(f"{profile} {name}: {current['error']}")
+                    continue
+                before = previous["median"]
+                after = current["median"]
+                if (
+                    after > before * (1 + threshold)
+                    and after - before > cls.NOISE_FLOOR
+                ):
+                    regressions.append(
+                        f"{profile} {name}: median {before:.4f}s -> {after:.4f}s "
+                        f"(+{(after / before - 1) * 100:.0f}%)"
+                    )
+
+        return regressions
+
+    @classmethod
+    def main(cls, argv: List[str] = None) -> int:
+        """
+        Runs the benchmarks from the command line.
+        :param argv: The command-line arguments.
+        :type argv: List[str]
+        :return: 1 if any case regressed, 0 otherwise.
+        :rtype: int
+        """
+        parser = argparse.ArgumentParser(description=cls.__doc__.splitlines()[1])
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=sorted(cls.PROFILES),
+            help="Repository profile; can be repeated. Defaults to small.",
+        )
+        parser.add_argument(
+            "--case", action="append", help="Case to run; can be repeated."
+        )
+        parser.add_argument(
+            "--workdir",
+            default=os.path.join(tempfile.gettempdir(), "pythoneda-git-benchmarks"),
+            help="Where to generate (and reuse) the repositories.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="File to save the results to.")
+        parser.add_argument("--baseline", help="Results to compare against.")
+        parser.add_argument("--threshold", type=float, default=cls.THRESHOLD)
+        args = parser.parse_args(argv)
+
+        results = cls(args.workdir, args.repeat).run(
+            args.profile or ["small"], args.case
+        )
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+
+        result = 0
+        if args.baseline:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+            regressions = cls.compare(results, baseline, args.threshold)
+            for regression in regressions:
+                print(f"REGRESSION {regression}", file=sys.stderr)
+            if regressions:
+                result = 1
+
+        return result
+
+
+if __name__ == "__main__":
+    sys.exit(GitBenchmarks.main())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
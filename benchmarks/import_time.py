@@ -0,0 +1,147 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/import_time.py
+
+This file declares the ImportTimeBenchmark class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+
+class ImportTimeBenchmark:
+    """
+    Measures how long importing names from pythoneda.shared.git takes, in fresh
+    interpreters, and checks which heavy dependencies they drag in.
+
+    Usage:
+        python benchmarks/import_time.py
+
+    Class name: ImportTimeBenchmark
+
+    Responsibilities:
+        - Times importing each name in a new process.
+        - Fails if a name loads a dependency it must not.
+
+    Collaborators:
+        - None
+    """
+
+    # name -> dependencies importing it must not load
+    EXPECTATIONS = {
+        "Version": ["paramiko", "requests", "git"],
+        "GitRepo": ["paramiko", "requests"],
+        "GitTag": ["paramiko", "requests"],
+        "GitOperation": ["paramiko", "requests"],
+        "SshGitRepo": [],
+    }
+
+    PROBE = """
+import sys, time, json
+started = time.perf_counter()
+from pythoneda.shared.git import {name}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+    def __init__(self, repeat: int = 5):
+        """
+        Creates a new ImportTimeBenchmark instance.
+        :param repeat: The number of fresh interpreters per name.
+        :type repeat: int
+        """
+        self._repeat = repeat
+
+    def probe(self, name: str) -> Dict:
+        """
+        Imports given name in a fresh interpreter.
+        :param name: The name.
+        :type name: str
+        :return: The import time in seconds, and the loaded top-level modules.
+        :rtype: Dict
+        """
+        output = subprocess.run(
+            [sys.executable, "-c", self.__class__.PROBE.format(name=name)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        result["modules"] = {module.split(".")[0] for module in result["modules"]}
+
+        return result
+
+    def run(self) -> Dict:
+        """
+        Measures every name in EXPECTATIONS.
+        :return: Per name, the median import time, the forbidden modules it
+          loaded, and whether it passed.
+        :rtype: Dict
+        """
+        result = {}
+        for name, forbidden in self.__class__.EXPECTATIONS.items():
+            probes = [self.probe(name) for _ in range(self._repeat)]
+            loaded = sorted(set(forbidden) & probes[0]["modules"])
+            result[name] = {
+                "median": statistics.median(probe["seconds"] for probe in probes),
+                "loaded": loaded,
+                "passed": not loaded,
+            }
+
+        return result
+
+    @classmethod
+    def main(cls, argv: List[str] = None) -> int:
+        """
+        Runs the benchmark from the command line.
+        :param argv: The command-line arguments.
+        :type argv: List[str]
+        :return: 1 if any name loads a forbidden dependency, 0 otherwise.
+        :rtype: int
+        """
+        parser = argparse.ArgumentParser(description=cls.__doc__.splitlines()[1])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="File to save the results to.")
+        args = parser.parse_args(argv)
+
+        results = cls(args.repeat).run()
+        for name, outcome in results.items():
+            status = "ok" if outcome["passed"] else f"LOADS {outcome['loaded']}"
+            print(f"{name:14s} {outcome['median'] * 1000:8.1f} ms  {status}")
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+
+        return 0 if all(outcome["passed"] for outcome in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(ImportTimeBenchmark.main())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
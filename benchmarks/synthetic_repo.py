@@ -0,0 +1,219 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/synthetic_repo.py
+
+This file declares the SyntheticRepo class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import subprocess
+from typing import Dict, IO
+
+
+class SyntheticRepo:
+    """
+    A local git repository generated with a given number of tags, files and commits.
+
+    Class name: SyntheticRepo
+
+    Responsibilities:
+        - Generates the repository through "git fast-import", so even a million
+          commits take minutes rather than hours.
+        - Reuses a previously generated repository with the same shape.
+
+    Collaborators:
+        - GitBenchmarks: Times git operations against synthetic repositories.
+    """
+
+    MARKER = ".git/synthetic.json"
+
+    REMOTE = "https://github.com/pythoneda-shared-git/synthetic"
+
+    def __init__(self, folder: str, tags: int, files: int, commits: int):
+        """
+        Creates a new SyntheticRepo instance.
+        :param folder: The folder of the repository.
+        :type folder: str
+        :param tags: The number of tags.
+        :type tags: int
+        :param files: The number of files.
+        :type files: int
+        :param commits: The number of commits.
+        :type commits: int
+        """
+        self._folder = folder
+        self._tags = tags
+        self._files = max(files, 1)
+        self._commits = max(commits, 1)
+
+    @property
+    def folder(self) -> str:
+        """
+        Retrieves the folder of the repository.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    @property
+    def shape(self) -> Dict[str, int]:
+        """
+        Retrieves the shape of the repository.
+        :return: The number of tags, files and commits.
+        :rtype: Dict[str, int]
+        """
+        return {"tags": self._tags, "files": self._files, "commits": self._commits}
+
+    @staticmethod
+    def path(index: int) -> str:
+        """
+        Retrieves the path of the file with given index, a thousand files per folder.
+        :param index: The index.
+        :type index: int
+        :return: The path.
+        :rtype: str
+        """
+        return f"d{index // 1000:04d}/f{index:07d}.txt"
+
+    @staticmethod
+    def tag_name(index: int) -> str:
+        """
+        Retrieves the name of the tag with given index, an increasing semver.
+        :param index: The index.
+        :type index: int
+        :return: The name.
+        :rtype: str
+        """
+        return f"{index // 10000}.{(index // 100) % 100}.{index % 100}"
+
+    def is_generated(self) -> bool:
+        """
+        Checks whether the repository already exists with the same shape.
+        :return: True in such case.
+        :rtype: bool
+        """
+        result = False
+        marker = os.path.join(self._folder, self.__class__.MARKER)
+        if os.path.exists(marker):
+            with open(marker) as file:
+                result = json.load(file) == self.shape
+
+        return result
+
+    def generate(self):
+        """
+        Generates the repository, unless it already exists with the same shape.
+        """
+        if self.is_generated():
+            return
+        if os.path.exists(self._folder):
+            subprocess.run(["rm", "-rf", self._folder], check=True)
+        os.makedirs(self._folder)
+        self._git("init", "-q", "-b", "main")
+        importer = subprocess.Popen(
+            ["git", "fast-import", "--quiet"],
+            cwd=self._folder,
+            stdin=subprocess.PIPE,
+        )
+        self._import(importer.stdin)
+        importer.stdin.close()
+        if importer.wait() != 0:
+            raise RuntimeError(f"git fast-import failed in {self._folder}")
+        self._git("pack-refs", "--all")
+        self._git("checkout", "-q", "-f", "main")
+        self._git("remote", "add", "origin", self.__class__.REMOTE)
+        self._git("config", "branch.main.remote", "origin")
+        self._git("config", "branch.main.merge", "refs/heads/main")
+        self._git("update-ref", "refs/remotes/origin/main", "main")
+        with open(os.path.join(self._folder, self.__class__.MARKER), "w") as file:
+            json.dump(self.shape, file)
+
+    def _git(self, *args: str):
+        """
+        Runs git in the repository.
+        :param args: The git arguments.
+        :type args: str
+        """
+        subprocess.run(["git", *args], cwd=self._folder, check=True)
+
+    @staticmethod
+    def _data(stream: IO[bytes], content: bytes):
+        """
+        Writes a fast-import data block.
+        :param stream: The fast-import input.
+        :type stream: IO[bytes]
+        :param content: The data.
+        :type content: bytes
+        """
+        stream.write(b"data %d\n" % len(content))
+        stream.write(content)
+        stream.write(b"\n")
+
+    def _import(self, stream: IO[bytes]):
+        """
+        Writes the fast-import stream: a first commit adding every file, then
+        commits changing one file each, with the tags spread evenly and the
+        last one on the latest commit.
+        :param stream: The fast-import input.
+        :type stream: IO[bytes]
+        """
+        tagged = {}
+        if self._tags > 0:
+            for index in range(self._tags):
+                mark = self._commits - (
+                    (self._tags - 1 - index) * self._commits // self._tags
+                )
+                tagged.setdefault(mark, []).append(index)
+        timestamp = 1700000000
+        for mark in range(1, self._commits + 1):
+            stream.write(b"commit refs/heads/main\nmark :%d\n" % mark)
+            stream.write(
+                b"committer Benchmark <benchmark@example.com> %d +0000\n"
+                % (timestamp + mark)
+            )
+            self._data(stream, b"Commit %d" % mark)
+            if mark == 1:
+                stream.write(b"M 100644 inline .gitattributes\n")
+                self._data(stream, b"*.txt text diff=plain\n")
+                for index in range(self._files):
+                    stream.write(b"M 100644 inline %s\n" % self.path(index).encode())
+                    self._data(stream, b"file %d\n" % index)
+            else:
+                index = mark % self._files
+                stream.write(b"M 100644 inline %s\n" % self.path(index).encode())
+                self._data(stream, b"file %d, commit %d\n" % (index, mark))
+            stream.write(b"\n")
+            for index in tagged.get(mark, []):
+                stream.write(
+                    b"tag %s\nfrom :%d\n" % (self.tag_name(index).encode(), mark)
+                )
+                stream.write(
+                    b"tagger Benchmark <benchmark@example.com> %d +0000\n"
+                    % (timestamp + mark)
+                )
+                self._data(stream, b"Release %s" % self.tag_name(index).encode())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,48 +20,124 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 __path__ = __import__("pkgutil").extend_path(__path__, __name__)
+import importlib
 
-from .error_cloning_git_repository import ErrorCloningGitRepository
-from .git_add_failed import GitAddFailed
-from .git_add_all_failed import GitAddAllFailed
-from .git_apply_failed import GitApplyFailed
-from .git_branch_failed import GitBranchFailed
-from .git_branch_unset_upstream_failed import GitBranchUnsetUpstreamFailed
-from .git_checkout_failed import GitCheckoutFailed
-from .git_check_attr_all_failed import GitCheckAttrAllFailed
-from .git_check_attr_failed import GitCheckAttrFailed
-from .git_clone_failed import GitCloneFailed
-from .git_commit_failed import GitCommitFailed
-from .git_diff_failed import GitDiffFailed
-from .git_init_failed import GitInitFailed
-from .git_push_branch_failed import GitPushBranchFailed
-from .git_push_failed import GitPushFailed
-from .git_push_tags_failed import GitPushTagsFailed
-from .git_remote_add_failed import GitRemoteAddFailed
-from .git_stash_pop_failed import GitStashPopFailed
-from .git_stash_push_failed import GitStashPushFailed
-from .git_tag_failed import GitTagFailed
+# Public names, and the modules declaring them. Modules are imported on first
+# access, so using Version does not pay for GitPython, paramiko or requests.
+_EXPORTS = {
+    "ErrorCloningGitRepository": ".error_cloning_git_repository",
+    "GitAddFailed": ".git_add_failed",
+    "GitAddAllFailed": ".git_add_all_failed",
+    "GitApplyFailed": ".git_apply_failed",
+    "GitBranchFailed": ".git_branch_failed",
+    "GitBranchUnsetUpstreamFailed": ".git_branch_unset_upstream_failed",
+    "GitCatFileFailed": ".git_cat_file_failed",
+    "GitCheckoutFailed": ".git_checkout_failed",
+    "GitCheckAttrAllFailed": ".git_check_attr_all_failed",
+    "GitCheckAttrFailed": ".git_check_attr_failed",
+    "GitCloneFailed": ".git_clone_failed",
+    "GitCommitFailed": ".git_commit_failed",
+    "GitDiffFailed": ".git_diff_failed",
+    "GitForEachRefFailed": ".git_for_each_ref_failed",
+    "GitInitFailed": ".git_init_failed",
+    "GitLsRemoteFailed": ".git_ls_remote_failed",
+    "GitOperationTimedOut": ".git_operation_timed_out",
+    "GitPushBranchFailed": ".git_push_branch_failed",
+    "GitPushFailed": ".git_push_failed",
+    "GitPushTagsFailed": ".git_push_tags_failed",
+    "GitRemoteAddFailed": ".git_remote_add_failed",
+    "GitStashPopFailed": ".git_stash_pop_failed",
+    "GitStashPushFailed": ".git_stash_push_failed",
+    "GitStreamFailed": ".git_stream_failed",
+    "GitTagFailed": ".git_tag_failed",
+    "GithubApiFailed": ".github_api_failed",
+    "InvalidGithubCredentials": ".invalid_github_credentials",
+    "GitFailureKind": ".git_failure_kind",
+    "GitFailureClassifier": ".git_failure_classifier",
+    "GitRetryBudget": ".git_retry_budget",
+    "GitRetryPolicy": ".git_retry_policy",
+    "GitExecutionContext": ".git_execution_context",
+    "GitOutput": ".git_output",
+    "GitOutputBuffer": ".git_output_buffer",
+    "GitResult": ".git_result",
+    "GitReplayNotFound": ".git_replay_not_found",
+    "GitReplay": ".git_replay",
+    "GitProcess": ".git_process",
+    "GitRepoRegistry": ".git_repo_registry",
+    "GitReadBackend": ".git_read_backend",
+    "GitSubprocessReadBackend": ".git_subprocess_read_backend",
+    "GitPygit2ReadBackend": ".git_pygit2_read_backend",
+    "GitReadBackends": ".git_read_backends",
+    "GitCatFile": ".git_cat_file",
+    "GitCatFilePool": ".git_cat_file_pool",
+    "GitScheduler": ".git_scheduler",
+    "GitHistogram": ".git_histogram",
+    "GitMetrics": ".git_metrics",
+    "GitSpan": ".git_span",
+    "GitSpanExporter": ".git_span_exporter",
+    "GitJsonLinesSpanExporter": ".git_json_lines_span_exporter",
+    "GitTracer": ".git_tracer",
+    "GitInvocationRecorder": ".git_invocation_recorder",
+    "GitInvocationAnalyzer": ".git_invocation_analyzer",
+    "GitOperation": ".git_operation",
+    "GitAddBatcher": ".git_add_batcher",
+    "GitAdd": ".git_add",
+    "GitApply": ".git_apply",
+    "GitBranch": ".git_branch",
+    "GitCheckAttr": ".git_check_attr",
+    "GitClone": ".git_clone",
+    "GitDiff": ".git_diff",
+    "GitInit": ".git_init",
+    "GitProgressLogging": ".git_progress_logging",
+    "GitPush": ".git_push",
+    "GitStash": ".git_stash",
+    "GitRefsFingerprint": ".git_refs_fingerprint",
+    "GitTagIndex": ".git_tag_index",
+    "GitTagCommitIndex": ".git_tag_commit_index",
+    "GitRemoteTags": ".git_remote_tags",
+    "GithubResponseCache": ".github_response_cache",
+    "GithubTokenBudget": ".github_token_budget",
+    "GithubRateLimiter": ".github_rate_limiter",
+    "GithubClient": ".github_client",
+    "GitTag": ".git_tag",
+    "SshPrivateKeyGitPolicy": ".ssh_private_key_git_policy",
+    "SshVendor": ".ssh_vendor",
+    "Version": ".version",
+    "GitRepo": ".git_repo",
+    "GitRemote": ".git_remote",
+    "SshGitRepo": ".ssh_git_repo",
+    "GitCommit": ".git_commit",
+}
 
-from .git_operation import GitOperation
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Imports the module declaring given public name, on first access.
+    :param name: The name.
+    :type name: str
+    :return: The class.
+    :rtype: type
+    :raise AttributeError: If the package does not export such name.
+    """
+    module = _EXPORTS.get(name, None)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    result = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = result
+
+    return result
+
+
+def __dir__():
+    """
+    Lists the attributes of the package, including the not-yet-imported ones.
+    :return: Such names.
+    :rtype: List[str]
+    """
+    return sorted(set(globals()) | set(__all__))
 
-from .git_add import GitAdd
-from .git_apply import GitApply
-from .git_branch import GitBranch
-from .git_check_attr import GitCheckAttr
-from .git_clone import GitClone
-from .git_diff import GitDiff
-from .git_init import GitInit
-from .git_progress_logging import GitProgressLogging
-from .git_push import GitPush
-from .git_stash import GitStash
-from .git_tag import GitTag
-from .ssh_private_key_git_policy import SshPrivateKeyGitPolicy
-from .ssh_vendor import SshVendor
-from .version import Version
-from .git_repo import GitRepo
-from .git_remote import GitRemote
-from .ssh_git_repo import SshGitRepo
-from .git_commit import GitCommit
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
 # Local Variables:
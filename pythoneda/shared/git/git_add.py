@@ -19,8 +19,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+from .git_add_batcher import GitAddBatcher
 from .git_add_failed import GitAddFailed
 from .git_add_all_failed import GitAddAllFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 
 
@@ -34,25 +36,56 @@ class GitAdd(GitOperation):
         - Provides "git add" operations.
 
     Collaborators:
+        - pythoneda.shared.git.GitAddBatcher: Coalesces concurrent adds.
         - pythoneda.shared.git.GitAddFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    _coalescing_window = 0.0
+
+    _uninstrumented = ("coalescing_window",)
+
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitAdd instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        """
+        super().__init__(folder, context=context)
+
+    @classmethod
+    def coalescing_window(cls) -> float:
+        """
+        Retrieves how long adds wait for others to share a single git process.
+        :return: Such window in seconds; 0 for the same loop tick, None to disable.
+        :rtype: float
         """
-        super().__init__(folder)
+        return cls._coalescing_window
+
+    @classmethod
+    def set_coalescing_window(cls, window: float):
+        """
+        Changes how long adds wait for others to share a single git process.
+        :param window: Such window in seconds; 0 for the same loop tick, None to disable.
+        :type window: float
+        """
+        cls._coalescing_window = window
 
     async def add(self, file: str) -> str:
         """
         Adds changes in given file to the staging area.
+        Concurrent adds on the same folder are coalesced into one git process.
         :param file: The file to add.
         :type file: str
         :return: The output of the operation, should it succeeds.
         :rtype: str
+        :raise pythoneda.shared.git.GitAddFailed: If the file cannot be added.
         """
+        window = self.__class__.coalescing_window()
+        if window is not None:
+            return await GitAddBatcher.for_operation(self, window).add(file)
+
         result = None
         (code, stdout, stderr) = await self.run(["git", "add", file])
         if code == 0:
@@ -0,0 +1,202 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_add_batcher.py
+
+This file declares the GitAddBatcher class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .git_add_failed import GitAddFailed
+import os
+from pythoneda.shared import BaseObject
+import re
+from typing import List, Set, Tuple
+
+
+class GitAddBatcher(BaseObject):
+    """
+    Coalesces "git add" requests on the same folder into single invocations.
+
+    Class name: GitAddBatcher
+
+    Responsibilities:
+        - Collects the files added within a time window, or the same loop tick.
+        - Adds them all with one "git add --pathspec-from-file".
+        - Maps a failed batch back to the offending files.
+
+    Collaborators:
+        - pythoneda.shared.git.GitAdd: Adds files through a batcher.
+        - pythoneda.shared.git.GitAddFailed: If a file cannot be added.
+    """
+
+    _batchers = {}
+
+    _tasks: Set[asyncio.Task] = set()
+
+    # file names may contain newlines, which git prints verbatim
+    UNMATCHED_PATHSPEC = re.compile(
+        r"pathspec '(.+?)' did not match any files", re.DOTALL
+    )
+
+    def __init__(self, operation, window: float = 0.0, key: Tuple = None):
+        """
+        Creates a new GitAddBatcher instance.
+        :param operation: The operation running git.
+        :type operation: pythoneda.shared.git.GitOperation
+        :param window: Seconds to wait for more files before running git.
+        :type window: float
+        :param key: The key of the batcher among the shared ones, if shared.
+        :type key: Tuple
+        """
+        super().__init__()
+        self._operation = operation
+        self._key = key
+        self._window = window
+        self._loop = asyncio.get_running_loop()
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._handle = None
+
+    @classmethod
+    def for_operation(cls, operation, window: float = 0.0):
+        """
+        Retrieves the batcher shared by operations on the same folder and context.
+        :param operation: The operation running git.
+        :type operation: pythoneda.shared.git.GitOperation
+        :param window: Seconds to wait for more files before running git.
+        :type window: float
+        :return: The batcher.
+        :rtype: pythoneda.shared.git.GitAddBatcher
+        """
+        key = (
+            os.path.realpath(operation.folder),
+            operation.context.key,
+            id(asyncio.get_running_loop()),
+        )
+        result = cls._batchers.get(key, None)
+        if result is None:
+            result = cls(operation, window, key)
+            cls._batchers[key] = result
+
+        return result
+
+    async def add(self, file: str) -> str:
+        """
+        Adds given file as part of the next batch.
+        :param file: The file to add.
+        :type file: str
+        :return: The output of the batch, should it succeed.
+        :rtype: str
+        :raise pythoneda.shared.git.GitAddFailed: If the file cannot be added.
+        """
+        future = self._loop.create_future()
+        self._pending.append((file, future))
+        if self._handle is None:
+            if self._window > 0:
+                self._handle = self._loop.call_later(self._window, self._flush)
+            else:
+                self._handle = self._loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self):
+        """
+        Launches the batch collected so far.
+        """
+        self._handle = None
+        batch = self._pending
+        self._pending = []
+        if self.__class__._batchers.get(self._key, None) is self:
+            del self.__class__._batchers[self._key]
+        if batch:
+            # the loop only keeps weak references to tasks
+            task = self._loop.create_task(self._run(batch))
+            self.__class__._tasks.add(task)
+            task.add_done_callback(self.__class__._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        """
+        Adds a batch of files, resolving each caller's future.
+        :param batch: The files and the futures awaiting them.
+        :type batch: List[Tuple[str, asyncio.Future]]
+        """
+        try:
+            while batch:
+                files = list(dict.fromkeys(file for file, _ in batch))
+                (code, stdout, stderr) = await self._operation.run(
+                    ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                    input="\0".join(files).encode("utf-8"),
+                )
+                if code == 0:
+                    self._resolve(batch, stdout)
+                    break
+                logger = self._operation.__class__.logger()
+                if stderr != "":
+                    logger.error(stderr)
+                if stdout != "":
+                    logger.error(stdout)
+                offending = set(self.__class__.UNMATCHED_PATHSPEC.findall(stderr))
+                if not offending.intersection(files):
+                    # git does not say which file failed: isolate each one.
+                    offending = set(files) if len(files) == 1 else None
+                if offending is None:
+                    for file, future in batch:
+                        await self._run([(file, future)])
+                    break
+                self._fail([entry for entry in batch if entry[0] in offending], stderr)
+                batch = [entry for entry in batch if entry[0] not in offending]
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as err:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+
+    def _resolve(self, batch: List[Tuple[str, asyncio.Future]], stdout: str):
+        """
+        Resolves the futures of a successful batch.
+        :param batch: The files and the futures awaiting them.
+        :type batch: List[Tuple[str, asyncio.Future]]
+        :param stdout: The output of git.
+        :type stdout: str
+        """
+        for _, future in batch:
+            if not future.done():
+                future.set_result(stdout)
+
+    def _fail(self, batch: List[Tuple[str, asyncio.Future]], stderr: str):
+        """
+        Fails the futures of files git could not add.
+        :param batch: The files and the futures awaiting them.
+        :type batch: List[Tuple[str, asyncio.Future]]
+        :param stderr: The error output of git.
+        :type stderr: str
+        """
+        for file, future in batch:
+            if not future.done():
+                future.set_exception(GitAddFailed(self._operation.folder, file, stderr))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,6 +20,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_apply_failed import GitApplyFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 
 
@@ -36,13 +37,15 @@ class GitApply(GitOperation):
         - pythoneda.shared.git.GitApplyFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitApply instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def apply(self, patchFile: str) -> str:
         """
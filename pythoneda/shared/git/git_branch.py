@@ -21,6 +21,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_branch_failed import GitBranchFailed
 from .git_branch_unset_upstream_failed import GitBranchUnsetUpstreamFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 
 
@@ -37,13 +38,15 @@ class GitBranch(GitOperation):
         - None
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitBranch instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def branch(self, branch: str):
         """
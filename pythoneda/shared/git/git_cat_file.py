@@ -0,0 +1,299 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_cat_file.py
+
+This file declares the GitCatFile class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from .git_cat_file_failed import GitCatFileFailed
+from .git_execution_context import GitExecutionContext
+from pythoneda.shared import attribute, BaseObject
+from typing import Callable, Tuple, Union
+
+
+class GitCatFile(BaseObject):
+    """
+    A long-lived "git cat-file --batch" process bound to a repository.
+
+    Class name: GitCatFile
+
+    Responsibilities:
+        - Keeps a single "git cat-file" process alive for a folder.
+        - Pipelines many object requests over the same pipe.
+        - Closes itself after being idle for a while.
+
+    Collaborators:
+        - pythoneda.shared.git.GitCatFilePool: Owns and restarts instances.
+        - pythoneda.shared.git.GitCatFileFailed: If the process dies.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        batchCheck: bool = False,
+        idleTimeout: float = 60.0,
+        context: GitExecutionContext = None,
+        onClosed: Callable[["GitCatFile"], None] = None,
+    ):
+        """
+        Creates a new GitCatFile instance for given folder.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param batchCheck: Whether to retrieve only object headers.
+        :type batchCheck: bool
+        :param idleTimeout: Seconds without requests before the process is closed.
+        :type idleTimeout: float
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :param onClosed: Called once the worker can no longer be used, if any.
+        :type onClosed: Callable[[pythoneda.shared.git.GitCatFile], None]
+        """
+        super().__init__()
+        self._context = context or GitExecutionContext.default()
+        self._folder = folder
+        self._batch_check = batchCheck
+        self._idle_timeout = idleTimeout
+        self._process = None
+        self._reader = None
+        self._starting = None
+        self._loop = None
+        self._idle_handle = None
+        self._closed = False
+        self._on_closed = onClosed
+        self._pending = deque()
+
+    @property
+    @attribute
+    def folder(self) -> str:
+        """
+        Retrieves the folder of the cloned repository.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    @property
+    @attribute
+    def batch_check(self) -> bool:
+        """
+        Checks whether this worker retrieves only object headers.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._batch_check
+
+    @property
+    def context(self) -> GitExecutionContext:
+        """
+        Retrieves the context the process runs in.
+        :return: Such context.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        return self._context
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Retrieves the event loop the process is bound to.
+        :return: Such loop, or None if not started yet.
+        :rtype: asyncio.AbstractEventLoop
+        """
+        return self._loop
+
+    @property
+    def is_usable(self) -> bool:
+        """
+        Checks whether this worker can still accept requests.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Retrieves the number of requests awaiting a response.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._pending)
+
+    async def start(self):
+        """
+        Starts the underlying process, if not started already.
+        :raise pythoneda.shared.git.GitCatFileFailed: If it cannot be started.
+        """
+        if self._starting is None:
+            self._loop = asyncio.get_running_loop()
+            self._starting = self._loop.create_task(self._spawn())
+        await asyncio.shield(self._starting)
+
+    async def _spawn(self):
+        """
+        Spawns the "git cat-file" process and its response reader.
+        """
+        mode = "--batch-check" if self._batch_check else "--batch"
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self._context.argv(["git", "cat-file", mode]),
+                cwd=self._folder,
+                env=self._context.env,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as err:
+            self._mark_closed()
+            raise GitCatFileFailed(self._folder, str(err))
+        self._reader = self._loop.create_task(self._read_responses())
+
+    async def request(self, rev: str) -> Union[Tuple[str, str, int, bytes], None]:
+        """
+        Asks the process for given object.
+        :param rev: The object name, in any form "git rev-parse" accepts.
+        :type rev: str
+        :return: A tuple (sha, type, size, content), or None if the object is missing.
+          The content is None when running in batch-check mode.
+        :rtype: Union[Tuple[str, str, int, bytes], None]
+        :raise pythoneda.shared.git.GitCatFileFailed: If the process dies.
+        """
+        if "\n" in rev:
+            raise GitCatFileFailed(self._folder, f"invalid object name {rev!r}")
+        await self.start()
+        if self._closed:
+            raise GitCatFileFailed(self._folder, "worker is closed")
+
+        self._cancel_idle_timer()
+        future = self._loop.create_future()
+        self._pending.append(future)
+        try:
+            self._process.stdin.write(rev.encode("utf-8") + b"\n")
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as err:
+            self._fail_pending(str(err))
+
+        return await future
+
+    async def _read_responses(self):
+        """
+        Reads responses in request order, resolving the pending futures.
+        """
+        stdout = self._process.stdout
+        reason = "process exited"
+        try:
+            while True:
+                header = await stdout.readline()
+                if not header:
+                    break
+                parts = header.rstrip(b"\n").split(b" ")
+                result = None
+                if len(parts) == 3 and parts[2].isdigit():
+                    size = int(parts[2])
+                    content = None
+                    if not self._batch_check:
+                        content = (await stdout.readexactly(size + 1))[:-1]
+                    result = (parts[0].decode(), parts[1].decode(), size, content)
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(result)
+                if not self._pending:
+                    self._schedule_idle_timer()
+        except (asyncio.IncompleteReadError, IndexError, ValueError) as err:
+            reason = f"unexpected output: {err}"
+        finally:
+            self._mark_closed()
+            self._fail_pending(reason)
+
+    def _mark_closed(self):
+        """
+        Marks this worker as unusable, notifying its owner the first time.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._on_closed is not None:
+            self._on_closed(self)
+
+    def _fail_pending(self, reason: str):
+        """
+        Fails all requests still awaiting a response.
+        :param reason: The reason.
+        :type reason: str
+        """
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(GitCatFileFailed(self._folder, reason))
+
+    def _schedule_idle_timer(self):
+        """
+        Schedules the closing of the process once the idle timeout expires.
+        """
+        self._cancel_idle_timer()
+        if self._idle_timeout is not None and not self._closed:
+            self._idle_handle = self._loop.call_later(
+                self._idle_timeout, self._close_if_idle
+            )
+
+    def _cancel_idle_timer(self):
+        """
+        Cancels the pending idle timer, if any.
+        """
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _close_if_idle(self):
+        """
+        Closes the process if no request arrived meanwhile.
+        """
+        self._idle_handle = None
+        if not self._pending and not self._closed:
+            GitCatFile.logger().debug(f"Closing idle cat-file worker in {self._folder}")
+            self._loop.create_task(self.close())
+
+    async def close(self):
+        """
+        Closes the process, failing any request still in flight.
+        """
+        self._mark_closed()
+        self._cancel_idle_timer()
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), 5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        self._fail_pending("worker closed")
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,208 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_cat_file_pool.py
+
+This file declares the GitCatFilePool class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .git_cat_file import GitCatFile
+from .git_cat_file_failed import GitCatFileFailed
+from .git_execution_context import GitExecutionContext
+import os
+from pythoneda.shared import BaseObject
+from typing import Dict, Tuple, Union
+
+
+class GitCatFilePool(BaseObject):
+    """
+    Shares "git cat-file --batch" workers among git operations.
+
+    Class name: GitCatFilePool
+
+    Responsibilities:
+        - Keeps one worker per folder, mode and execution context.
+        - Restarts workers that crashed or went idle, forgetting closed ones.
+
+    Collaborators:
+        - pythoneda.shared.git.GitCatFile: The workers.
+        - pythoneda.shared.git.GitOperation: Reads objects through the pool.
+    """
+
+    _singleton = None
+
+    def __init__(self, idleTimeout: float = 60.0):
+        """
+        Creates a new GitCatFilePool instance.
+        :param idleTimeout: Seconds without requests before a worker is closed.
+        :type idleTimeout: float
+        """
+        super().__init__()
+        self._idle_timeout = idleTimeout
+        self._workers: Dict[Tuple[str, bool, Tuple], GitCatFile] = {}
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide pool.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitCatFilePool
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def idle_timeout(self) -> float:
+        """
+        Retrieves the idle timeout of new workers.
+        :return: Such timeout, in seconds.
+        :rtype: float
+        """
+        return self._idle_timeout
+
+    async def worker(
+        self,
+        folder: str,
+        batchCheck: bool = False,
+        context: GitExecutionContext = None,
+    ) -> GitCatFile:
+        """
+        Retrieves a running worker for given folder, starting one if needed.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param batchCheck: Whether the worker should retrieve only headers.
+        :type batchCheck: bool
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :return: The worker.
+        :rtype: pythoneda.shared.git.GitCatFile
+        """
+        context = context or GitExecutionContext.default()
+        # keyed by value: the id of a collected context can be reused
+        key = (os.path.realpath(folder), batchCheck, context.key)
+        loop = asyncio.get_running_loop()
+        result = self._workers.get(key, None)
+        if result is None or not result.is_usable or result.loop not in (None, loop):
+            result = GitCatFile(
+                key[0],
+                batchCheck,
+                self._idle_timeout,
+                context,
+                lambda worker: self._evict(key, worker),
+            )
+            self._workers[key] = result
+        await result.start()
+
+        return result
+
+    def _evict(self, key: Tuple[str, bool, Tuple], worker: GitCatFile):
+        """
+        Forgets given worker, once closed, unless replaced already.
+        :param key: The key of the worker.
+        :type key: Tuple[str, bool, Tuple]
+        :param worker: The worker.
+        :type worker: pythoneda.shared.git.GitCatFile
+        """
+        if self._workers.get(key, None) is worker:
+            del self._workers[key]
+
+    async def _request(
+        self, folder: str, rev: str, batchCheck: bool, context: GitExecutionContext
+    ) -> Union[Tuple[str, str, int, bytes], None]:
+        """
+        Sends a request, retrying once on a fresh worker if the current one died.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param rev: The object name.
+        :type rev: str
+        :param batchCheck: Whether to retrieve only the header.
+        :type batchCheck: bool
+        :param context: The execution context.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :return: A tuple (sha, type, size, content), or None if missing.
+        :rtype: Union[Tuple[str, str, int, bytes], None]
+        """
+        worker = await self.worker(folder, batchCheck, context)
+        try:
+            return await worker.request(rev)
+        except GitCatFileFailed as err:
+            if worker.is_usable:
+                raise
+            GitCatFilePool.logger().debug(f"Restarting cat-file worker: {err}")
+            worker = await self.worker(folder, batchCheck, context)
+            return await worker.request(rev)
+
+    async def read(
+        self, folder: str, rev: str, context: GitExecutionContext = None
+    ) -> Union[Tuple[str, str, int, bytes], None]:
+        """
+        Reads an object.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param rev: The object name.
+        :type rev: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :return: A tuple (sha, type, size, content), or None if missing.
+        :rtype: Union[Tuple[str, str, int, bytes], None]
+        :raise pythoneda.shared.git.GitCatFileFailed: If the worker keeps failing.
+        """
+        return await self._request(folder, rev, False, context)
+
+    async def read_header(
+        self, folder: str, rev: str, context: GitExecutionContext = None
+    ) -> Union[Tuple[str, str, int], None]:
+        """
+        Reads the header of an object.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param rev: The object name.
+        :type rev: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :return: A tuple (sha, type, size), or None if missing.
+        :rtype: Union[Tuple[str, str, int], None]
+        :raise pythoneda.shared.git.GitCatFileFailed: If the worker keeps failing.
+        """
+        result = await self._request(folder, rev, True, context)
+        if result is not None:
+            result = result[:3]
+
+        return result
+
+    async def close(self, folder: str = None):
+        """
+        Closes the workers of given folder, or all of them.
+        :param folder: The cloned repository, or None for all.
+        :type folder: str
+        """
+        path = None if folder is None else os.path.realpath(folder)
+        for key in [k for k in self._workers if path is None or k[0] == path]:
+            worker = self._workers.get(key, None)
+            if worker is not None:
+                await worker.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
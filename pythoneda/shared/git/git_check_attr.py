@@ -21,6 +21,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_check_attr_all_failed import GitCheckAttrAllFailed
 from .git_check_attr_failed import GitCheckAttrFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 from typing import Dict
 
@@ -38,13 +39,15 @@ class GitCheckAttr(GitOperation):
         - pythoneda.shared.git.GitCheckAttrFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitCheckAttr instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     @staticmethod
     def _extract_attributes(output: str) -> Dict[str, str]:
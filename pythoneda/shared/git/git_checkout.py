@@ -20,6 +20,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_checkout_failed import GitCheckoutFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 from typing import Dict
 
@@ -37,13 +38,15 @@ class GitCheckout(GitOperation):
         - pythoneda.shared.git.GitCheckoutFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitCheckout instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def checkout(self, rev: str, file: str = None):
         """
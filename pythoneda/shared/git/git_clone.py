@@ -20,8 +20,10 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_clone_failed import GitCloneFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
-from typing import Tuple
+from .git_result import GitResult
+from .git_retry_policy import GitRetryPolicy
 
 
 class GitClone(GitOperation):
@@ -34,40 +36,47 @@ class GitClone(GitOperation):
         - Represents the clone operation in git.
 
     Collaborators:
-        - None
+        - pythoneda.shared.git.GitRetryPolicy: Retries transient failures.
     """
 
-    def __init__(self, folder: str):
+    _retry_policy = GitRetryPolicy()
+
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitClone instance for given folder.
         :param folder: The folder to host the cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder, False)
+        super().__init__(folder, False, context=context)
 
-    async def clone(self, url: str, subfolder: str = None) -> Tuple[int, str, str]:
+    async def clone(self, url: str, subfolder: str = None) -> GitResult:
         """
         Clones this repo.
         :param url: The repository url.
         :type url: str
         :param subfolder: An optional subfolder.
         :type subfolder: str
-        :return: A tuple containing the return code, the stdout, and the stderr.
-        :rtype: Tuple(int, str, str)
+        :return: The result, which also unpacks as (code, stdout, stderr).
+        :rtype: pythoneda.shared.git.GitResult
         """
         args = ["git", "clone", url]
 
         if subfolder:
             args.append(subfolder)
 
-        (code, stdout, stderr) = await self.run(args)
+        result = await self.run_with_retry(args)
+        (code, stdout, stderr) = result
         if code != 0:
             if stderr != "":
                 GitClone.logger().error(stderr)
             if stdout != "":
                 GitClone.logger().error(stdout)
-            raise GitCloneFailed(self.folder, stderr)
-        return (code, stdout, stderr)
+            raise GitCloneFailed(
+                self.folder, stderr, result.failure_kind, result.attempts
+            )
+        return result
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -20,7 +20,11 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_commit_failed import GitCommitFailed
+from .git_diff_failed import GitDiffFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
+from .git_output import GitOutput
+from .git_output_buffer import GitOutputBuffer
 
 
 class GitCommit(GitOperation):
@@ -36,23 +40,30 @@ class GitCommit(GitOperation):
         - None
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitCommit instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
-    async def commit(self, message: str, retrieveLatestCommit: bool = True):
+    async def commit(
+        self, message: str, retrieveLatestCommit: bool = True, raw: bool = False
+    ):
         """
         Commits staged changes.
         :param message: The message.
         :type message: str
         :param retrieveLatestCommit: Whether to return the latest commit or not.
         :type retrieveLatestCommit: bool
+        :param raw: Whether to retrieve the patch undecoded, as latest_commit()
+          does.
+        :type raw: bool
         :return: A tuple containing the hash, the diff and the message of the latest commit.
-        :rtype: tuple(str, str, str)
+        :rtype: tuple(str, Union[str, pythoneda.shared.git.GitOutput], str)
         """
         (code, stdout, stderr) = await self.run(["git", "commit", "-S", "-m", message])
         if code != 0:
@@ -63,20 +74,59 @@ class GitCommit(GitOperation):
             raise GitCommitFailed(self.folder, stderr)
 
         if retrieveLatestCommit:
+            if raw:
+                latest_commit = self.repo.head.commit
+                return (
+                    latest_commit.hexsha,
+                    await self._raw_diff(latest_commit.hexsha, "HEAD~1"),
+                    latest_commit.message,
+                )
             return self.latest_commit()
 
-    def latest_commit(self):
+    def latest_commit(self, raw: bool = False):
         """
         Retrieves the hash, the diff and the message of the latest commit.
+        :param raw: Whether to retrieve the patch undecoded, moved to a temporary
+          file when larger than GitOutputBuffer.spill_threshold(), instead of
+          GitPython's textual description of the diff.
+        :type raw: bool
         :return: A tuple containing the hash, the diff and the message of the latest commit.
-        :rtype: tuple(str, str, str)
+        :rtype: tuple(str, Union[str, pythoneda.shared.git.GitOutput], str)
         """
         latest_commit = self.repo.head.commit
         latest_commit_hash = latest_commit.hexsha
-        latest_commit_diff = latest_commit.diff("HEAD~1")
+        if raw:
+            latest_commit_diff = self._blocking(
+                self._raw_diff(latest_commit_hash, "HEAD~1")
+            )
+        else:
+            latest_commit_diff = str(latest_commit.diff("HEAD~1"))
         latest_commit_message = latest_commit.message
 
-        return latest_commit_hash, str(latest_commit_diff), latest_commit_message
+        return latest_commit_hash, latest_commit_diff, latest_commit_message
+
+    async def _raw_diff(self, commit: str, other: str) -> GitOutput:
+        """
+        Runs "git diff" from given commit to another revision, as GitPython's
+        Commit.diff(other) compares them, collecting its output undecoded.
+        :param commit: The commit.
+        :type commit: str
+        :param other: The revision to compare it with, usually its parent.
+        :type other: str
+        :return: The patch.
+        :rtype: pythoneda.shared.git.GitOutput
+        :raise pythoneda.shared.git.GitDiffFailed: If git fails.
+        """
+        outcome = await self.run(
+            ["git", "diff", commit, other],
+            spillThreshold=GitOutputBuffer.spill_threshold(),
+        )
+        if not outcome.succeeded:
+            outcome.output.close()
+            GitCommit.logger().error(outcome.stderr)
+            raise GitDiffFailed(self.folder)
+
+        return outcome.output
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
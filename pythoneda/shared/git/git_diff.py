@@ -20,7 +20,13 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_diff_failed import GitDiffFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
+from .git_output import GitOutput
+from .git_output_buffer import GitOutputBuffer
+from .git_read_backend import GitReadBackend
+from .git_stream_failed import GitStreamFailed
+from typing import AsyncIterator, Union
 
 
 class GitDiff(GitOperation):
@@ -36,48 +42,89 @@ class GitDiff(GitOperation):
         - pythoneda.shared.git.GitDiffFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitDiff instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
-    async def diff(self) -> str:
+    async def diff(self, raw: bool = False) -> Union[str, GitOutput]:
         """
         Retrieves the diff.
+        :param raw: Whether to retrieve the diff undecoded, moved to a temporary
+          file when larger than GitOutputBuffer.spill_threshold().
+        :type raw: bool
         :return: The diff if the operation succeeds.
-        :rtype: str
+        :rtype: Union[str, pythoneda.shared.git.GitOutput]
         """
         result = None
 
-        (code, stdout, stderr) = await self.run(["git", "diff"])
-        if code == 0:
-            result = stdout
+        outcome = await self.run(
+            ["git", "diff"],
+            spillThreshold=GitOutputBuffer.spill_threshold() if raw else None,
+        )
+        if outcome.succeeded:
+            result = outcome.output if raw else outcome.stdout
         else:
-            GitDiff.logger().error(stderr)
+            GitDiff.logger().error(outcome.stderr)
             raise GitDiffFailed(self.folder)
 
         return result
 
-    async def committed_diff(self) -> str:
+    async def committed_diff(self, raw: bool = False) -> Union[str, GitOutput]:
         """
         Retrieves the diff.
+        :param raw: Whether to retrieve the diff undecoded, moved to a temporary
+          file when larger than GitOutputBuffer.spill_threshold().
+        :type raw: bool
         :return: The diff if the operation succeeds.
-        :rtype: str
+        :rtype: Union[str, pythoneda.shared.git.GitOutput]
         """
         result = None
 
-        (code, stdout, stderr) = await self.run(["git", "diff", "HEAD^", "HEAD"])
-        if code == 0:
-            result = stdout
+        outcome = await self.run(
+            ["git", "diff", "HEAD^", "HEAD"],
+            spillThreshold=GitOutputBuffer.spill_threshold() if raw else None,
+        )
+        if outcome.succeeded:
+            result = outcome.output if raw else outcome.stdout
         else:
-            GitDiff.logger().error(stderr)
+            GitDiff.logger().error(outcome.stderr)
             raise GitDiffFailed(self.folder)
 
         return result
 
+    def diff_between(self, old: str, new: str) -> str:
+        """
+        Retrieves the diff between two revisions, through the fastest read backend.
+        :param old: The old revision.
+        :type old: str
+        :param new: The new revision.
+        :type new: str
+        :return: The diff.
+        :rtype: str
+        """
+        return self.backend_for(GitReadBackend.DIFF).diff(old, new)
+
+    async def diff_stream(self, *revs: str) -> AsyncIterator[bytes]:
+        """
+        Streams the diff line by line, without holding it all in memory.
+        :param revs: The revisions to compare, if any.
+        :type revs: str
+        :return: Each line of the diff, as bytes.
+        :rtype: AsyncIterator[bytes]
+        """
+        try:
+            async for line in self.run_stream(["git", "diff", *revs], "lines"):
+                yield line
+        except GitStreamFailed as err:
+            GitDiff.logger().error(err.output)
+            raise GitDiffFailed(self.folder)
+
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
 # Local Variables:
@@ -0,0 +1,233 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_execution_context.py
+
+This file declares the GitExecutionContext class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from pythoneda.shared import attribute, ValueObject
+import shutil
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+
+class GitExecutionContext(ValueObject):
+    """
+    The environment git processes run in.
+
+    Class name: GitExecutionContext
+
+    Responsibilities:
+        - Resolves the git binary once.
+        - Holds a frozen environment, configuration file and "-c" overrides.
+        - Builds the final command line of git invocations.
+
+    Collaborators:
+        - pythoneda.shared.git.GitOperation: Runs git within a context.
+    """
+
+    _default = None
+    _tenants = {}
+
+    def __init__(
+        self,
+        gitPath: str = None,
+        env: Mapping[str, str] = None,
+        configOverrides: Dict[str, str] = None,
+        configPath: str = None,
+    ):
+        """
+        Creates a new GitExecutionContext instance.
+        :param gitPath: The path of the git binary. Resolved through PATH if omitted.
+        :type gitPath: str
+        :param env: The environment variables. Defaults to the current environment.
+        :type env: Mapping[str, str]
+        :param configOverrides: Configuration settings passed as "-c key=value".
+        :type configOverrides: Dict[str, str]
+        :param configPath: The global git configuration file, if any.
+        :type configPath: str
+        """
+        super().__init__()
+        variables = dict(os.environ if env is None else env)
+        if gitPath is None:
+            gitPath = shutil.which("git", path=variables.get("PATH", None)) or "git"
+        if configPath is not None:
+            variables["GIT_CONFIG_GLOBAL"] = configPath
+            variables["GIT_CONFIG_NOSYSTEM"] = "true"
+        self._git_path = gitPath
+        self._env = MappingProxyType(variables)
+        self._config_overrides = MappingProxyType(dict(configOverrides or {}))
+        self._config_path = configPath
+        self._config_args = tuple(
+            arg
+            for key, value in self._config_overrides.items()
+            for arg in ("-c", f"{key}={value}")
+        )
+        self._key = (
+            gitPath,
+            tuple(sorted(variables.items())),
+            self._config_args,
+            configPath,
+        )
+
+    @classmethod
+    def default(cls):
+        """
+        Retrieves the context shared by operations with no explicit one.
+        :return: Such context.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        if cls._default is None:
+            home_path = os.environ.get("HOME", "")
+            env = {
+                "GIT_CONFIG_GLOBAL": os.path.join(
+                    home_path, ".gitconfig-UnveilingPartner"
+                ),
+                "GIT_CONFIG_NOSYSTEM": "true",
+                **dict(os.environ),  # Include existing environment variables
+            }
+            cls._default = cls(env=env)
+        return cls._default
+
+    @classmethod
+    def set_default(cls, context):
+        """
+        Replaces the context shared by operations with no explicit one.
+        :param context: The new default context, or None to rebuild it lazily.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        """
+        cls._default = context
+
+    @classmethod
+    def register_tenant(cls, tenant: str, context):
+        """
+        Registers the context of given tenant.
+        :param tenant: The tenant.
+        :type tenant: str
+        :param context: Its context.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        """
+        cls._tenants[tenant] = context
+
+    @classmethod
+    def for_tenant(cls, tenant: str):
+        """
+        Retrieves the context of given tenant.
+        :param tenant: The tenant.
+        :type tenant: str
+        :return: Its context, or the default one if the tenant is unknown.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        return cls._tenants.get(tenant, None) or cls.default()
+
+    @property
+    @attribute
+    def git_path(self) -> str:
+        """
+        Retrieves the path of the git binary.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._git_path
+
+    @property
+    def env(self) -> Mapping[str, str]:
+        """
+        Retrieves the read-only environment variables.
+        :return: Such variables.
+        :rtype: Mapping[str, str]
+        """
+        return self._env
+
+    @property
+    @attribute
+    def config_overrides(self) -> Mapping[str, str]:
+        """
+        Retrieves the configuration settings passed as "-c key=value".
+        :return: Such settings.
+        :rtype: Mapping[str, str]
+        """
+        return self._config_overrides
+
+    @property
+    @attribute
+    def config_path(self) -> str:
+        """
+        Retrieves the global git configuration file.
+        :return: Such file, or None if the environment decides.
+        :rtype: str
+        """
+        return self._config_path
+
+    @property
+    def key(self) -> Tuple:
+        """
+        Retrieves a hashable value identifying this context: contexts with
+        equal keys run git the same way.
+        :return: Such value.
+        :rtype: Tuple
+        """
+        return self._key
+
+    def derive(
+        self,
+        env: Mapping[str, str] = None,
+        configOverrides: Dict[str, str] = None,
+        configPath: str = None,
+    ):
+        """
+        Creates a new context based on this one.
+        :param env: Environment variables to add or replace.
+        :type env: Mapping[str, str]
+        :param configOverrides: Configuration settings to add or replace.
+        :type configOverrides: Dict[str, str]
+        :param configPath: The new global git configuration file, if any.
+        :type configPath: str
+        :return: The new context.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        return self.__class__(
+            self._git_path,
+            {**self._env, **(env or {})},
+            {**self._config_overrides, **(configOverrides or {})},
+            configPath or self._config_path,
+        )
+
+    def argv(self, args: List[str]) -> Tuple[str, ...]:
+        """
+        Builds the actual command line for given git args.
+        :param args: The command-line args, starting with "git".
+        :type args: List[str]
+        :return: The args using the resolved binary and the "-c" overrides.
+        :rtype: Tuple[str, ...]
+        """
+        result = tuple(args)
+        if args and args[0] == "git":
+            result = (self._git_path,) + self._config_args + result[1:]
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,131 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_failure_classifier.py
+
+This file declares the GitFailureClassifier class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_failure_kind import GitFailureKind
+from pythoneda.shared import BaseObject
+import re
+from typing import List, Tuple
+
+
+class GitFailureClassifier(BaseObject):
+    """
+    Classifies git failures by inspecting their error output.
+
+    Class name: GitFailureClassifier
+
+    Responsibilities:
+        - Maps stderr to a GitFailureKind through ordered regex rules.
+        - Accepts custom rules, checked before the built-in ones.
+
+    Collaborators:
+        - pythoneda.shared.git.GitFailureKind: The outcome.
+        - pythoneda.shared.git.GitOperation: Classifies failed runs.
+    """
+
+    _singleton = None
+
+    # "failed to push some refs" ends every failed push, transient or not,
+    # so only the markers of a rejection denote a conflict.
+    DEFAULT_RULES = [
+        (
+            r"Permission denied|Authentication failed|could not read Username"
+            r"|could not read Password|Host key verification failed"
+            r"|Invalid username or password|returned error: 40[13]"
+            r"|HTTP 40[13]|terminal prompts disabled",
+            GitFailureKind.AUTH,
+        ),
+        (
+            r"\[rejected\]|non-fast-forward|fetch first|Updates were rejected"
+            r"|stale info|cannot lock ref|already exists",
+            GitFailureKind.CONFLICT,
+        ),
+        (
+            r"Connection reset|remote end hung up|early EOF|RPC failed"
+            r"|returned error: 5\d\d|HTTP 5\d\d|Could not resolve host"
+            r"|Connection timed out|Operation timed out|Failed to connect"
+            r"|Connection refused|Empty reply from server|SSL_read|SSL_ERROR"
+            r"|GnuTLS recv error|was not closed cleanly|kex_exchange_identification"
+            r"|Temporary failure in name resolution|temporarily unavailable"
+            r"|index\.lock': File exists|unexpected disconnect",
+            GitFailureKind.TRANSIENT,
+        ),
+    ]
+
+    def __init__(self, rules: List[Tuple[str, GitFailureKind]] = None):
+        """
+        Creates a new GitFailureClassifier instance.
+        :param rules: The (pattern, kind) rules. Defaults to the built-in ones.
+        :type rules: List[Tuple[str, pythoneda.shared.git.GitFailureKind]]
+        """
+        super().__init__()
+        self._rules = [
+            (re.compile(pattern, re.IGNORECASE), kind)
+            for pattern, kind in (
+                self.__class__.DEFAULT_RULES if rules is None else rules
+            )
+        ]
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide classifier.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitFailureClassifier
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    def add_rule(self, pattern: str, kind: GitFailureKind):
+        """
+        Adds a rule, taking precedence over the existing ones.
+        :param pattern: The regular expression to look for in stderr.
+        :type pattern: str
+        :param kind: The kind of failure it denotes.
+        :type kind: pythoneda.shared.git.GitFailureKind
+        """
+        self._rules.insert(0, (re.compile(pattern, re.IGNORECASE), kind))
+
+    def classify(self, stderr: str) -> GitFailureKind:
+        """
+        Classifies a failure.
+        :param stderr: The error output of git.
+        :type stderr: str
+        :return: The kind of failure; FATAL if no rule matches.
+        :rtype: pythoneda.shared.git.GitFailureKind
+        """
+        result = GitFailureKind.FATAL
+        for pattern, kind in self._rules:
+            if pattern.search(stderr or ""):
+                result = kind
+                break
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
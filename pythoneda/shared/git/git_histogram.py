@@ -0,0 +1,129 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_histogram.py
+
+This file declares the GitHistogram class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from bisect import bisect_left
+from pythoneda.shared import BaseObject
+from typing import Dict, List, Tuple
+
+
+class GitHistogram(BaseObject):
+    """
+    A fixed-bucket histogram of durations.
+
+    Class name: GitHistogram
+
+    Responsibilities:
+        - Counts observations per bucket, using constant memory.
+        - Keeps the sum and number of observations.
+
+    Collaborators:
+        - pythoneda.shared.git.GitMetrics: Keeps a histogram per label set.
+    """
+
+    DEFAULT_BUCKETS = (
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+    )
+
+    def __init__(self, buckets: Tuple[float, ...] = None):
+        """
+        Creates a new GitHistogram instance.
+        :param buckets: The upper bounds of the buckets, sorted.
+        :type buckets: Tuple[float, ...]
+        """
+        super().__init__()
+        self._buckets = tuple(buckets or self.__class__.DEFAULT_BUCKETS)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        """
+        Retrieves the number of observations.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        """
+        Retrieves the sum of all observations.
+        :return: Such sum.
+        :rtype: float
+        """
+        return self._sum
+
+    def observe(self, value: float):
+        """
+        Records an observation.
+        :param value: The observed value.
+        :type value: float
+        """
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        Retrieves the cumulative counts per upper bound, ending with +Inf.
+        :return: A list of (upper bound, count) tuples.
+        :rtype: List[Tuple[float, int]]
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self._buckets + (float("inf"),), self._counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def snapshot(self) -> Dict:
+        """
+        Retrieves a copy of the histogram data.
+        :return: A dictionary with the buckets, the sum and the count.
+        :rtype: Dict
+        """
+        return {"buckets": self.cumulative(), "sum": self._sum, "count": self._count}
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
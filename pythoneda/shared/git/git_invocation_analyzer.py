@@ -0,0 +1,209 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_invocation_analyzer.py
+
+This file declares the GitInvocationAnalyzer class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_scheduler import GitScheduler
+from collections import defaultdict
+import json
+from pythoneda.shared import BaseObject
+import sys
+from typing import Dict, Iterable, List
+
+
+class GitInvocationAnalyzer(BaseObject):
+    """
+    Summarizes logs written by GitInvocationRecorder.
+
+    Class name: GitInvocationAnalyzer
+
+    Responsibilities:
+        - Ranks commands by total time.
+        - Finds identical invocations repeated, candidates for caching.
+        - Finds the folders where most time is spent.
+
+    Collaborators:
+        - pythoneda.shared.git.GitInvocationRecorder: Writes the logs.
+        - pythoneda.shared.git.GitScheduler: Extracts the git subcommands.
+    """
+
+    def __init__(self, invocations: List[Dict]):
+        """
+        Creates a new GitInvocationAnalyzer instance.
+        :param invocations: The recorded invocations.
+        :type invocations: List[Dict]
+        """
+        super().__init__()
+        self._invocations = invocations
+
+    @classmethod
+    def load(cls, paths: Iterable[str]):
+        """
+        Reads the invocations from given logs, skipping truncated lines.
+        :param paths: The log files.
+        :type paths: Iterable[str]
+        :return: The analyzer.
+        :rtype: pythoneda.shared.git.GitInvocationAnalyzer
+        """
+        invocations = []
+        for path in paths:
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        invocations.append(json.loads(line))
+                    except ValueError:
+                        continue
+
+        return cls(invocations)
+
+    @property
+    def invocations(self) -> List[Dict]:
+        """
+        Retrieves the recorded invocations.
+        :return: Such invocations.
+        :rtype: List[Dict]
+        """
+        return self._invocations
+
+    @staticmethod
+    def command(argv: List[str]) -> str:
+        """
+        Names the command of given invocation: the git subcommand for git, and
+        the executable otherwise.
+        :param argv: The command-line args.
+        :type argv: List[str]
+        :return: Such name.
+        :rtype: str
+        """
+        result = argv[0] if argv else ""
+        if result.split("/")[-1] == "git":
+            subcommand = GitScheduler.subcommand(argv)
+            if subcommand is not None:
+                result = f"git {subcommand}"
+
+        return result
+
+    def _group(self, key) -> List[Dict]:
+        """
+        Groups the invocations, sorted by total time, descending.
+        :param key: A function retrieving the group of an invocation.
+        :type key: Callable
+        :return: For each group, its key, count, total and maximum time, and
+          failures.
+        :rtype: List[Dict]
+        """
+        groups = defaultdict(
+            lambda: {"count": 0, "total": 0.0, "max": 0.0, "failed": 0}
+        )
+        for invocation in self._invocations:
+            group = groups[key(invocation)]
+            wall = invocation.get("wall", 0.0)
+            group["count"] += 1
+            group["total"] += wall
+            group["max"] = max(group["max"], wall)
+            if invocation.get("code", 0) != 0:
+                group["failed"] += 1
+
+        return sorted(
+            ({"key": name, **stats} for name, stats in groups.items()),
+            key=lambda group: group["total"],
+            reverse=True,
+        )
+
+    def top_commands(self, limit: int = 10) -> List[Dict]:
+        """
+        Ranks the commands by total time.
+        :param limit: The number of commands to retrieve.
+        :type limit: int
+        :return: The commands, with their count, total and maximum time, and failures.
+        :rtype: List[Dict]
+        """
+        return self._group(lambda invocation: self.command(invocation["argv"]))[:limit]
+
+    def repeated(self, minimum: int = 2, limit: int = 10) -> List[Dict]:
+        """
+        Finds identical invocations (same argv, same folder) run several times.
+        :param minimum: The number of runs to consider an invocation repeated.
+        :type minimum: int
+        :param limit: The number of invocations to retrieve.
+        :type limit: int
+        :return: The invocations, ranked by total time, as the key (argv, folder)
+          and their count, total and maximum time, and failures.
+        :rtype: List[Dict]
+        """
+        groups = self._group(
+            lambda invocation: (tuple(invocation["argv"]), invocation.get("cwd"))
+        )
+
+        return [group for group in groups if group["count"] >= minimum][:limit]
+
+    def hot_folders(self, limit: int = 10) -> List[Dict]:
+        """
+        Ranks the folders by total time.
+        :param limit: The number of folders to retrieve.
+        :type limit: int
+        :return: The folders, with their count, total and maximum time, and failures.
+        :rtype: List[Dict]
+        """
+        return self._group(lambda invocation: invocation.get("cwd"))[:limit]
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Renders a summary of the invocations.
+        :param limit: The number of entries in each section.
+        :type limit: int
+        :return: The summary.
+        :rtype: str
+        """
+        total = sum(invocation.get("wall", 0.0) for invocation in self._invocations)
+        lines = [f"{len(self._invocations)} invocations, {total:.3f}s in total", ""]
+        sections = [
+            ("Top commands by total time", self.top_commands(limit), str),
+            (
+                "Repeated identical invocations",
+                self.repeated(limit=limit),
+                lambda key: f"{' '.join(key[0])} (in {key[1]})",
+            ),
+            ("Folders by total time", self.hot_folders(limit), str),
+        ]
+        for title, groups, describe in sections:
+            lines.append(title)
+            for group in groups:
+                lines.append(
+                    f"  {group['total']:10.3f}s {group['count']:7d}x "
+                    f"max {group['max']:8.3f}s failed {group['failed']:5d}  "
+                    f"{describe(group['key'])}"
+                )
+            lines.append("")
+
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(GitInvocationAnalyzer.load(sys.argv[1:]).report())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
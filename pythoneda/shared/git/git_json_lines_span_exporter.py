@@ -0,0 +1,91 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_json_lines_span_exporter.py
+
+This file declares the GitJsonLinesSpanExporter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_span import GitSpan
+from .git_span_exporter import GitSpanExporter
+import json
+import threading
+
+
+class GitJsonLinesSpanExporter(GitSpanExporter):
+    """
+    Appends spans to a file, one JSON document per line.
+
+    Class name: GitJsonLinesSpanExporter
+
+    Responsibilities:
+        - Writes each finished span as a JSON line.
+
+    Collaborators:
+        - pythoneda.shared.git.GitSpan: The spans.
+    """
+
+    def __init__(self, path: str):
+        """
+        Creates a new GitJsonLinesSpanExporter instance.
+        :param path: The file to append the spans to.
+        :type path: str
+        """
+        super().__init__()
+        self._path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the file the spans are appended to.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    def export(self, span: GitSpan):
+        """
+        Exports given span.
+        :param span: The finished span.
+        :type span: pythoneda.shared.git.GitSpan
+        """
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
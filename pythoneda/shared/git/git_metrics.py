@@ -0,0 +1,333 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_metrics.py
+
+This file declares the GitMetrics class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import functools
+from .git_histogram import GitHistogram
+from .git_scheduler import GitScheduler
+from .github_rate_limiter import GithubRateLimiter
+import inspect
+import os
+from pythoneda.shared import BaseObject
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+class GitMetrics(BaseObject):
+    """
+    Counts and times git operations.
+
+    Class name: GitMetrics
+
+    Responsibilities:
+        - Instruments the public methods of git operations.
+        - Keeps a duration histogram per operation, method and outcome.
+        - Exports the metrics in Prometheus text format, or to a callback.
+
+    Collaborators:
+        - pythoneda.shared.git.GitHistogram: The histograms.
+        - pythoneda.shared.git.GitOperation: Gets its subclasses instrumented.
+        - pythoneda.shared.git.GitScheduler: Provides scheduling gauges.
+        - pythoneda.shared.git.GithubRateLimiter: Provides GitHub rate-limit gauges.
+    """
+
+    _singleton = None
+
+    PREFIX = "pythoneda_git"
+
+    def __init__(self):
+        """
+        Creates a new GitMetrics instance.
+        """
+        super().__init__()
+        self._enabled = True
+        self._histograms: Dict[Tuple[str, str, str], GitHistogram] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.register_gauges("scheduler", lambda: GitScheduler.instance().metrics())
+        self.register_gauges("github", lambda: GithubRateLimiter.instance().metrics())
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide metrics.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitMetrics
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Checks whether observations are recorded.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._enabled
+
+    def set_enabled(self, enabled: bool):
+        """
+        Enables or disables recording observations.
+        :param enabled: Whether to record them.
+        :type enabled: bool
+        """
+        self._enabled = enabled
+
+    def observe(self, operation: str, method: str, outcome: str, seconds: float):
+        """
+        Records a call.
+        :param operation: The operation class.
+        :type operation: str
+        :param method: The method.
+        :type method: str
+        :param outcome: "ok", or the name of the exception raised.
+        :type outcome: str
+        :param seconds: The duration.
+        :type seconds: float
+        """
+        if not self._enabled:
+            return
+        key = (operation, method, outcome)
+        with self._lock:
+            histogram = self._histograms.get(key, None)
+            if histogram is None:
+                histogram = GitHistogram()
+                self._histograms[key] = histogram
+            histogram.observe(seconds)
+
+    def register_gauges(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """
+        Registers a set of gauges, read at export time.
+        :param name: The name of the set, used as metric prefix.
+        :type name: str
+        :param provider: A callable returning the gauge values by name. A gauge
+          with labels maps to a list of (labels, value) samples instead.
+        :type provider: Callable[[], Dict[str, Any]]
+        """
+        self._gauges[name] = provider
+
+    def reset(self):
+        """
+        Discards all observations.
+        """
+        with self._lock:
+            self._histograms = {}
+
+    def snapshot(self) -> Dict:
+        """
+        Retrieves a copy of the current metrics.
+        :return: A dictionary with the histograms per (operation, method, outcome),
+          and the gauges per set.
+        :rtype: Dict
+        """
+        with self._lock:
+            histograms = {
+                key: histogram.snapshot() for key, histogram in self._histograms.items()
+            }
+
+        return {
+            "histograms": histograms,
+            "gauges": {name: provider() for name, provider in self._gauges.items()},
+        }
+
+    def export(self, callback: Callable[[Dict], None]):
+        """
+        Sends a snapshot of the metrics to given callback.
+        :param callback: The callback.
+        :type callback: Callable[[Dict], None]
+        """
+        callback(self.snapshot())
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """
+        Escapes a label value.
+        :param value: The value.
+        :type value: str
+        :return: The escaped value.
+        :rtype: str
+        """
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def prometheus(self) -> str:
+        """
+        Renders the metrics in Prometheus text format.
+        :return: Such text.
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        name = f"{self.__class__.PREFIX}_operation_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of git operations.",
+            f"# TYPE {name} histogram",
+        ]
+        for (operation, method, outcome), data in sorted(
+            snapshot["histograms"].items()
+        ):
+            labels = (
+                f'operation="{self._escape(operation)}",'
+                f'method="{self._escape(method)}",'
+                f'outcome="{self._escape(outcome)}"'
+            )
+            for bound, count in data["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {data['sum']!r}")
+            lines.append(f"{name}_count{{{labels}}} {data['count']}")
+        for group, values in sorted(snapshot["gauges"].items()):
+            for key, value in sorted(values.items()):
+                gauge = f"{self.__class__.PREFIX}_{group}_{key}"
+                lines.append(f"# TYPE {gauge} gauge")
+                if not isinstance(value, list):
+                    lines.append(f"{gauge} {value!r}")
+                    continue
+                for sample, number in sorted(
+                    value, key=lambda item: sorted(item[0].items())
+                ):
+                    labels = ",".join(
+                        f'{label}="{self._escape(str(text))}"'
+                        for label, text in sorted(sample.items())
+                    )
+                    lines.append(f"{gauge}{{{labels}}} {number!r}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+        Writes the metrics to a Prometheus text file, atomically.
+        :param path: The file, typically read by node_exporter's textfile collector.
+        :type path: str
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        (fd, temporary) = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(self.prometheus())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @classmethod
+    def instrument(cls, target: type):
+        """
+        Wraps the public methods a class defines so every call is observed.
+        Names starting with "set_", and those listed in the class'
+        _uninstrumented attribute, are left alone.
+        :param target: The class.
+        :type target: type
+        """
+        skipped = getattr(target, "_uninstrumented", ())
+        for name, member in list(vars(target).items()):
+            if name.startswith("_") or name.startswith("set_") or name in skipped:
+                continue
+            if isinstance(member, classmethod):
+                wrapped = classmethod(cls._wrap(target, name, member.__func__))
+            elif inspect.isfunction(member):
+                wrapped = cls._wrap(target, name, member)
+            else:
+                continue
+            setattr(target, name, wrapped)
+
+    @classmethod
+    def _wrap(cls, target: type, name: str, function: Callable) -> Callable:
+        """
+        Wraps a function so its calls are observed.
+        :param target: The class defining it.
+        :type target: type
+        :param name: The method name.
+        :type name: str
+        :param function: The function.
+        :type function: Callable
+        :return: The wrapper.
+        :rtype: Callable
+        """
+        operation = target.__name__
+        metrics = cls.instance
+
+        if inspect.isasyncgenfunction(function):
+
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "ok"
+                stream = function(*args, **kwargs)
+                try:
+                    async for item in stream:
+                        yield item
+                except GeneratorExit:
+                    # the caller stopped iterating early
+                    raise
+                except BaseException as err:
+                    outcome = type(err).__name__
+                    raise
+                finally:
+                    await stream.aclose()
+                    metrics().observe(
+                        operation, name, outcome, time.perf_counter() - started
+                    )
+
+        elif inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "ok"
+                try:
+                    return await function(*args, **kwargs)
+                except BaseException as err:
+                    outcome = type(err).__name__
+                    raise
+                finally:
+                    metrics().observe(
+                        operation, name, outcome, time.perf_counter() - started
+                    )
+
+        else:
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "ok"
+                try:
+                    return function(*args, **kwargs)
+                except BaseException as err:
+                    outcome = type(err).__name__
+                    raise
+                finally:
+                    metrics().observe(
+                        operation, name, outcome, time.perf_counter() - started
+                    )
+
+        return wrapper
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,13 +20,28 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
-from git import Repo
-import os
+import asyncio
+import concurrent.futures
+import contextvars
+from .git_cat_file_pool import GitCatFilePool
+from .git_execution_context import GitExecutionContext
+from .git_failure_classifier import GitFailureClassifier
+from .git_failure_kind import GitFailureKind
+from .git_invocation_recorder import GitInvocationRecorder
+from .git_metrics import GitMetrics
+from .git_operation_timed_out import GitOperationTimedOut
+from .git_process import GitProcess
+from .git_read_backend import GitReadBackend
+from .git_read_backends import GitReadBackends
+from .git_replay import GitReplay
+from .git_repo_registry import GitRepoRegistry
+from .git_result import GitResult
+from .git_retry_policy import GitRetryPolicy
+from .git_scheduler import GitScheduler
+from .git_stream_failed import GitStreamFailed
+from .git_tracer import GitTracer
 from pythoneda.shared import attribute, BaseObject
-from pythoneda.shared.shell import AsyncShell
-import shlex
-import subprocess
-from typing import List
+from typing import AsyncIterator, List, Tuple, Type, Union
 
 
 class GitOperation(BaseObject, abc.ABC):
@@ -37,23 +52,56 @@ class GitOperation(BaseObject, abc.ABC):
 
     Responsibilities:
         - Provides common logic for subclasses.
+        - Runs git, either buffering or streaming its output.
+        - Gets the public methods of its subclasses counted, timed and traced.
 
     Collaborators:
-        - None
+        - pythoneda.shared.git.GitMetrics: Records every operation call.
+        - pythoneda.shared.git.GitTracer: Wraps operations and git runs in spans.
+        - pythoneda.shared.git.GitInvocationRecorder: Logs every git run.
+        - pythoneda.shared.git.GitReplay: Records or fakes git runs, if set.
+        - pythoneda.shared.git.GitScheduler: Decides when git can run.
+        - pythoneda.shared.git.GitExecutionContext: The environment git runs in.
     """
 
-    def __init__(self, folder: str, isGitRepo: bool = True):
+    STREAM_MODES = {"chunks": None, "lines": b"\n", "records": b"\0"}
+
+    _default_timeout = None
+
+    _retry_policy = None
+
+    _replay = None
+
+    _uninstrumented = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Instruments the public methods of each subclass.
+        """
+        super().__init_subclass__(**kwargs)
+        GitTracer.instrument(cls)
+        GitMetrics.instrument(cls)
+
+    def __init__(
+        self,
+        folder: str,
+        isGitRepo: bool = True,
+        context: GitExecutionContext = None,
+    ):
         """
         Creates a new GitOperation instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
         :param isGitRepo: Whether the given folder is a git repository or not.
         :type isGitRepo: bool
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
         super().__init__()
         self._folder = folder
-        if isGitRepo:
-            self._repo = Repo(self.folder)
+        self._context = context
+        self._is_git_repo = isGitRepo
+        self._read_backend = None
 
     @property
     @attribute
@@ -65,38 +113,493 @@ class GitOperation(BaseObject, abc.ABC):
         """
         return self._folder
 
+    @classmethod
+    def default_timeout(cls) -> float:
+        """
+        Retrieves the timeout applied to this kind of operation.
+        :return: Such timeout in seconds, or None to wait forever.
+        :rtype: float
+        """
+        return cls._default_timeout
+
+    @classmethod
+    def set_default_timeout(cls, timeout: float):
+        """
+        Changes the timeout applied to this kind of operation, and its subclasses
+        unless they define their own.
+        :param timeout: The timeout in seconds, or None to wait forever.
+        :type timeout: float
+        """
+        cls._default_timeout = timeout
+
+    @classmethod
+    def retry_policy(cls) -> GitRetryPolicy:
+        """
+        Retrieves the retry policy applied to this kind of operation.
+        :return: Such policy, or None if failures are not retried.
+        :rtype: pythoneda.shared.git.GitRetryPolicy
+        """
+        return cls._retry_policy
+
+    @classmethod
+    def set_retry_policy(cls, policy: GitRetryPolicy):
+        """
+        Changes the retry policy applied to this kind of operation, and its
+        subclasses unless they define their own.
+        :param policy: The policy, or None not to retry.
+        :type policy: pythoneda.shared.git.GitRetryPolicy
+        """
+        cls._retry_policy = policy
+
+    @classmethod
+    def replay(cls) -> GitReplay:
+        """
+        Retrieves the replay this kind of operation runs through.
+        :return: Such replay, or None to run git.
+        :rtype: pythoneda.shared.git.GitReplay
+        """
+        return cls._replay
+
+    @classmethod
+    def set_replay(cls, replay: GitReplay):
+        """
+        Makes this kind of operation, and its subclasses unless they define
+        their own, record git results into, or serve them from, given replay.
+        :param replay: The replay, or None to run git.
+        :type replay: pythoneda.shared.git.GitReplay
+        """
+        cls._replay = replay
+
+    @property
+    def context(self) -> GitExecutionContext:
+        """
+        Retrieves the context git processes run in.
+        :return: Such context.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        return self._context or GitExecutionContext.default()
+
     @property
     def repo(self):
         """
-        Retrieves the GitPython repository.
-        :return: Such instance.
+        Retrieves the GitPython repository, opening it on first access.
+        :return: Such instance, or None if the folder is not a git repository.
         :rtype: git.Repo
         """
-        return self._repo
+        result = None
+        if self._is_git_repo:
+            result = GitRepoRegistry.instance().get(self.folder)
 
-    async def run(self, args: List[str]):
+        return result
+
+    @property
+    def read_backend(self) -> Type[GitReadBackend]:
+        """
+        Retrieves the read backend preferred by this operation.
+        :return: Such backend class, or None to use the fastest available.
+        :rtype: Type[pythoneda.shared.git.GitReadBackend]
+        """
+        return self._read_backend
+
+    def set_read_backend(self, backendClass: Type[GitReadBackend]):
+        """
+        Chooses the read backend preferred by this operation.
+        :param backendClass: The backend class, or None to use the fastest available.
+        :type backendClass: Type[pythoneda.shared.git.GitReadBackend]
+        """
+        self._read_backend = backendClass
+
+    def backend_for(self, operation: str) -> GitReadBackend:
+        """
+        Retrieves the backend answering given read operation.
+        :param operation: The operation, as declared in GitReadBackend.
+        :type operation: str
+        :return: The backend.
+        :rtype: pythoneda.shared.git.GitReadBackend
+        """
+        return GitReadBackends.select(
+            self.folder, operation, self._read_backend, self._context, self
+        )
+
+    @property
+    def cat_file_pool(self) -> GitCatFilePool:
+        """
+        Retrieves the pool of "git cat-file" workers shared by all operations.
+        :return: Such pool.
+        :rtype: pythoneda.shared.git.GitCatFilePool
+        """
+        return GitCatFilePool.instance()
+
+    @property
+    def scheduler(self) -> GitScheduler:
+        """
+        Retrieves the scheduler deciding when git processes can run.
+        :return: Such scheduler.
+        :rtype: pythoneda.shared.git.GitScheduler
+        """
+        return GitScheduler.instance()
+
+    async def read_object(self, rev: str) -> Union[Tuple[str, str, int, bytes], None]:
+        """
+        Reads an object through a persistent "git cat-file --batch" worker.
+        :param rev: The object name, in any form "git rev-parse" accepts.
+        :type rev: str
+        :return: A tuple (sha, type, size, content), or None if missing.
+        :rtype: Union[Tuple[str, str, int, bytes], None]
+        :raise pythoneda.shared.git.GitCatFileFailed: If the worker fails.
+        """
+        return await self.cat_file_pool.read(self.folder, rev, self.context)
+
+    async def read_object_header(self, rev: str) -> Union[Tuple[str, str, int], None]:
+        """
+        Reads an object header through a persistent "git cat-file --batch-check" worker.
+        :param rev: The object name, in any form "git rev-parse" accepts.
+        :type rev: str
+        :return: A tuple (sha, type, size), or None if missing.
+        :rtype: Union[Tuple[str, str, int], None]
+        :raise pythoneda.shared.git.GitCatFileFailed: If the worker fails.
+        """
+        return await self.cat_file_pool.read_header(self.folder, rev, self.context)
+
+    async def run(
+        self,
+        args: List[str],
+        timeout: float = None,
+        input: bytes = None,
+        spillThreshold: int = None,
+    ) -> GitResult:
         """
         Runs given operation.
+        Cancelling the caller terminates the whole process group.
         :param args: The command-line args.
         :type args: List[str]
-        :return: A tuple containing the return code, the stdout, and the stderr.
-        :rtype: tuple(int, str, str)
+        :param timeout: The timeout in seconds. Defaults to the one of the class.
+        :type timeout: float
+        :param input: The data to write to the standard input of git, if any.
+        :type input: bytes
+        :param spillThreshold: If set, the standard output moves to a temporary
+          file, exposed through GitResult.output, beyond this size in bytes.
+        :type spillThreshold: int
+        :return: The result, which also unpacks as (code, stdout, stderr).
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the timeout expires.
         """
-        result = (None, None, None)
+        if timeout is None:
+            timeout = self.__class__.default_timeout()
 
-        home_path = os.environ.get("HOME")
+        with GitTracer.instance().span(
+            f"git {GitScheduler.subcommand(args)}",
+            argv=GitInvocationRecorder.redact(args),
+            folder=self.folder,
+        ) as span:
+            async with self.scheduler.slot(self.folder, args):
+                replay = self.__class__.replay()
+                if replay is not None and not replay.recording:
+                    result = await replay.serve(args, self.folder, timeout)
+                else:
+                    result = await self._execute(args, timeout, input, spillThreshold)
+                    if replay is not None:
+                        replay.record(result)
+            if span is not None:
+                span.set_attribute("code", result.code)
+                span.set_attribute("stdout_bytes", len(result.output))
+                span.set_attribute("stderr_bytes", len(result.stderr_bytes))
+
+        return result
+
+    def run_blocking(
+        self,
+        args: List[str],
+        timeout: float = None,
+        input: bytes = None,
+        spillThreshold: int = None,
+    ) -> GitResult:
+        """
+        Runs given operation from synchronous code, as run() does.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param timeout: The timeout in seconds. Defaults to the one of the class.
+        :type timeout: float
+        :param input: The data to write to the standard input of git, if any.
+        :type input: bytes
+        :param spillThreshold: If set, the standard output moves to a temporary
+          file, exposed through GitResult.output, beyond this size in bytes.
+        :type spillThreshold: int
+        :return: The result, which also unpacks as (code, stdout, stderr).
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the timeout expires.
+        """
+        return self._blocking(self.run(args, timeout, input, spillThreshold))
+
+    @staticmethod
+    def _blocking(coroutine):
+        """
+        Runs given coroutine to completion from synchronous code.
+        :param coroutine: The coroutine.
+        :type coroutine: Coroutine
+        :return: Its result.
+        :rtype: Any
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # called by a coroutine: its loop cannot be blocked on, so use another
+        # one in a thread of its own, keeping the current span and context
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            return executor.submit(
+                contextvars.copy_context().run, asyncio.run, coroutine
+            ).result()
+
+    async def _execute(
+        self, args: List[str], timeout: float, input: bytes, spillThreshold: int
+    ) -> GitResult:
+        """
+        Spawns git and collects its result.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param timeout: The timeout in seconds, or None to wait forever.
+        :type timeout: float
+        :param input: The data to write to the standard input of git, if any.
+        :type input: bytes
+        :param spillThreshold: The size beyond which the standard output moves
+          to a temporary file, or None to keep it in memory.
+        :type spillThreshold: int
+        :return: The result.
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the timeout expires.
+        """
+        recorder = GitInvocationRecorder.instance()
+        process = GitProcess(args, self.folder, self.context)
+        await process.start(input is not None)
+        try:
+            (code, stdout, stderr) = await process.communicate(
+                timeout, input, spillThreshold
+            )
+        except GitOperationTimedOut as err:
+            recorder.record(
+                args,
+                self.folder,
+                process.wall_time or timeout,
+                err.stdout_size,
+                err.stderr_size,
+                None,
+            )
+            raise
+        recorder.record(
+            args, self.folder, process.wall_time, len(stdout), len(stderr), code
+        )
 
-        custom_env = {
-            "GIT_CONFIG_GLOBAL": os.path.join(home_path, ".gitconfig-UnveilingPartner"),
-            "GIT_CONFIG_NOSYSTEM": "true",
-            **dict(os.environ),  # Include existing environment variables
-        }
+        return GitResult.from_process(process, stdout, stderr)
 
-        (execution, stdout, stderr) = await AsyncShell(args, self.folder).run(
-            True, custom_env
+    async def run_stream(
+        self, args: List[str], mode: str = "chunks", chunkSize: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """
+        Runs given operation, yielding its standard output while it runs.
+        Reading stops as soon as the caller stops iterating, and the process
+        is killed then. Output is read only when the caller asks for more.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param mode: "chunks" for raw chunks, "lines" for newline-terminated
+          records, or "records" for NUL-terminated records.
+        :type mode: str
+        :param chunkSize: The size of each read.
+        :type chunkSize: int
+        :return: The output, as bytes, without the record separators.
+        :rtype: AsyncIterator[bytes]
+        :raise pythoneda.shared.git.GitStreamFailed: If git exits with an error.
+        """
+        separator = self.__class__.STREAM_MODES[mode]
+        tracer = GitTracer.instance()
+        span = tracer.start(
+            f"git {GitScheduler.subcommand(args)}",
+            {
+                "argv": GitInvocationRecorder.redact(args),
+                "folder": self.folder,
+                "stream": mode,
+            },
         )
+        error = None
+        replay = self.__class__.replay()
+        if replay is not None and not replay.recording:
+            stream = self._replay_stream(replay, args, separator, chunkSize)
+        else:
+            stream = self._stream(args, separator, chunkSize, replay)
+        try:
+            async for item in stream:
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            # kills git now if the caller stopped early, not when collected
+            await stream.aclose()
+            tracer.end(span, error)
+
+    async def _stream(
+        self,
+        args: List[str],
+        separator: bytes,
+        chunkSize: int,
+        replay: GitReplay = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Runs given operation, yielding its standard output while it runs.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param separator: The record separator, or None for raw chunks.
+        :type separator: bytes
+        :param chunkSize: The size of each read.
+        :type chunkSize: int
+        :param replay: The replay recording complete runs, if any.
+        :type replay: pythoneda.shared.git.GitReplay
+        :return: The output, as bytes, without the record separators.
+        :rtype: AsyncIterator[bytes]
+        :raise pythoneda.shared.git.GitStreamFailed: If git exits with an error.
+        """
+        async with self.scheduler.slot(self.folder, args):
+            process = GitProcess(args, self.folder, self.context)
+            await process.start()
+            errors = asyncio.get_running_loop().create_task(process.stderr.read())
+            finished = False
+            size = 0
+            captured = None if replay is None else bytearray()
+            try:
+                pending = bytearray()
+                while True:
+                    chunk = await process.stdout.read(chunkSize)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if captured is not None:
+                        captured += chunk
+                    if separator is None:
+                        yield chunk
+                        continue
+                    pending += chunk
+                    start = 0
+                    end = pending.find(separator)
+                    while end != -1:
+                        yield bytes(pending[start:end])
+                        start = end + 1
+                        end = pending.find(separator, start)
+                    del pending[:start]
+                if pending:
+                    yield bytes(pending)
+                finished = True
+            finally:
+                if not finished:
+                    await process.terminate(0)
+                code = await process.wait()
+                stderr = await errors
+                GitInvocationRecorder.instance().record(
+                    args, self.folder, process.wall_time, size, len(stderr), code
+                )
+                if finished and captured is not None:
+                    replay.record(
+                        GitResult(
+                            args,
+                            self.folder,
+                            code,
+                            bytes(captured),
+                            stderr,
+                            process.wall_time,
+                        )
+                    )
+
+        if code != 0:
+            raise GitStreamFailed(
+                args, self.folder, code, stderr.decode("utf-8", "replace")
+            )
+
+    async def _replay_stream(
+        self, replay: GitReplay, args: List[str], separator: bytes, chunkSize: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the recorded standard output of given operation, as if it ran.
+        :param replay: The replay serving the recorded result.
+        :type replay: pythoneda.shared.git.GitReplay
+        :param args: The command-line args.
+        :type args: List[str]
+        :param separator: The record separator, or None for raw chunks.
+        :type separator: bytes
+        :param chunkSize: The size of each chunk.
+        :type chunkSize: int
+        :return: The output, as bytes, without the record separators.
+        :rtype: AsyncIterator[bytes]
+        :raise pythoneda.shared.git.GitReplayNotFound: If it was not recorded.
+        :raise pythoneda.shared.git.GitStreamFailed: If git exited with an error.
+        """
+        async with self.scheduler.slot(self.folder, args):
+            result = await replay.serve(args, self.folder)
+        output = result.stdout_bytes
+        if separator is None:
+            for start in range(0, len(output), chunkSize):
+                yield output[start : start + chunkSize]
+        elif output:
+            records = output.split(separator)
+            if records[-1] == b"":
+                records.pop()
+            for record in records:
+                yield record
+        if result.code != 0:
+            raise GitStreamFailed(args, self.folder, result.code, result.stderr)
+
+    async def run_with_retry(
+        self, args: List[str], policy: GitRetryPolicy = None, timeout: float = None
+    ) -> GitResult:
+        """
+        Runs given operation, retrying failures its retry policy deems recoverable.
+        Timeouts count as transient failures.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param policy: The retry policy. Defaults to the one of the class.
+        :type policy: pythoneda.shared.git.GitRetryPolicy
+        :param timeout: The timeout of each attempt, in seconds.
+        :type timeout: float
+        :return: The result of the last attempt, with its failure kind and the
+          number of attempts.
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the last attempt
+          timed out.
+        """
+        if policy is None:
+            policy = self.__class__.retry_policy()
+        if policy is not None:
+            policy.budget.deposit()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await self.run(args, timeout)
+                kind = None
+                if not result.succeeded:
+                    kind = GitFailureClassifier.instance().classify(result.stderr)
+            except GitOperationTimedOut:
+                if policy is None or not policy.should_retry(
+                    GitFailureKind.TRANSIENT, attempt
+                ):
+                    raise
+                kind = GitFailureKind.TRANSIENT
+            else:
+                if (
+                    kind is None
+                    or policy is None
+                    or not policy.should_retry(kind, attempt)
+                ):
+                    break
+            delay = policy.delay(attempt)
+            self.__class__.logger().warning(
+                f'"{" ".join(args)}" failed ({kind.value}), retrying in {delay:.2f}s'
+            )
+            await asyncio.sleep(delay)
 
-        return (execution.returncode, stdout, stderr)
+        return result.with_retries(kind, attempt)
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -0,0 +1,135 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_operation_timed_out.py
+
+This file defines the GitOperationTimedOut exception class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+from typing import List
+
+
+class GitOperationTimedOut(Exception, BaseObject):
+    """
+    A git command did not finish in time.
+
+    Class name: GitOperationTimedOut
+
+    Responsibilities:
+        - Represent the error when a git command exceeds its timeout.
+        - Keep the output produced before the process was killed.
+
+    Collaborators:
+        - None
+    """
+
+    def __init__(
+        self,
+        args: List[str],
+        folder: str,
+        timeout: float,
+        stdout: str,
+        stderr: str,
+        stdoutSize: int = None,
+        stderrSize: int = None,
+    ):
+        """
+        Creates a new GitOperationTimedOut instance.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param folder: The folder with the cloned repository.
+        :type folder: str
+        :param timeout: The timeout, in seconds.
+        :type timeout: float
+        :param stdout: The end of the standard output produced so far.
+        :type stdout: str
+        :param stderr: The end of the standard error produced so far.
+        :type stderr: str
+        :param stdoutSize: The bytes of standard output produced so far.
+          Defaults to the size of stdout, encoded as UTF-8.
+        :type stdoutSize: int
+        :param stderrSize: The bytes of standard error produced so far.
+          Defaults to the size of stderr, encoded as UTF-8.
+        :type stderrSize: int
+        """
+        super().__init__(
+            f'"{" ".join(args)}" in folder {folder} timed out after {timeout}s'
+        )
+        self._timeout = timeout
+        self._stdout = stdout
+        self._stderr = stderr
+        if stdoutSize is None:
+            stdoutSize = len(stdout.encode("utf-8", "surrogateescape"))
+        self._stdout_size = stdoutSize
+        if stderrSize is None:
+            stderrSize = len(stderr.encode("utf-8", "surrogateescape"))
+        self._stderr_size = stderrSize
+
+    @property
+    def timeout(self) -> float:
+        """
+        Retrieves the timeout.
+        :return: Such timeout, in seconds.
+        :rtype: float
+        """
+        return self._timeout
+
+    @property
+    def stdout(self) -> str:
+        """
+        Retrieves the end of the standard output produced before the timeout.
+        :return: Such output.
+        :rtype: str
+        """
+        return self._stdout
+
+    @property
+    def stderr(self) -> str:
+        """
+        Retrieves the end of the standard error produced before the timeout.
+        :return: Such output.
+        :rtype: str
+        """
+        return self._stderr
+
+    @property
+    def stdout_size(self) -> int:
+        """
+        Retrieves the size of the standard output produced before the timeout.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._stdout_size
+
+    @property
+    def stderr_size(self) -> int:
+        """
+        Retrieves the size of the standard error produced before the timeout.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._stderr_size
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,183 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_output.py
+
+This file declares the GitOutput class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import mmap
+from pythoneda.shared import BaseObject
+from typing import IO, Iterator
+
+
+class GitOutput(BaseObject):
+    """
+    The undecoded output of git, in memory or mapped from a temporary file.
+
+    Class name: GitOutput
+
+    Responsibilities:
+        - Exposes the output as zero-copy memoryview slices.
+        - Decodes the output only when asked to.
+        - Releases the temporary file, if any, when closed.
+
+    Collaborators:
+        - pythoneda.shared.git.GitOutputBuffer: Builds instances.
+        - pythoneda.shared.git.GitResult: Keeps the output of git runs.
+    """
+
+    def __init__(self, data: bytes = b"", file: IO[bytes] = None):
+        """
+        Creates a new GitOutput instance.
+        :param data: The output, when kept in memory.
+        :type data: bytes
+        :param file: The temporary file holding the output, when spilled to disk.
+        :type file: IO[bytes]
+        """
+        super().__init__()
+        self._file = file
+        self._map = None
+        if file is None:
+            self._data = data
+        else:
+            file.flush()
+            size = file.seek(0, 2)
+            if size == 0:
+                self._data = b""
+            else:
+                self._map = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+                self._data = self._map
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Checks whether the output lives in a temporary file.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._file is not None
+
+    @property
+    def closed(self) -> bool:
+        """
+        Checks whether the output has been released.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._data is None
+
+    def __len__(self) -> int:
+        """
+        Retrieves the size of the output.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return len(self._data)
+
+    def view(self, start: int = 0, end: int = None) -> memoryview:
+        """
+        Retrieves a slice of the output, without copying it.
+        The view must be released before closing the output.
+        :param start: The first byte.
+        :type start: int
+        :param end: The byte after the last one, or None for the end.
+        :type end: int
+        :return: The slice.
+        :rtype: memoryview
+        """
+        return memoryview(self._data)[start:end]
+
+    def lines(self) -> Iterator[memoryview]:
+        """
+        Iterates over the lines of the output, without copying them.
+        :return: Each line, without its newline.
+        :rtype: Iterator[memoryview]
+        """
+        data = self._data
+        view = memoryview(data)
+        start = 0
+        size = len(data)
+        while start < size:
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = size
+            yield view[start:end]
+            start = end + 1
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        """
+        Decodes the whole output.
+        :param encoding: The encoding.
+        :type encoding: str
+        :param errors: How to handle undecodable bytes, as in bytes.decode().
+        :type errors: str
+        :return: The text.
+        :rtype: str
+        """
+        return str(self._data[:], encoding, errors)
+
+    def __bytes__(self) -> bytes:
+        """
+        Copies the whole output.
+        :return: Such output.
+        :rtype: bytes
+        """
+        return bytes(self._data[:])
+
+    def __str__(self) -> str:
+        """
+        Decodes the whole output as UTF-8.
+        :return: The text.
+        :rtype: str
+        """
+        return self.decode("utf-8", "replace")
+
+    def close(self):
+        """
+        Releases the mapping and the temporary file, if any.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._data = None
+
+    def __enter__(self):
+        """
+        Uses the output as a context manager, closing it on exit.
+        :return: This instance.
+        :rtype: pythoneda.shared.git.GitOutput
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+        Closes the output.
+        """
+        self.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
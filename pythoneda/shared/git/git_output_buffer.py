@@ -0,0 +1,159 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_output_buffer.py
+
+This file declares the GitOutputBuffer class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_output import GitOutput
+import os
+from pythoneda.shared import BaseObject
+import tempfile
+
+
+class GitOutputBuffer(BaseObject):
+    """
+    Accumulates git output in memory, spilling it to a temporary file once it
+    grows beyond a threshold.
+
+    Class name: GitOutputBuffer
+
+    Responsibilities:
+        - Collects output chunks.
+        - Moves them to an anonymous temporary file past the threshold.
+        - Produces a GitOutput, mapped from the file if it spilled.
+
+    Collaborators:
+        - pythoneda.shared.git.GitOutput: The collected output.
+        - pythoneda.shared.git.GitProcess: Drains git into buffers.
+    """
+
+    _spill_threshold = 64 * 1024 * 1024
+
+    def __init__(self, spillThreshold: int = None):
+        """
+        Creates a new GitOutputBuffer instance.
+        :param spillThreshold: The size in bytes beyond which the output moves to
+          disk. Defaults to the one of the class.
+        :type spillThreshold: int
+        """
+        super().__init__()
+        if spillThreshold is None:
+            spillThreshold = self.__class__.spill_threshold()
+        self._threshold = spillThreshold
+        self._memory = bytearray()
+        self._file = None
+        self._size = 0
+
+    @classmethod
+    def spill_threshold(cls) -> int:
+        """
+        Retrieves the default size beyond which output moves to disk.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return cls._spill_threshold
+
+    @classmethod
+    def set_spill_threshold(cls, threshold: int):
+        """
+        Changes the default size beyond which output moves to disk.
+        :param threshold: Such size, in bytes.
+        :type threshold: int
+        """
+        cls._spill_threshold = threshold
+
+    def __len__(self) -> int:
+        """
+        Retrieves the size collected so far.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._size
+
+    def extend(self, chunk: bytes):
+        """
+        Appends a chunk.
+        :param chunk: The chunk.
+        :type chunk: bytes
+        """
+        self._size += len(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._memory += chunk
+        if self._size > self._threshold:
+            self._file = tempfile.TemporaryFile(prefix="pythoneda-git-")
+            self._file.write(self._memory)
+            self._memory = bytearray()
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        """
+        Decodes what has been collected so far.
+        :param encoding: The encoding.
+        :type encoding: str
+        :param errors: How to handle undecodable bytes, as in bytes.decode().
+        :type errors: str
+        :return: The text.
+        :rtype: str
+        """
+        if self._file is None:
+            return self._memory.decode(encoding, errors)
+        with self.finish() as output:
+            return output.decode(encoding, errors)
+
+    def tail(self, size: int) -> bytes:
+        """
+        Retrieves the end of what has been collected so far, without reading
+        the rest.
+        :param size: The most bytes to retrieve.
+        :type size: int
+        :return: Such bytes.
+        :rtype: bytes
+        """
+        if self._file is None:
+            return bytes(self._memory[-size:])
+        self._file.seek(max(0, self._size - size))
+        result = self._file.read()
+        self._file.seek(0, os.SEEK_END)
+
+        return result
+
+    def finish(self) -> GitOutput:
+        """
+        Hands the collected output over. The buffer must not be used afterwards.
+        :return: The output.
+        :rtype: pythoneda.shared.git.GitOutput
+        """
+        if self._file is None:
+            result = GitOutput(bytes(self._memory))
+        else:
+            result = GitOutput(file=self._file)
+        self._memory = None
+        self._file = None
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
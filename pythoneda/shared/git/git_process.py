@@ -0,0 +1,384 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_process.py
+
+This file declares the GitProcess class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .git_execution_context import GitExecutionContext
+from .git_operation_timed_out import GitOperationTimedOut
+from .git_output import GitOutput
+from .git_output_buffer import GitOutputBuffer
+import os
+from pythoneda.shared import attribute, BaseObject
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple, Union
+
+
+class GitProcess(BaseObject):
+    """
+    A running git child process.
+
+    Class name: GitProcess
+
+    Responsibilities:
+        - Spawns git in its own process group, within an execution context,
+          keeping its controlling terminal for ssh prompts.
+        - Exposes its output streams.
+        - Kills the whole process group on demand, on timeout or on cancellation.
+        - Reaps itself with wait4, measuring wall time and resource usage.
+
+    Collaborators:
+        - pythoneda.shared.git.GitExecutionContext: Provides the binary and env.
+        - pythoneda.shared.git.GitOperation: Runs and streams git through it.
+    """
+
+    TERMINATION_GRACE = 2.0
+
+    # the most of each output a timeout error carries, from its end
+    PARTIAL_OUTPUT = 64 * 1024
+
+    def __init__(self, args: List[str], folder: str, context: GitExecutionContext):
+        """
+        Creates a new GitProcess instance.
+        :param args: The command-line args, starting with "git".
+        :type args: List[str]
+        :param folder: The folder to run git in.
+        :type folder: str
+        :param context: The execution context.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        """
+        super().__init__()
+        self._args = args
+        self._folder = folder
+        self._context = context
+        self._process = None
+        self._stdin = None
+        self._stdout = None
+        self._stderr = None
+        self._exit = None
+        self._returncode = None
+        self._rusage = None
+        self._started_at = None
+        self._finished_at = None
+
+    @property
+    @attribute
+    def args(self) -> List[str]:
+        """
+        Retrieves the command-line args.
+        :return: Such args.
+        :rtype: List[str]
+        """
+        return self._args
+
+    @property
+    @attribute
+    def folder(self) -> str:
+        """
+        Retrieves the folder git runs in.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    @property
+    def pid(self) -> int:
+        """
+        Retrieves the process id.
+        :return: Such id, or None if not started.
+        :rtype: int
+        """
+        return None if self._process is None else self._process.pid
+
+    @property
+    def stdout(self) -> asyncio.StreamReader:
+        """
+        Retrieves the standard output.
+        :return: Such stream.
+        :rtype: asyncio.StreamReader
+        """
+        return self._stdout
+
+    @property
+    def stderr(self) -> asyncio.StreamReader:
+        """
+        Retrieves the standard error.
+        :return: Such stream.
+        :rtype: asyncio.StreamReader
+        """
+        return self._stderr
+
+    @property
+    def returncode(self) -> int:
+        """
+        Retrieves the exit code.
+        :return: Such code, or None if still running.
+        :rtype: int
+        """
+        return self._returncode
+
+    @property
+    def wall_time(self) -> float:
+        """
+        Retrieves the elapsed time between spawning and reaping the process.
+        :return: Such time in seconds, or None if still running.
+        :rtype: float
+        """
+        result = None
+        if self._finished_at is not None:
+            result = self._finished_at - self._started_at
+
+        return result
+
+    @property
+    def rusage(self):
+        """
+        Retrieves the resources used by the process, as reported by wait4.
+        :return: Such usage, or None if still running.
+        :rtype: resource.struct_rusage
+        """
+        return self._rusage
+
+    async def start(self, withInput: bool = False):
+        """
+        Spawns the process.
+        :param withInput: Whether the process reads from its standard input.
+        :type withInput: bool
+        """
+        loop = asyncio.get_running_loop()
+        self._started_at = time.monotonic()
+        self._process = subprocess.Popen(
+            self._context.argv(self._args),
+            cwd=self._folder,
+            env=self._context.env,
+            stdin=subprocess.PIPE if withInput else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # a new session would detach git and ssh from the terminal their
+            # passphrase and host key prompts need: a process group suffices
+            **self.__class__._process_group(),
+        )
+        self._exit = loop.create_task(self._reap())
+        self._stdout = await self._connect_reader(loop, self._process.stdout)
+        self._stderr = await self._connect_reader(loop, self._process.stderr)
+        if withInput:
+            (transport, protocol) = await loop.connect_write_pipe(
+                asyncio.streams.FlowControlMixin, self._process.stdin
+            )
+            self._stdin = asyncio.StreamWriter(transport, protocol, None, loop)
+
+    @staticmethod
+    def _process_group() -> Dict:
+        """
+        Retrieves the Popen arguments spawning a child in a new process group.
+        :return: Such arguments.
+        :rtype: Dict
+        """
+        if sys.version_info >= (3, 11):
+            return {"process_group": 0}
+        return {"preexec_fn": os.setpgrp}
+
+    @staticmethod
+    async def _connect_reader(loop: asyncio.AbstractEventLoop, pipe):
+        """
+        Wraps given pipe in an asyncio stream.
+        :param loop: The event loop.
+        :type loop: asyncio.AbstractEventLoop
+        :param pipe: The pipe.
+        :type pipe: io.BufferedReader
+        :return: The stream.
+        :rtype: asyncio.StreamReader
+        """
+        result = asyncio.StreamReader(loop=loop)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(result, loop=loop), pipe
+        )
+
+        return result
+
+    async def _reap(self):
+        """
+        Waits for the process to exit and collects its status and resource usage.
+        Uses a pidfd when the platform offers it, and a worker thread otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        pid = self._process.pid
+        pidfd = None
+        try:
+            pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            pidfd = None
+        if pidfd is None:
+            (_, status, rusage) = await loop.run_in_executor(None, os.wait4, pid, 0)
+        else:
+            exited = loop.create_future()
+            loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+            try:
+                await exited
+            finally:
+                loop.remove_reader(pidfd)
+                os.close(pidfd)
+            (_, status, rusage) = os.wait4(pid, 0)
+        self._finished_at = time.monotonic()
+        self._rusage = rusage
+        self._returncode = os.waitstatus_to_exitcode(status)
+        # Tell Popen the child is gone, so it never waits for it again.
+        self._process.returncode = self._returncode
+
+    def kill(self, sig: int = signal.SIGKILL):
+        """
+        Sends a signal to the whole process group.
+        :param sig: The signal.
+        :type sig: int
+        """
+        if self._process is not None and self._returncode is None:
+            try:
+                os.killpg(self._process.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    async def wait(self) -> int:
+        """
+        Waits for the process to exit.
+        :return: The exit code.
+        :rtype: int
+        """
+        await asyncio.shield(self._exit)
+
+        return self._returncode
+
+    async def terminate(self, grace: float = None):
+        """
+        Terminates the whole process group, killing it if it does not exit in time.
+        :param grace: Seconds to wait after SIGTERM before sending SIGKILL.
+        :type grace: float
+        """
+        if grace is None:
+            grace = self.__class__.TERMINATION_GRACE
+        self.kill(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(asyncio.shield(self.wait()), grace)
+        except asyncio.TimeoutError:
+            self.kill(signal.SIGKILL)
+            await self.wait()
+
+    @staticmethod
+    async def _drain(
+        stream: asyncio.StreamReader, buffer: Union[bytearray, GitOutputBuffer]
+    ):
+        """
+        Reads given stream until its end.
+        :param stream: The stream.
+        :type stream: asyncio.StreamReader
+        :param buffer: The buffer to accumulate the output into.
+        :type buffer: Union[bytearray, pythoneda.shared.git.GitOutputBuffer]
+        """
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            buffer.extend(chunk)
+
+    async def _feed(self, data: bytes):
+        """
+        Writes given data to the standard input, and closes it.
+        :param data: The data.
+        :type data: bytes
+        """
+        stdin = self._stdin
+        try:
+            stdin.write(data)
+            await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            stdin.close()
+
+    async def communicate(
+        self, timeout: float = None, input: bytes = None, spillThreshold: int = None
+    ) -> Tuple[int, Union[bytes, GitOutput], bytes]:
+        """
+        Collects the output of the process until it exits.
+        If the timeout expires or the caller is cancelled, the process group
+        is terminated.
+        :param timeout: The timeout in seconds, or None to wait forever.
+        :type timeout: float
+        :param input: The data to write to the standard input, if any.
+        :type input: bytes
+        :param spillThreshold: If set, the stdout is collected as a GitOutput,
+          moved to a temporary file beyond this size in bytes.
+        :type spillThreshold: int
+        :return: A tuple containing the return code, the stdout, and the stderr.
+        :rtype: Tuple[int, Union[bytes, pythoneda.shared.git.GitOutput], bytes]
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the timeout expires.
+        """
+        if spillThreshold is None:
+            stdout = bytearray()
+        else:
+            stdout = GitOutputBuffer(spillThreshold)
+        stderr = bytearray()
+        tasks = [self._drain(self.stdout, stdout), self._drain(self.stderr, stderr)]
+        if input is not None:
+            tasks.append(self._feed(input))
+        completion = asyncio.gather(*tasks)
+        try:
+            await asyncio.wait_for(asyncio.shield(completion), timeout)
+            code = await self.wait()
+        except asyncio.TimeoutError:
+            await self.terminate()
+            await asyncio.gather(completion, return_exceptions=True)
+            limit = self.__class__.PARTIAL_OUTPUT
+            if spillThreshold is None:
+                partial = bytes(stdout[-limit:])
+            else:
+                partial = stdout.tail(limit)
+                stdout.finish().close()
+            raise GitOperationTimedOut(
+                self._args,
+                self._folder,
+                timeout,
+                partial.decode("utf-8", "replace"),
+                bytes(stderr[-limit:]).decode("utf-8", "replace"),
+                len(stdout),
+                len(stderr),
+            )
+        except asyncio.CancelledError:
+            await self.terminate()
+            await asyncio.gather(completion, return_exceptions=True)
+            raise
+
+        if spillThreshold is None:
+            stdout = bytes(stdout)
+        else:
+            stdout = stdout.finish()
+
+        return (code, stdout, bytes(stderr))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
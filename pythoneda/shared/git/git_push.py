@@ -19,10 +19,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 from .git_push_branch_failed import GitPushBranchFailed
 from .git_push_failed import GitPushFailed
 from .git_push_tags_failed import GitPushTagsFailed
+from .git_retry_policy import GitRetryPolicy
 
 
 class GitPush(GitOperation):
@@ -35,16 +37,20 @@ class GitPush(GitOperation):
         - Provides "git push" operations.
 
     Collaborators:
-        - None
+        - pythoneda.shared.git.GitRetryPolicy: Retries transient failures.
     """
 
-    def __init__(self, folder: str):
+    _retry_policy = GitRetryPolicy()
+
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitPush instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def push(self) -> bool:
         """
@@ -52,10 +58,12 @@ class GitPush(GitOperation):
         :return: True if the operation succeeds.
         :rtype: bool
         """
-        (code, stdout, stderr) = await self.run(["git", "push"])
-        if code != 0:
-            GitPush.logger().error(stderr)
-            raise GitPushFailed(self.folder, stderr)
+        result = await self.run_with_retry(["git", "push"])
+        if not result.succeeded:
+            GitPush.logger().error(result.stderr)
+            raise GitPushFailed(
+                self.folder, result.stderr, result.failure_kind, result.attempts
+            )
 
         return True
 
@@ -72,19 +80,28 @@ class GitPush(GitOperation):
             args.append("-u")
             args.append(remote)
         args.append(branch)
-        (code, stdout, stderr) = await self.run(args)
-        if code != 0:
-            GitPush.logger().error(stderr)
-            raise GitPushBranchFailed(self.folder, branch, remote, stderr)
+        result = await self.run_with_retry(args)
+        if not result.succeeded:
+            GitPush.logger().error(result.stderr)
+            raise GitPushBranchFailed(
+                self.folder,
+                branch,
+                remote,
+                result.stderr,
+                result.failure_kind,
+                result.attempts,
+            )
 
     async def push_tags(self):
         """
         Pushes changes to a remote repository.
         """
-        (code, stdout, stderr) = await self.run(["git", "push", "--tags"])
-        if code != 0:
-            GitPush.logger().error(stderr)
-            raise GitPushTagsFailed(self.folder, stderr)
+        result = await self.run_with_retry(["git", "push", "--tags"])
+        if not result.succeeded:
+            GitPush.logger().error(result.stderr)
+            raise GitPushTagsFailed(
+                self.folder, result.stderr, result.failure_kind, result.attempts
+            )
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -19,6 +19,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+from .git_failure_kind import GitFailureKind
 from pythoneda.shared import BaseObject
 
 
@@ -35,15 +36,55 @@ class GitPushTagsFailed(Exception, BaseObject):
         - None
     """
 
-    def __init__(self, folder: str, message: str):
+    def __init__(
+        self,
+        folder: str,
+        message: str,
+        failureKind: GitFailureKind = None,
+        attempts: int = 1,
+    ):
         """
         Creates a new GitPushTags instance.
         :param folder: The folder with the cloned repository.
         :type folder: str
         :param message: The error message.
         :type message: str
+        :param failureKind: The kind of failure, if known.
+        :type failureKind: pythoneda.shared.git.GitFailureKind
+        :param attempts: The number of attempts made.
+        :type attempts: int
         """
         super().__init__(f'"git push --tags" in folder {folder} failed: {message}')
+        self._output = message
+        self._failure_kind = failureKind
+        self._attempts = attempts
+
+    @property
+    def output(self) -> str:
+        """
+        Retrieves the output of the git command.
+        :return: Such output.
+        :rtype: str
+        """
+        return self._output
+
+    @property
+    def failure_kind(self) -> GitFailureKind:
+        """
+        Retrieves the kind of failure.
+        :return: Such kind, or None if unknown.
+        :rtype: pythoneda.shared.git.GitFailureKind
+        """
+        return self._failure_kind
+
+    @property
+    def attempts(self) -> int:
+        """
+        Retrieves the number of attempts made before giving up.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._attempts
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -0,0 +1,236 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_pygit2_read_backend.py
+
+This file declares the GitPygit2ReadBackend class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import OrderedDict
+from .git_read_backend import GitReadBackend
+from .git_subprocess_read_backend import GitSubprocessReadBackend
+import os
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    import pygit2
+except ImportError:  # pragma: no cover - optional dependency
+    pygit2 = None
+
+
+class GitPygit2ReadBackend(GitReadBackend):
+    """
+    Answers read-only queries in-process, through libgit2.
+
+    Class name: GitPygit2ReadBackend
+
+    Responsibilities:
+        - Answers metadata queries without forking git.
+        - Keeps a bounded number of libgit2 repositories open.
+
+    Collaborators:
+        - pygit2: The libgit2 bindings, if installed.
+    """
+
+    OPERATIONS = frozenset(
+        [
+            GitReadBackend.TAG_NAMES,
+            GitReadBackend.TAGS,
+            GitReadBackend.HEAD_COMMIT,
+            GitReadBackend.REMOTE_URLS,
+            GitReadBackend.CURRENT_BRANCH,
+            GitReadBackend.DIFF,
+        ]
+    )
+
+    PRIORITY = 10
+
+    CAPACITY = 32
+
+    _repositories = OrderedDict()
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        Checks whether pygit2 is installed.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return pygit2 is not None
+
+    @property
+    def repository(self):
+        """
+        Retrieves the libgit2 repository, opening it if needed.
+        :return: Such instance.
+        :rtype: pygit2.Repository
+        """
+        key = os.path.realpath(self.folder)
+        cls = self.__class__
+        with cls._lock:
+            result = cls._repositories.get(key, None)
+            if result is None:
+                result = pygit2.Repository(key)
+                cls._repositories[key] = result
+                while len(cls._repositories) > cls.CAPACITY:
+                    cls._repositories.popitem(last=False)
+            else:
+                cls._repositories.move_to_end(key)
+
+        return result
+
+    def tag_names(self) -> List[str]:
+        """
+        Retrieves the names of all tags.
+        :return: Such names.
+        :rtype: List[str]
+        """
+        return [
+            name[len("refs/tags/") :]
+            for name in self.repository.references
+            if name.startswith("refs/tags/")
+        ]
+
+    def tags(self) -> List[Tuple[str, str, int]]:
+        """
+        Retrieves the tags pointing to commits, sorted by name.
+        :return: A list of (name, peeled commit sha, commit timestamp) tuples.
+        :rtype: List[Tuple[str, str, int]]
+        """
+        result = []
+        repository = self.repository
+        for name in repository.references:
+            if not name.startswith("refs/tags/"):
+                continue
+            try:
+                commit = repository.references[name].peel(pygit2.Commit)
+            except (pygit2.GitError, ValueError, KeyError):
+                continue
+            result.append(
+                (name[len("refs/tags/") :], str(commit.id), commit.commit_time)
+            )
+        result.sort(key=lambda entry: entry[0])
+
+        return result
+
+    def tag_refs(self, limit: int = None) -> List[Tuple[str, str, int, str]]:
+        """
+        Retrieves the valid semver tags, latest first, as GitTag.latest_tag()
+        ranks them.
+        Delegates to git, listing them in a single call.
+        :param limit: The maximum number of tags to retrieve, or None for all.
+        :type limit: int
+        :return: A list of (object sha, peeled sha, tagger timestamp or None
+          for lightweight tags, name) tuples.
+        :rtype: List[Tuple[str, str, int, str]]
+        """
+        return GitSubprocessReadBackend(
+            self.folder, self._context, self._runner
+        ).tag_refs(limit)
+
+    def head_commit(self) -> str:
+        """
+        Retrieves the commit HEAD points to.
+        :return: Its sha.
+        :rtype: str
+        """
+        return str(self.repository.head.peel(pygit2.Commit).id)
+
+    def remote_urls(self) -> Dict[str, List[str]]:
+        """
+        Retrieves the remote urls.
+        :return: For each remote repository, a list with its urls.
+        :rtype: Dict[str, List[str]]
+        """
+        result = {}
+        repository = self.repository
+        for remote in repository.remotes:
+            # all configured urls, as "git remote get-url --all" lists them
+            result[remote.name] = [
+                self._rewrite_url(url)
+                for url in repository.config.get_multivar(f"remote.{remote.name}.url")
+            ]
+
+        return result
+
+    def _rewrite_url(self, url: str) -> str:
+        """
+        Applies the longest matching "url.<base>.insteadOf" rule to given url,
+        as git does.
+        :param url: The configured url.
+        :type url: str
+        :return: The url git uses.
+        :rtype: str
+        """
+        result = url
+        longest = 0
+        for entry in self.repository.config:
+            name = entry.name
+            if not (name.startswith("url.") and name.endswith(".insteadof")):
+                continue
+            prefix = entry.value
+            if url.startswith(prefix) and len(prefix) > longest:
+                longest = len(prefix)
+                result = name[len("url.") : -len(".insteadof")] + url[len(prefix) :]
+
+        return result
+
+    def current_branch(self) -> str:
+        """
+        Retrieves the current branch, even if it has no commits yet.
+        :return: Its name.
+        :rtype: str
+        :raise TypeError: If HEAD is detached, as GitPython does.
+        """
+        repository = self.repository
+        if repository.head_is_detached:
+            raise TypeError(
+                "HEAD is a detached symbolic reference as it points to "
+                f"'{repository.head.target}'"
+            )
+
+        return repository.references["HEAD"].target[len("refs/heads/") :]
+
+    def diff(self, old: str, new: str) -> str:
+        """
+        Retrieves the diff between two revisions.
+        :param old: The old revision.
+        :type old: str
+        :param new: The new revision.
+        :type new: str
+        :return: The diff, as a patch.
+        :rtype: str
+        """
+        repository = self.repository
+        return (
+            repository.diff(
+                repository.revparse_single(old), repository.revparse_single(new)
+            ).patch
+            or ""
+        )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
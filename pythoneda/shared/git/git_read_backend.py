@@ -0,0 +1,215 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_read_backend.py
+
+This file declares the GitReadBackend class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+from .git_execution_context import GitExecutionContext
+from .git_tracer import GitTracer
+from pythoneda.shared import attribute, BaseObject
+from typing import Dict, FrozenSet, List, Tuple
+
+
+class GitReadBackend(BaseObject, abc.ABC):
+    """
+    Answers read-only queries about a repository.
+
+    Class name: GitReadBackend
+
+    Responsibilities:
+        - Declares which read operations it supports.
+        - Declares how fast it is compared to other backends.
+        - Declares the read operations every backend answers.
+        - Answers the read operations it supports.
+
+    Collaborators:
+        - pythoneda.shared.git.GitReadBackends: Chooses a backend per operation.
+        - pythoneda.shared.git.GitTracer: Traces the reads of subclasses.
+    """
+
+    TAG_NAMES = "tag_names"
+    TAGS = "tags"
+    HEAD_COMMIT = "head_commit"
+    REMOTE_URLS = "remote_urls"
+    CURRENT_BRANCH = "current_branch"
+    DIFF = "diff"
+    TAG_REFS = "tag_refs"
+
+    OPERATIONS: FrozenSet[str] = frozenset()
+
+    PRIORITY = 100
+
+    _uninstrumented = ("available", "supports")
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Traces the reads of each subclass.
+        """
+        super().__init_subclass__(**kwargs)
+        GitTracer.instrument(cls)
+
+    def __init__(self, folder: str, context: GitExecutionContext = None, runner=None):
+        """
+        Creates a new GitReadBackend instance for given folder.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :param runner: The operation to run git through, or None for a new one.
+        :type runner: pythoneda.shared.git.GitOperation
+        """
+        super().__init__()
+        self._folder = folder
+        self._context = context
+        self._runner = runner
+
+    @property
+    @attribute
+    def folder(self) -> str:
+        """
+        Retrieves the folder of the cloned repository.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    @property
+    def context(self) -> GitExecutionContext:
+        """
+        Retrieves the context git processes run in, if any.
+        :return: Such context.
+        :rtype: pythoneda.shared.git.GitExecutionContext
+        """
+        return self._context or GitExecutionContext.default()
+
+    @property
+    def runner(self):
+        """
+        Retrieves the operation git runs through, so it gets scheduled,
+        timed out, recorded and replayed as any other.
+        :return: Such operation.
+        :rtype: pythoneda.shared.git.GitOperation
+        """
+        if self._runner is None:
+            # imported here since operations import the backends
+            from .git_operation import GitOperation
+
+            self._runner = GitOperation(self._folder, context=self._context)
+        return self._runner
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        Checks whether this backend can be used in this environment.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return True
+
+    @classmethod
+    def supports(cls, operation: str) -> bool:
+        """
+        Checks whether this backend supports given operation.
+        :param operation: The operation.
+        :type operation: str
+        :return: True in such case.
+        :rtype: bool
+        """
+        return operation in cls.OPERATIONS
+
+    @abc.abstractmethod
+    def tag_names(self) -> List[str]:
+        """
+        Retrieves the names of all tags.
+        :return: Such names.
+        :rtype: List[str]
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def tags(self) -> List[Tuple[str, str, int]]:
+        """
+        Retrieves the tags pointing to commits, sorted by name.
+        :return: A list of (name, peeled commit sha, commit timestamp) tuples.
+        :rtype: List[Tuple[str, str, int]]
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def tag_refs(self, limit: int = None) -> List[Tuple[str, str, int, str]]:
+        """
+        Retrieves the valid semver tags, latest first, as GitTag.latest_tag()
+        ranks them.
+        :param limit: The maximum number of tags to retrieve, or None for all.
+        :type limit: int
+        :return: A list of (object sha, peeled sha, tagger timestamp or None
+          for lightweight tags, name) tuples.
+        :rtype: List[Tuple[str, str, int, str]]
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def head_commit(self) -> str:
+        """
+        Retrieves the commit HEAD points to.
+        :return: Its sha.
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def remote_urls(self) -> Dict[str, List[str]]:
+        """
+        Retrieves the remote urls.
+        :return: For each remote repository, a list with its urls.
+        :rtype: Dict[str, List[str]]
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def current_branch(self) -> str:
+        """
+        Retrieves the current branch.
+        :return: Its name.
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def diff(self, old: str, new: str) -> str:
+        """
+        Retrieves the diff between two revisions.
+        :param old: The old revision.
+        :type old: str
+        :param new: The new revision.
+        :type new: str
+        :return: The diff, as a patch.
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,117 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_read_backends.py
+
+This file declares the GitReadBackends class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_execution_context import GitExecutionContext
+from .git_pygit2_read_backend import GitPygit2ReadBackend
+from .git_read_backend import GitReadBackend
+from .git_subprocess_read_backend import GitSubprocessReadBackend
+from pythoneda.shared import BaseObject
+from typing import List, Type
+
+
+class GitReadBackends(BaseObject):
+    """
+    Routes read-only queries to the fastest backend supporting them.
+
+    Class name: GitReadBackends
+
+    Responsibilities:
+        - Keeps the known read backends.
+        - Chooses the fastest available backend for each operation.
+
+    Collaborators:
+        - pythoneda.shared.git.GitReadBackend: The backends.
+        - pythoneda.shared.git.GitOperation: Asks for backends.
+    """
+
+    _backends: List[Type[GitReadBackend]] = [
+        GitPygit2ReadBackend,
+        GitSubprocessReadBackend,
+    ]
+
+    @classmethod
+    def register(cls, backendClass: Type[GitReadBackend]):
+        """
+        Registers a new backend.
+        :param backendClass: The backend class.
+        :type backendClass: Type[pythoneda.shared.git.GitReadBackend]
+        """
+        if backendClass not in cls._backends:
+            cls._backends.append(backendClass)
+
+    @classmethod
+    def backends(cls) -> List[Type[GitReadBackend]]:
+        """
+        Retrieves the available backends, fastest first.
+        :return: Such backend classes.
+        :rtype: List[Type[pythoneda.shared.git.GitReadBackend]]
+        """
+        return sorted(
+            [backend for backend in cls._backends if backend.available()],
+            key=lambda backend: backend.PRIORITY,
+        )
+
+    @classmethod
+    def select(
+        cls,
+        folder: str,
+        operation: str,
+        preferred: Type[GitReadBackend] = None,
+        context: GitExecutionContext = None,
+        runner=None,
+    ) -> GitReadBackend:
+        """
+        Retrieves a backend for given operation.
+        :param folder: The cloned repository.
+        :type folder: str
+        :param operation: The operation.
+        :type operation: str
+        :param preferred: The backend to use if it supports the operation.
+        :type preferred: Type[pythoneda.shared.git.GitReadBackend]
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        :param runner: The operation the backend runs git through, if any.
+        :type runner: pythoneda.shared.git.GitOperation
+        :return: The backend.
+        :rtype: pythoneda.shared.git.GitReadBackend
+        """
+        result = None
+        candidates = cls.backends()
+        if preferred is not None and preferred.available():
+            candidates.insert(0, preferred)
+        for backend in candidates:
+            if backend.supports(operation):
+                result = backend(folder, context, runner)
+                break
+        if result is None:
+            result = GitSubprocessReadBackend(folder, context, runner)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,132 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_refs_fingerprint.py
+
+This file declares the GitRefsFingerprint class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from pythoneda.shared import BaseObject
+from typing import List
+
+
+class GitRefsFingerprint(BaseObject):
+    """
+    A cheap signature of the tags of a repository, changing whenever a tag is
+    created, moved, deleted or packed.
+
+    Class name: GitRefsFingerprint
+
+    Responsibilities:
+        - Locates the directory holding the refs, including for worktrees.
+        - Stats packed-refs, every loose tag and the reftable, if any, without
+          reading them.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTagIndex: Keeps its index fresh with it.
+        - pythoneda.shared.git.GitTagCommitIndex: Keeps its index fresh with it.
+    """
+
+    def __init__(self, folder: str):
+        """
+        Creates a new GitRefsFingerprint instance.
+        :param folder: The cloned repository.
+        :type folder: str
+        """
+        super().__init__()
+        self._folder = folder
+        self._common_dir = None
+
+    @property
+    def folder(self) -> str:
+        """
+        Retrieves the folder of the cloned repository.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    @property
+    def common_dir(self) -> str:
+        """
+        Retrieves the git directory holding the refs, shared by all worktrees.
+        :return: Such directory.
+        :rtype: str
+        """
+        if self._common_dir is None:
+            git_dir = os.path.join(self._folder, ".git")
+            if os.path.isfile(git_dir):
+                with open(git_dir) as file:
+                    content = file.read().strip()
+                if content.startswith("gitdir:"):
+                    git_dir = os.path.join(self._folder, content[7:].strip())
+            elif not os.path.isdir(git_dir):
+                # a bare repository
+                git_dir = self._folder
+            common = os.path.join(git_dir, "commondir")
+            if os.path.isfile(common):
+                with open(common) as file:
+                    git_dir = os.path.join(git_dir, file.read().strip())
+            self._common_dir = os.path.realpath(git_dir)
+        return self._common_dir
+
+    @staticmethod
+    def _stat(path: str) -> List:
+        """
+        Summarizes the status of given file.
+        :param path: The file.
+        :type path: str
+        :return: Its modification time, size and inode, or None if missing.
+        :rtype: List
+        """
+        try:
+            status = os.stat(path)
+            return [status.st_mtime_ns, status.st_size, status.st_ino]
+        except FileNotFoundError:
+            return None
+
+    def compute(self) -> List:
+        """
+        Computes the fingerprint. Git updates refs by renaming lock files over
+        them, so a changed ref gets a new inode even if its modification time
+        and size stay the same, as on filesystems with coarse timestamps.
+        :return: The fingerprint, serializable as JSON.
+        :rtype: List
+        """
+        common = self.common_dir
+        result = [
+            self._stat(os.path.join(common, "packed-refs")),
+            self._stat(os.path.join(common, "reftable", "tables.list")),
+        ]
+        tags = os.path.join(common, "refs", "tags")
+        for parent, folders, files in os.walk(tags):
+            folders.sort()
+            for name in sorted(files):
+                path = os.path.join(parent, name)
+                result.append([os.path.relpath(path, tags), self._stat(path)])
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,6 +20,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from .git_remote_add_failed import GitRemoteAddFailed
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 
 
@@ -36,13 +37,15 @@ class GitRemote(GitOperation):
         - None
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitRemote instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def add(self, url: str, remote: str = "origin"):
         """
@@ -0,0 +1,228 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_remote_tags.py
+
+This file declares the GitRemoteTags class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .git_execution_context import GitExecutionContext
+from .git_ls_remote_failed import GitLsRemoteFailed
+from .git_operation import GitOperation
+import os
+import time
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+class GitRemoteTags(GitOperation):
+    """
+    Answers which tags exist in remote repositories.
+
+    Class name: GitRemoteTags
+
+    Responsibilities:
+        - Lists the tags of a remote with a single "git ls-remote --tags",
+          asking the server only for refs/tags/ under protocol v2.
+        - Caches the tags of each remote for a while, keeping a bounded number
+          of remotes.
+        - Shares a listing in progress among concurrent requests for the same
+          remote.
+        - Answers many membership queries, over several remotes, at once.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTag: Checks remote tags through it.
+        - pythoneda.shared.git.GitLsRemoteFailed: If a remote cannot be listed.
+    """
+
+    TAG_PREFIX = "refs/tags/"
+
+    MAX_ENTRIES = 256
+
+    _ttl = 60.0
+
+    _cache: Dict[Tuple[Tuple, str], Tuple[float, FrozenSet[str]]] = {}
+
+    _inflight: Dict[Tuple[int, Tuple, str], asyncio.Task] = {}
+
+    def __init__(self, folder: str = None, context: GitExecutionContext = None):
+        """
+        Creates a new GitRemoteTags instance.
+        :param folder: The folder to run git in. Defaults to the current one.
+        :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
+        """
+        super().__init__(
+            os.getcwd() if folder is None else folder, isGitRepo=False, context=context
+        )
+
+    @classmethod
+    def ttl(cls) -> float:
+        """
+        Retrieves how long the tags of a remote are reused.
+        :return: Such time, in seconds.
+        :rtype: float
+        """
+        return cls._ttl
+
+    @classmethod
+    def set_ttl(cls, ttl: float):
+        """
+        Changes how long the tags of a remote are reused.
+        :param ttl: Such time, in seconds. Zero disables the cache.
+        :type ttl: float
+        """
+        cls._ttl = ttl
+
+    @classmethod
+    def invalidate(cls, url: str = None):
+        """
+        Forgets the cached tags of given remote, or of all of them.
+        :param url: The url of the remote repository, or None for all.
+        :type url: str
+        """
+        if url is None:
+            cls._cache.clear()
+        else:
+            for key in [key for key in cls._cache if key[1] == url]:
+                del cls._cache[key]
+
+    async def tags(self, url: str, refresh: bool = False) -> FrozenSet[str]:
+        """
+        Retrieves the names of the tags of given remote.
+        :param url: The url of the remote repository.
+        :type url: str
+        :param refresh: Whether to ignore the cached tags.
+        :type refresh: bool
+        :return: Such names.
+        :rtype: FrozenSet[str]
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If the remote cannot be
+          listed.
+        """
+        cls = self.__class__
+        key = (self.context.key, url)
+        entry = cls._cache.get(key, None)
+        if not refresh and entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        inflight = (id(asyncio.get_running_loop()),) + key
+        task = cls._inflight.get(inflight, None)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._list(url))
+            cls._inflight[inflight] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(inflight, None))
+        # Cancelling one caller must not cancel the listing the others await.
+        result = await asyncio.shield(task)
+
+        return result
+
+    async def _list(self, url: str) -> FrozenSet[str]:
+        """
+        Lists the tags of given remote, and caches them.
+        :param url: The url of the remote repository.
+        :type url: str
+        :return: The names of the tags.
+        :rtype: FrozenSet[str]
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If the remote cannot be
+          listed.
+        """
+        started = time.monotonic()
+        # --tags makes protocol v2 send "ref-prefix refs/tags/", so the server
+        # advertises no branches; --refs drops the peeled "^{}" entries.
+        outcome = await self.run_with_retry(
+            ["git", "-c", "protocol.version=2", "ls-remote", "--tags", "--refs", url]
+        )
+        if not outcome.succeeded:
+            GitRemoteTags.logger().error(outcome.stderr)
+            raise GitLsRemoteFailed(url, outcome.stderr)
+
+        prefix = self.__class__.TAG_PREFIX
+        result = frozenset(
+            ref[len(prefix) :]
+            for ref in (line.partition("\t")[2] for line in outcome.stdout.splitlines())
+            if ref.startswith(prefix)
+        )
+        self.__class__._store((self.context.key, url), started, result)
+
+        return result
+
+    @classmethod
+    def _store(cls, key: Tuple[Tuple, str], started: float, tags: FrozenSet[str]):
+        """
+        Caches the tags of a remote, dropping the expired entries and, beyond
+        MAX_ENTRIES, the oldest ones.
+        :param key: The execution context key and the url of the remote.
+        :type key: Tuple[Tuple, str]
+        :param started: When the listing started, as per time.monotonic().
+        :type started: float
+        :param tags: The names of the tags.
+        :type tags: FrozenSet[str]
+        """
+        now = time.monotonic()
+        for expired in [
+            item for (item, entry) in cls._cache.items() if entry[0] <= now
+        ]:
+            del cls._cache[expired]
+        cls._cache.pop(key, None)
+        cls._cache[key] = (started + cls.ttl(), tags)
+        while len(cls._cache) > cls.MAX_ENTRIES:
+            del cls._cache[next(iter(cls._cache))]
+
+    async def exists(self, url: str, tag: str) -> bool:
+        """
+        Checks whether a tag exists in given remote.
+        :param url: The url of the remote repository.
+        :type url: str
+        :param tag: The tag name.
+        :type tag: str
+        :return: True in such case.
+        :rtype: bool
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If the remote cannot be
+          listed.
+        """
+        return tag in await self.tags(url)
+
+    async def existing(
+        self, urls: List[str], tags: Iterable[str]
+    ) -> Dict[str, FrozenSet[str]]:
+        """
+        Checks which of given tags exist in each remote, listing them
+        concurrently.
+        :param urls: The urls of the remote repositories.
+        :type urls: List[str]
+        :param tags: The tag names.
+        :type tags: Iterable[str]
+        :return: The given tags found in each remote, by url.
+        :rtype: Dict[str, FrozenSet[str]]
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If a remote cannot be
+          listed.
+        """
+        wanted = frozenset(tags)
+        urls = list(dict.fromkeys(urls))
+        found = await asyncio.gather(*[self.tags(url) for url in urls])
+
+        return {url: wanted & remote for (url, remote) in zip(urls, found)}
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
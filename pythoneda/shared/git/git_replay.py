@@ -0,0 +1,282 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_replay.py
+
+This file declares the GitReplay class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import defaultdict
+from .git_operation_timed_out import GitOperationTimedOut
+from .git_replay_not_found import GitReplayNotFound
+from .git_result import GitResult
+import json
+from pythoneda.shared import BaseObject
+import random
+import threading
+from typing import Callable, Dict, List, Tuple, Union
+
+
+class GitReplay(BaseObject):
+    """
+    Serves recorded git results instead of running git.
+
+    Class name: GitReplay
+
+    Responsibilities:
+        - Records the results of git runs, keyed by argv and folder.
+        - Saves and loads recordings as JSON lines.
+        - Serves recorded results, in recording order, after a simulated latency.
+
+    Collaborators:
+        - pythoneda.shared.git.GitResult: The recorded results.
+        - pythoneda.shared.git.GitOperation: Runs through a replay, once set.
+    """
+
+    def __init__(
+        self,
+        latency: Union[str, Callable[[GitResult], float]] = None,
+        recording: bool = False,
+    ):
+        """
+        Creates a new GitReplay instance.
+        :param latency: None to answer immediately, "recorded" to wait as long as
+          the recorded process took, or a callable returning the seconds to wait
+          given the result.
+        :type latency: Union[str, Callable[[pythoneda.shared.git.GitResult], float]]
+        :param recording: Whether git actually runs, and its results are recorded.
+        :type recording: bool
+        """
+        super().__init__()
+        self._latency = latency
+        self._recording = recording
+        self._results: Dict[Tuple, List[GitResult]] = defaultdict(list)
+        self._cursors: Dict[Tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        """
+        Checks whether git actually runs, and its results are recorded.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._recording
+
+    @property
+    def latency(self) -> Union[str, Callable[[GitResult], float]]:
+        """
+        Retrieves the simulated latency.
+        :return: Such latency, as given to the constructor.
+        :rtype: Union[str, Callable[[pythoneda.shared.git.GitResult], float]]
+        """
+        return self._latency
+
+    @staticmethod
+    def key(args: List[str], folder: str) -> Tuple:
+        """
+        Builds the key of a recording.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param folder: The folder git runs in, or None to match any folder.
+        :type folder: str
+        :return: Such key.
+        :rtype: Tuple
+        """
+        return (tuple(args), folder)
+
+    @staticmethod
+    def constant(seconds: float) -> Callable[[GitResult], float]:
+        """
+        Builds a constant latency.
+        :param seconds: The latency.
+        :type seconds: float
+        :return: The latency function.
+        :rtype: Callable[[pythoneda.shared.git.GitResult], float]
+        """
+        return lambda result: seconds
+
+    @staticmethod
+    def exponential(mean: float) -> Callable[[GitResult], float]:
+        """
+        Builds an exponentially-distributed latency.
+        :param mean: The mean latency, in seconds.
+        :type mean: float
+        :return: The latency function.
+        :rtype: Callable[[pythoneda.shared.git.GitResult], float]
+        """
+        return lambda result: random.expovariate(1.0 / mean)
+
+    @staticmethod
+    def lognormal(median: float, sigma: float) -> Callable[[GitResult], float]:
+        """
+        Builds a log-normally-distributed latency, typical of process spawns.
+        :param median: The median latency, in seconds.
+        :type median: float
+        :param sigma: The standard deviation of the underlying normal distribution.
+        :type sigma: float
+        :return: The latency function.
+        :rtype: Callable[[pythoneda.shared.git.GitResult], float]
+        """
+        return lambda result: median * random.lognormvariate(0.0, sigma)
+
+    def add(self, result: GitResult, folder: str = ""):
+        """
+        Adds a result to serve.
+        :param result: The result.
+        :type result: pythoneda.shared.git.GitResult
+        :param folder: The folder to serve it for; defaults to the one of the
+          result, and None serves it for any folder.
+        :type folder: str
+        """
+        if folder == "":
+            folder = result.cwd
+        with self._lock:
+            self._results[self.key(result.argv, folder)].append(result)
+
+    def record(self, result: GitResult):
+        """
+        Records the result of an actual git run.
+        :param result: The result.
+        :type result: pythoneda.shared.git.GitResult
+        """
+        self.add(result)
+
+    def lookup(self, args: List[str], folder: str) -> GitResult:
+        """
+        Retrieves the next recorded result for given command, cycling through
+        the results recorded for it. Recordings for any folder are used if
+        there are none for the given one.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param folder: The folder git would run in.
+        :type folder: str
+        :return: The result.
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitReplayNotFound: If it was not recorded.
+        """
+        with self._lock:
+            key = self.key(args, folder)
+            results = self._results.get(key, None)
+            if not results:
+                key = self.key(args, None)
+                results = self._results.get(key, None)
+            if not results:
+                raise GitReplayNotFound(args, folder)
+            cursor = self._cursors[key]
+            self._cursors[key] = cursor + 1
+
+        return results[cursor % len(results)]
+
+    def delay(self, result: GitResult) -> float:
+        """
+        Computes the simulated latency of serving given result.
+        :param result: The result.
+        :type result: pythoneda.shared.git.GitResult
+        :return: The latency, in seconds.
+        :rtype: float
+        """
+        seconds = 0.0
+        if self._latency == "recorded":
+            seconds = result.wall_time or 0.0
+        elif callable(self._latency):
+            seconds = max(0.0, self._latency(result))
+
+        return seconds
+
+    async def serve(
+        self, args: List[str], folder: str, timeout: float = None
+    ) -> GitResult:
+        """
+        Serves the recorded result of given command, after the simulated latency.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param folder: The folder git would run in.
+        :type folder: str
+        :param timeout: The timeout in seconds, or None to wait forever.
+        :type timeout: float
+        :return: The result.
+        :rtype: pythoneda.shared.git.GitResult
+        :raise pythoneda.shared.git.GitReplayNotFound: If it was not recorded.
+        :raise pythoneda.shared.git.GitOperationTimedOut: If the simulated
+          latency exceeds the timeout.
+        """
+        result = self.lookup(args, folder)
+        delay = self.delay(result)
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise GitOperationTimedOut(args, folder, timeout, "", "")
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        return result
+
+    def save(self, path: str):
+        """
+        Saves the recorded results, one JSON document per line.
+        :param path: The file.
+        :type path: str
+        """
+        with self._lock:
+            entries = [
+                (folder, result)
+                for (_, folder), results in self._results.items()
+                for result in results
+            ]
+        with open(path, "w", encoding="utf-8") as file:
+            for folder, result in entries:
+                data = result.to_dict()
+                data["cwd"] = folder
+                file.write(json.dumps(data, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        latency: Union[str, Callable[[GitResult], float]] = None,
+        anyFolder: bool = False,
+    ):
+        """
+        Loads results saved with save().
+        :param path: The file.
+        :type path: str
+        :param latency: The simulated latency, as in the constructor.
+        :type latency: Union[str, Callable[[pythoneda.shared.git.GitResult], float]]
+        :param anyFolder: Whether to serve the results regardless of the folder,
+          e.g. to replay traces recorded on another machine.
+        :type anyFolder: bool
+        :return: The replay.
+        :rtype: pythoneda.shared.git.GitReplay
+        """
+        result = cls(latency)
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    recorded = GitResult.from_dict(json.loads(line))
+                    result.add(recorded, None if anyFolder else recorded.cwd)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
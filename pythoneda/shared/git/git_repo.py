@@ -23,11 +23,19 @@ from git import Git, Repo
 import os
 from pythoneda.shared import attribute, Entity, EventReference
 from pythoneda.shared.git import (
+    GitFailureClassifier,
+    GitInvocationRecorder,
+    GitReadBackend,
+    GitReadBackends,
+    GitRepoRegistry,
+    GitRetryPolicy,
     GitTag,
+    GitTracer,
     Version,
 )
 import re
 import subprocess
+import time
 from urllib.parse import urlparse
 from typing import Dict, List
 
@@ -45,6 +53,8 @@ class GitRepo(Entity):
         - None
     """
 
+    _retry_policy = GitRetryPolicy()
+
     def __init__(
         self,
         url: str,
@@ -124,6 +134,7 @@ class GitRepo(Entity):
         return self.repo.remotes[remote_name].url
 
     @classmethod
+    @GitTracer.traced
     def from_folder(cls, folder: str):
         """
         Creates a GitRepo from given folder.
@@ -134,7 +145,7 @@ class GitRepo(Entity):
         """
         result = None
 
-        repo = Repo(folder)
+        repo = GitRepoRegistry.instance().get(folder)
 
         if repo.active_branch and repo.active_branch.tracking_branch():
             remote_name = repo.active_branch.tracking_branch().remote_name
@@ -144,6 +155,7 @@ class GitRepo(Entity):
 
         return result
 
+    @GitTracer.traced
     def latest_tag(self) -> str:
         """
         Retrieves the latest tag, if the repo has already been cloned.
@@ -153,19 +165,55 @@ class GitRepo(Entity):
         return GitTag(self.folder).latest_tag()
 
     @classmethod
-    def url_is_a_git_repo(cls, url: str) -> bool:
+    @GitTracer.traced
+    def url_is_a_git_repo(cls, url: str, policy: GitRetryPolicy = None) -> bool:
         """
         Checks whether given url points to a git repository.
+        Transient network failures are retried according to given policy.
         :param url: The url to check.
         :type url: str
+        :param policy: The retry policy. Defaults to the one of the class.
+        :type policy: pythoneda.shared.git.GitRetryPolicy
         :return: True in such case.
         :rtype: bool
         """
-        try:
-            subprocess.check_output(["git", "ls-remote", url], stderr=subprocess.STDOUT)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        result = False
+        if policy is None:
+            policy = cls._retry_policy
+        policy.budget.deposit()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            argv = ["git", "ls-remote", url]
+            started = time.monotonic()
+            try:
+                with GitTracer.instance().span(
+                    "git ls-remote", url=url, attempt=attempt
+                ):
+                    output = subprocess.check_output(argv, stderr=subprocess.STDOUT)
+                GitInvocationRecorder.instance().record(
+                    argv, os.getcwd(), time.monotonic() - started, len(output), 0, 0
+                )
+                result = True
+                break
+            except subprocess.CalledProcessError as err:
+                GitInvocationRecorder.instance().record(
+                    argv,
+                    os.getcwd(),
+                    time.monotonic() - started,
+                    len(err.output),
+                    0,
+                    err.returncode,
+                )
+                kind = GitFailureClassifier.instance().classify(
+                    err.output.decode("utf-8", "replace")
+                )
+                if not policy.should_retry(kind, attempt):
+                    break
+                time.sleep(policy.delay(attempt))
+
+        return result
 
     def repo_owner_and_repo_name(self) -> tuple:
         """
@@ -200,18 +248,26 @@ class GitRepo(Entity):
 
         return owner, repo_name
 
+    @GitTracer.traced
     def sha256(self) -> str:
         """
         Retrieves the sha256 checksum of the repository.
         :return: Such checksum.
         :rtype: str
         """
-        result = subprocess.run(
-            ["nix-prefetch-git", "--deepClone", f"{self.url}/tree/{self.rev}"],
-            check=True,
-            capture_output=True,
-            text=True,
+        argv = ["nix-prefetch-git", "--deepClone", f"{self.url}/tree/{self.rev}"]
+        started = time.monotonic()
+        with GitTracer.instance().span("nix-prefetch-git", url=self.url, rev=self.rev):
+            result = subprocess.run(argv, capture_output=True, text=True)
+        GitInvocationRecorder.instance().record(
+            argv,
+            os.getcwd(),
+            time.monotonic() - started,
+            len(result.stdout),
+            len(result.stderr),
+            result.returncode,
         )
+        result.check_returncode()
         output = result.stdout
         GitRepo.logger().debug(
             f"nix-prefetch-git --deepClone {self.url}/tree/{self.rev} -> {output}"
@@ -219,6 +275,7 @@ class GitRepo(Entity):
 
         return output.splitlines()[-1]
 
+    @GitTracer.traced
     def clone(
         self, sshUsername: str, privateKeyFile: str, privateKeyPassphrase: str
     ) -> Repo:
@@ -268,6 +325,7 @@ class GitRepo(Entity):
         parsed_url = urlparse(self.url)
         return parsed_url.netloc == "github.com"
 
+    @GitTracer.traced
     def tag_version(self, version: Version):
         """
         Tags given version.
@@ -277,6 +335,7 @@ class GitRepo(Entity):
         """
         GitTag(self.folder).create_tag(version.value)
 
+    @GitTracer.traced
     def increase_major(self, tag: bool = False) -> Version:
         """
         Creates a new tag increasing the major in current version.
@@ -294,6 +353,7 @@ class GitRepo(Entity):
             self.tag_version(version)
         return version
 
+    @GitTracer.traced
     def increase_minor(self, tag: bool = False) -> Version:
         """
         Creates a new tag increasing the minor in current version.
@@ -311,6 +371,7 @@ class GitRepo(Entity):
             self.tag_version(version)
         return version
 
+    @GitTracer.traced
     def increase_patch(self, tag: bool = False) -> Version:
         """
         Creates a new tag increasing the patch in current version.
@@ -328,6 +389,7 @@ class GitRepo(Entity):
             self.tag_version(version)
         return version
 
+    @GitTracer.traced
     def increase_prerelease(self, tag: bool = False) -> Version:
         """
         Creates a new tag increasing the prerelease in current version.
@@ -345,6 +407,7 @@ class GitRepo(Entity):
             self.tag_version(version)
         return version
 
+    @GitTracer.traced
     def increase_build(self, tag: bool = False) -> Version:
         """
         Creates a new tag increasing the build in current version.
@@ -363,6 +426,7 @@ class GitRepo(Entity):
         return version
 
     @classmethod
+    @GitTracer.traced
     def remote_urls(cls, clonedFolder: str) -> Dict:
         """
         Retrieves the remote urls of given repository.
@@ -371,13 +435,12 @@ class GitRepo(Entity):
         :return: For each remote repository, a list with its urls.
         :rtype: Dict[List[str]]
         """
-        repo = Repo(clonedFolder)
-        result = {}
-        for remote in repo.remotes:
-            result[remote.name] = list(remote.urls)
-        return result
+        return GitReadBackends.select(
+            clonedFolder, GitReadBackend.REMOTE_URLS
+        ).remote_urls()
 
     @classmethod
+    @GitTracer.traced
     def current_branch(cls, clonedFolder: str) -> str:
         """
         Retrieves the current branch of given repository.
@@ -386,8 +449,9 @@ class GitRepo(Entity):
         :return: The current branch.
         :rtype: str
         """
-        repo = Repo(clonedFolder)
-        return repo.active_branch.name
+        return GitReadBackends.select(
+            clonedFolder, GitReadBackend.CURRENT_BRANCH
+        ).current_branch()
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
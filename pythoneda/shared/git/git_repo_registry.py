@@ -0,0 +1,156 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_repo_registry.py
+
+This file declares the GitRepoRegistry class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import OrderedDict
+from git import Repo
+import os
+from pythoneda.shared import BaseObject
+import threading
+
+
+class GitRepoRegistry(BaseObject):
+    """
+    Shares GitPython repository handles within the process.
+
+    Class name: GitRepoRegistry
+
+    Responsibilities:
+        - Opens a git.Repo per folder lazily, on first use.
+        - Evicts the least recently used handles beyond its capacity.
+        - Closes evicted handles so their git child processes are reaped.
+
+    Collaborators:
+        - git.Repo: The handles.
+        - pythoneda.shared.git.GitOperation: Retrieves its handle from here.
+        - pythoneda.shared.git.GitRepo: Retrieves its handle from here.
+    """
+
+    _singleton = None
+
+    def __init__(self, capacity: int = 32):
+        """
+        Creates a new GitRepoRegistry instance.
+        :param capacity: The maximum number of open handles.
+        :type capacity: int
+        """
+        super().__init__()
+        self._capacity = capacity
+        self._repos = OrderedDict()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide registry.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitRepoRegistry
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def capacity(self) -> int:
+        """
+        Retrieves the maximum number of open handles.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._capacity
+
+    def set_capacity(self, capacity: int):
+        """
+        Changes the maximum number of open handles, evicting the excess.
+        :param capacity: The new maximum.
+        :type capacity: int
+        """
+        with self._lock:
+            self._capacity = capacity
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        """
+        Retrieves the number of open handles.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._repos)
+
+    def get(self, folder: str) -> Repo:
+        """
+        Retrieves the handle of given folder, opening it if needed.
+        :param folder: The cloned repository.
+        :type folder: str
+        :return: The handle.
+        :rtype: git.Repo
+        """
+        key = os.path.realpath(folder)
+        with self._lock:
+            result = self._repos.get(key, None)
+            if result is None:
+                result = Repo(key)
+                self._repos[key] = result
+                self._evict()
+            else:
+                self._repos.move_to_end(key)
+
+        return result
+
+    def _evict(self):
+        """
+        Closes the least recently used handles beyond the capacity.
+        """
+        while len(self._repos) > max(self._capacity, 0):
+            folder, repo = self._repos.popitem(last=False)
+            GitRepoRegistry.logger().debug(f"Closing git.Repo for {folder}")
+            repo.close()
+
+    def close(self, folder: str):
+        """
+        Closes the handle of given folder, if open.
+        :param folder: The cloned repository.
+        :type folder: str
+        """
+        with self._lock:
+            repo = self._repos.pop(os.path.realpath(folder), None)
+        if repo is not None:
+            repo.close()
+
+    def close_all(self):
+        """
+        Closes all handles.
+        """
+        with self._lock:
+            repos = list(self._repos.values())
+            self._repos.clear()
+        for repo in repos:
+            repo.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
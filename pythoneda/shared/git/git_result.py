@@ -0,0 +1,380 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_result.py
+
+This file declares the GitResult class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+from .git_failure_kind import GitFailureKind
+from .git_output import GitOutput
+from pythoneda.shared import attribute, ValueObject
+from typing import Dict, Iterator, List, Union
+
+
+class GitResult(ValueObject):
+    """
+    The outcome of running git.
+
+    Class name: GitResult
+
+    Responsibilities:
+        - Keeps the command, its exit code and its raw output.
+        - Decodes the output lazily.
+        - Keeps the wall time, CPU time and peak memory of the process.
+        - Unpacks as the legacy (code, stdout, stderr) tuple.
+        - Converts to and from dictionaries, to be saved and replayed.
+
+    Collaborators:
+        - pythoneda.shared.git.GitOperation: Builds results when running git.
+    """
+
+    def __init__(
+        self,
+        argv: List[str],
+        cwd: str,
+        code: int,
+        stdoutBytes: Union[bytes, GitOutput],
+        stderrBytes: bytes,
+        wallTime: float = None,
+        userTime: float = None,
+        systemTime: float = None,
+        peakRss: int = None,
+        failureKind: GitFailureKind = None,
+        attempts: int = 1,
+    ):
+        """
+        Creates a new GitResult instance.
+        :param argv: The command-line args.
+        :type argv: List[str]
+        :param cwd: The folder git ran in.
+        :type cwd: str
+        :param code: The exit code.
+        :type code: int
+        :param stdoutBytes: The standard output.
+        :type stdoutBytes: Union[bytes, pythoneda.shared.git.GitOutput]
+        :param stderrBytes: The standard error.
+        :type stderrBytes: bytes
+        :param wallTime: The elapsed time, in seconds.
+        :type wallTime: float
+        :param userTime: The CPU time spent in user mode, in seconds.
+        :type userTime: float
+        :param systemTime: The CPU time spent in kernel mode, in seconds.
+        :type systemTime: float
+        :param peakRss: The peak resident set size, in KiB.
+        :type peakRss: int
+        :param failureKind: The kind of failure, if the command failed.
+        :type failureKind: pythoneda.shared.git.GitFailureKind
+        :param attempts: The number of attempts made.
+        :type attempts: int
+        """
+        super().__init__()
+        self._argv = list(argv)
+        self._cwd = cwd
+        self._code = code
+        self._stdout_bytes = stdoutBytes
+        self._stderr_bytes = stderrBytes
+        self._stdout = None
+        self._stderr = None
+        self._wall_time = wallTime
+        self._user_time = userTime
+        self._system_time = systemTime
+        self._peak_rss = peakRss
+        self._failure_kind = failureKind
+        self._attempts = attempts
+
+    @classmethod
+    def from_process(
+        cls, process, stdoutBytes: Union[bytes, GitOutput], stderrBytes: bytes
+    ):
+        """
+        Creates a GitResult from a finished process.
+        :param process: The process.
+        :type process: pythoneda.shared.git.GitProcess
+        :param stdoutBytes: The standard output.
+        :type stdoutBytes: Union[bytes, pythoneda.shared.git.GitOutput]
+        :param stderrBytes: The standard error.
+        :type stderrBytes: bytes
+        :return: The result.
+        :rtype: pythoneda.shared.git.GitResult
+        """
+        usage = process.rusage
+        return cls(
+            process.args,
+            process.folder,
+            process.returncode,
+            stdoutBytes,
+            stderrBytes,
+            process.wall_time,
+            None if usage is None else usage.ru_utime,
+            None if usage is None else usage.ru_stime,
+            None if usage is None else usage.ru_maxrss,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """
+        Creates a GitResult from its dictionary form.
+        :param data: The dictionary, as returned by to_dict().
+        :type data: Dict
+        :return: The result.
+        :rtype: pythoneda.shared.git.GitResult
+        """
+        return cls(
+            data["argv"],
+            data.get("cwd", None),
+            data["code"],
+            base64.b64decode(data.get("stdout", "")),
+            base64.b64decode(data.get("stderr", "")),
+            data.get("wall", None),
+            data.get("user", None),
+            data.get("sys", None),
+            data.get("rss", None),
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        Retrieves the result as a dictionary serializable as JSON.
+        :return: Such dictionary, with the output encoded in base64.
+        :rtype: Dict
+        """
+        return {
+            "argv": self._argv,
+            "cwd": self._cwd,
+            "code": self._code,
+            "stdout": base64.b64encode(self.stdout_bytes).decode("ascii"),
+            "stderr": base64.b64encode(self._stderr_bytes).decode("ascii"),
+            "wall": self._wall_time,
+            "user": self._user_time,
+            "sys": self._system_time,
+            "rss": self._peak_rss,
+        }
+
+    def with_retries(self, failureKind: GitFailureKind, attempts: int):
+        """
+        Creates a copy of this result annotated with the retries made.
+        :param failureKind: The kind of failure, if the command failed.
+        :type failureKind: pythoneda.shared.git.GitFailureKind
+        :param attempts: The number of attempts made.
+        :type attempts: int
+        :return: The new result.
+        :rtype: pythoneda.shared.git.GitResult
+        """
+        return self.__class__(
+            self._argv,
+            self._cwd,
+            self._code,
+            self._stdout_bytes,
+            self._stderr_bytes,
+            self._wall_time,
+            self._user_time,
+            self._system_time,
+            self._peak_rss,
+            failureKind,
+            attempts,
+        )
+
+    @property
+    @attribute
+    def argv(self) -> List[str]:
+        """
+        Retrieves the command-line args.
+        :return: Such args.
+        :rtype: List[str]
+        """
+        return self._argv
+
+    @property
+    @attribute
+    def cwd(self) -> str:
+        """
+        Retrieves the folder git ran in.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._cwd
+
+    @property
+    @attribute
+    def code(self) -> int:
+        """
+        Retrieves the exit code.
+        :return: Such code.
+        :rtype: int
+        """
+        return self._code
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Checks whether git exited successfully.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._code == 0
+
+    @property
+    def stdout_bytes(self) -> bytes:
+        """
+        Retrieves the standard output, undecoded.
+        Output spilled to disk gets copied into memory; use output instead.
+        :return: Such output.
+        :rtype: bytes
+        """
+        result = self._stdout_bytes
+        if isinstance(result, GitOutput):
+            result = bytes(result)
+
+        return result
+
+    @property
+    def output(self) -> GitOutput:
+        """
+        Retrieves the standard output, undecoded and without copying it.
+        :return: Such output.
+        :rtype: pythoneda.shared.git.GitOutput
+        """
+        if not isinstance(self._stdout_bytes, GitOutput):
+            self._stdout_bytes = GitOutput(self._stdout_bytes)
+        return self._stdout_bytes
+
+    @property
+    def stderr_bytes(self) -> bytes:
+        """
+        Retrieves the standard error, undecoded.
+        :return: Such output.
+        :rtype: bytes
+        """
+        return self._stderr_bytes
+
+    @property
+    def stdout(self) -> str:
+        """
+        Retrieves the standard output, decoded on first access.
+        :return: Such output.
+        :rtype: str
+        """
+        if self._stdout is None:
+            self._stdout = self._stdout_bytes.decode("utf-8", "replace")
+        return self._stdout
+
+    @property
+    def stderr(self) -> str:
+        """
+        Retrieves the standard error, decoded on first access.
+        :return: Such output.
+        :rtype: str
+        """
+        if self._stderr is None:
+            self._stderr = self._stderr_bytes.decode("utf-8", "replace")
+        return self._stderr
+
+    @property
+    @attribute
+    def wall_time(self) -> float:
+        """
+        Retrieves the elapsed time.
+        :return: Such time in seconds, or None if unknown.
+        :rtype: float
+        """
+        return self._wall_time
+
+    @property
+    @attribute
+    def user_time(self) -> float:
+        """
+        Retrieves the CPU time git spent in user mode.
+        :return: Such time in seconds, or None if unknown.
+        :rtype: float
+        """
+        return self._user_time
+
+    @property
+    @attribute
+    def system_time(self) -> float:
+        """
+        Retrieves the CPU time git spent in kernel mode.
+        :return: Such time in seconds, or None if unknown.
+        :rtype: float
+        """
+        return self._system_time
+
+    @property
+    @attribute
+    def peak_rss(self) -> int:
+        """
+        Retrieves the peak resident set size of git.
+        :return: Such size in KiB, or None if unknown.
+        :rtype: int
+        """
+        return self._peak_rss
+
+    @property
+    @attribute
+    def failure_kind(self) -> GitFailureKind:
+        """
+        Retrieves the kind of failure.
+        :return: Such kind, or None if git succeeded or it was not classified.
+        :rtype: pythoneda.shared.git.GitFailureKind
+        """
+        return self._failure_kind
+
+    @property
+    @attribute
+    def attempts(self) -> int:
+        """
+        Retrieves the number of attempts made.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._attempts
+
+    def __iter__(self) -> Iterator[Union[int, str]]:
+        """
+        Unpacks as the (code, stdout, stderr) tuple.
+        :return: An iterator over such values.
+        :rtype: Iterator[Union[int, str]]
+        """
+        return iter((self._code, self.stdout, self.stderr))
+
+    def __getitem__(self, index: int) -> Union[int, str]:
+        """
+        Indexes as the (code, stdout, stderr) tuple.
+        :param index: The index.
+        :type index: int
+        :return: The value.
+        :rtype: Union[int, str]
+        """
+        return (self._code, self.stdout, self.stderr)[index]
+
+    def __len__(self) -> int:
+        """
+        Retrieves the length of the (code, stdout, stderr) tuple.
+        :return: 3.
+        :rtype: int
+        """
+        return 3
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,106 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_retry_budget.py
+
+This file declares the GitRetryBudget class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+import threading
+
+
+class GitRetryBudget(BaseObject):
+    """
+    Limits retries to a fraction of the original requests.
+
+    Class name: GitRetryBudget
+
+    Responsibilities:
+        - Earns a fraction of a retry for every first attempt.
+        - Spends a whole retry for every retry, refusing when exhausted.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRetryPolicy: Asks for permission to retry.
+    """
+
+    _singleton = None
+
+    def __init__(self, ratio: float = 0.2, minRetries: int = 10, maxRetries: int = 100):
+        """
+        Creates a new GitRetryBudget instance.
+        :param ratio: The retries earned per first attempt.
+        :type ratio: float
+        :param minRetries: The retries available upfront.
+        :type minRetries: int
+        :param maxRetries: The maximum retries that can be saved up.
+        :type maxRetries: int
+        """
+        super().__init__()
+        self._ratio = ratio
+        self._max_retries = maxRetries
+        self._balance = float(minRetries)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide budget.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitRetryBudget
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def balance(self) -> float:
+        """
+        Retrieves the retries currently available.
+        :return: Such amount.
+        :rtype: float
+        """
+        return self._balance
+
+    def deposit(self):
+        """
+        Accounts for a first attempt.
+        """
+        with self._lock:
+            self._balance = min(self._max_retries, self._balance + self._ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Spends a retry, if available.
+        :return: True if the retry is allowed.
+        :rtype: bool
+        """
+        with self._lock:
+            result = self._balance >= 1
+            if result:
+                self._balance -= 1
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,164 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_retry_policy.py
+
+This file declares the GitRetryPolicy class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_failure_kind import GitFailureKind
+from .git_retry_budget import GitRetryBudget
+from pythoneda.shared import attribute, ValueObject
+import random
+from typing import FrozenSet
+
+
+class GitRetryPolicy(ValueObject):
+    """
+    Decides whether and when to retry a failed git command.
+
+    Class name: GitRetryPolicy
+
+    Responsibilities:
+        - Limits the number of attempts.
+        - Computes exponential backoff delays with full jitter.
+        - Retries only the kinds of failure it is configured for.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRetryBudget: Caps retries globally.
+        - pythoneda.shared.git.GitOperation: Retries according to the policy.
+    """
+
+    def __init__(
+        self,
+        maxAttempts: int = 4,
+        baseDelay: float = 0.5,
+        maxDelay: float = 30.0,
+        jitter: bool = True,
+        retryOn: FrozenSet[GitFailureKind] = frozenset([GitFailureKind.TRANSIENT]),
+        budget: GitRetryBudget = None,
+    ):
+        """
+        Creates a new GitRetryPolicy instance.
+        :param maxAttempts: The maximum number of attempts, including the first.
+        :type maxAttempts: int
+        :param baseDelay: The delay before the first retry, in seconds.
+        :type baseDelay: float
+        :param maxDelay: The maximum delay between attempts, in seconds.
+        :type maxDelay: float
+        :param jitter: Whether to randomize delays.
+        :type jitter: bool
+        :param retryOn: The kinds of failure worth retrying.
+        :type retryOn: FrozenSet[pythoneda.shared.git.GitFailureKind]
+        :param budget: The retry budget. Defaults to the process-wide one.
+        :type budget: pythoneda.shared.git.GitRetryBudget
+        """
+        super().__init__()
+        self._max_attempts = maxAttempts
+        self._base_delay = baseDelay
+        self._max_delay = maxDelay
+        self._jitter = jitter
+        self._retry_on = frozenset(retryOn)
+        self._budget = budget
+
+    @property
+    @attribute
+    def max_attempts(self) -> int:
+        """
+        Retrieves the maximum number of attempts.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_attempts
+
+    @property
+    @attribute
+    def base_delay(self) -> float:
+        """
+        Retrieves the delay before the first retry.
+        :return: Such delay, in seconds.
+        :rtype: float
+        """
+        return self._base_delay
+
+    @property
+    @attribute
+    def max_delay(self) -> float:
+        """
+        Retrieves the maximum delay between attempts.
+        :return: Such delay, in seconds.
+        :rtype: float
+        """
+        return self._max_delay
+
+    @property
+    @attribute
+    def retry_on(self) -> FrozenSet[GitFailureKind]:
+        """
+        Retrieves the kinds of failure worth retrying.
+        :return: Such kinds.
+        :rtype: FrozenSet[pythoneda.shared.git.GitFailureKind]
+        """
+        return self._retry_on
+
+    @property
+    def budget(self) -> GitRetryBudget:
+        """
+        Retrieves the retry budget.
+        :return: Such budget.
+        :rtype: pythoneda.shared.git.GitRetryBudget
+        """
+        return self._budget or GitRetryBudget.instance()
+
+    def should_retry(self, kind: GitFailureKind, attempt: int) -> bool:
+        """
+        Checks whether a failed attempt should be retried, spending budget if so.
+        :param kind: The kind of failure.
+        :type kind: pythoneda.shared.git.GitFailureKind
+        :param attempt: The number of the failed attempt, starting at 1.
+        :type attempt: int
+        :return: True in such case.
+        :rtype: bool
+        """
+        return (
+            kind in self._retry_on
+            and attempt < self._max_attempts
+            and self.budget.withdraw()
+        )
+
+    def delay(self, attempt: int) -> float:
+        """
+        Computes the delay before the next attempt.
+        :param attempt: The number of the failed attempt, starting at 1.
+        :type attempt: int
+        :return: The delay, in seconds.
+        :rtype: float
+        """
+        result = min(self._max_delay, self._base_delay * (2 ** (attempt - 1)))
+        if self._jitter:
+            result = random.uniform(0, result)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
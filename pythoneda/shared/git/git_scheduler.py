@@ -0,0 +1,382 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_scheduler.py
+
+This file declares the GitScheduler class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import os
+from pythoneda.shared import BaseObject
+import threading
+import time
+from typing import Dict, List
+
+
+class GitScheduler(BaseObject):
+    """
+    Decides when git processes are allowed to run.
+
+    Class name: GitScheduler
+
+    Responsibilities:
+        - Serializes commands that write to the same repository.
+        - Lets read-only commands run concurrently.
+        - Caps the number of live git processes in the whole process, across
+          event loops and threads.
+        - Tracks queue depth and wait times.
+
+    Collaborators:
+        - pythoneda.shared.git.GitOperation: Asks for a slot before running git.
+    """
+
+    _singleton = None
+
+    # "clone" writes a new folder, not the one it runs in, and "push" only
+    # reads the local refs: neither locks the folder for its whole transfer.
+    WRITE_COMMANDS = frozenset(
+        [
+            "add",
+            "am",
+            "apply",
+            "branch",
+            "checkout",
+            "cherry-pick",
+            "clean",
+            "commit",
+            "config",
+            "fetch",
+            "gc",
+            "init",
+            "merge",
+            "mktag",
+            "mv",
+            "pull",
+            "rebase",
+            "remote",
+            "reset",
+            "restore",
+            "revert",
+            "rm",
+            "stash",
+            "switch",
+            "tag",
+            "update-index",
+            "update-ref",
+            "worktree",
+        ]
+    )
+
+    def __init__(self, maxProcesses: int = 64):
+        """
+        Creates a new GitScheduler instance.
+        :param maxProcesses: The maximum number of live git processes.
+        :type maxProcesses: int
+        """
+        super().__init__()
+        # the state is shared by every event loop, such as the ones blocking
+        # calls run in, so it is guarded by a thread lock, and each waiter is
+        # woken up within its own loop
+        self._mutex = threading.Lock()
+        self._processes = self._gate(maxProcesses)
+        self._folders = {}
+        self._queued = 0
+        self._max_queued = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide scheduler.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitScheduler
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def max_processes(self) -> int:
+        """
+        Retrieves the maximum number of live git processes.
+        :return: Such limit.
+        :rtype: int
+        """
+        return self._processes["capacity"]
+
+    def set_max_processes(self, maxProcesses: int):
+        """
+        Changes the maximum number of live git processes.
+        :param maxProcesses: The new limit.
+        :type maxProcesses: int
+        """
+        with self._mutex:
+            self._processes["capacity"] = maxProcesses
+            granted = self._grant(self._processes)
+        self._deliver_all(self._processes, granted)
+
+    @classmethod
+    def subcommand(cls, args: List[str]) -> str:
+        """
+        Extracts the git subcommand from given command-line args.
+        :param args: The command-line args, starting with the git binary.
+        :type args: List[str]
+        :return: The subcommand, or None if not found.
+        :rtype: str
+        """
+        result = None
+        index = 1
+        while index < len(args):
+            arg = args[index]
+            if arg in ("-c", "-C"):
+                index += 2
+            elif arg.startswith("-"):
+                index += 1
+            else:
+                result = arg
+                break
+
+        return result
+
+    @classmethod
+    def is_write(cls, args: List[str]) -> bool:
+        """
+        Checks whether given command modifies the repository.
+        :param args: The command-line args, starting with the git binary.
+        :type args: List[str]
+        :return: True in such case.
+        :rtype: bool
+        """
+        return cls.subcommand(args) in cls.WRITE_COMMANDS
+
+    @staticmethod
+    def _gate(capacity: int) -> Dict:
+        """
+        Creates a gate letting up to given number of holders in.
+        :param capacity: Such number.
+        :type capacity: int
+        :return: The gate.
+        :rtype: Dict
+        """
+        return {"capacity": capacity, "held": 0, "waiters": deque(), "users": 0}
+
+    def _grant(self, gate: Dict) -> List[List]:
+        """
+        Hands free places of given gate to its oldest waiters. Called with the
+        mutex held.
+        :param gate: The gate.
+        :type gate: Dict
+        :return: The waiters granted a place, to be woken up.
+        :rtype: List[List]
+        """
+        result = []
+        while gate["waiters"] and gate["held"] < gate["capacity"]:
+            waiter = gate["waiters"].popleft()
+            waiter[2] = True
+            gate["held"] += 1
+            result.append(waiter)
+
+        return result
+
+    def _deliver_all(self, gate: Dict, waiters: List[List]):
+        """
+        Wakes up given waiters of given gate, within their loops.
+        :param gate: The gate.
+        :type gate: Dict
+        :param waiters: The (loop, future, granted) waiters.
+        :type waiters: List[List]
+        """
+        for waiter in waiters:
+            try:
+                waiter[0].call_soon_threadsafe(self._deliver, gate, waiter)
+            except RuntimeError:
+                # its loop is closed: nobody will take the place
+                self._release(gate)
+
+    def _deliver(self, gate: Dict, waiter: List):
+        """
+        Wakes up a waiter granted a place, within its loop.
+        :param gate: The gate.
+        :type gate: Dict
+        :param waiter: The (loop, future, granted) waiter.
+        :type waiter: List
+        """
+        if waiter[1].done():
+            # cancelled meanwhile
+            self._release(gate)
+        else:
+            waiter[1].set_result(None)
+
+    async def _acquire(self, gate: Dict):
+        """
+        Waits for a place in given gate.
+        :param gate: The gate.
+        :type gate: Dict
+        """
+        loop = asyncio.get_running_loop()
+        with self._mutex:
+            if gate["held"] < gate["capacity"] and not gate["waiters"]:
+                gate["held"] += 1
+                return
+            waiter = [loop, loop.create_future(), False]
+            gate["waiters"].append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._mutex:
+                granted = waiter[2]
+                if not granted:
+                    gate["waiters"].remove(waiter)
+            # if granted but not woken up yet, _deliver gives the place back
+            if granted and waiter[1].done() and not waiter[1].cancelled():
+                self._release(gate)
+            raise
+
+    def _release(self, gate: Dict):
+        """
+        Frees a place of given gate.
+        :param gate: The gate.
+        :type gate: Dict
+        """
+        with self._mutex:
+            gate["held"] -= 1
+            granted = self._grant(gate)
+        self._deliver_all(gate, granted)
+
+    async def _acquire_folder(self, folder: str) -> Dict:
+        """
+        Takes the write lock of given folder.
+        :param folder: The normalized folder.
+        :type folder: str
+        :return: The gate of the folder.
+        :rtype: Dict
+        """
+        with self._mutex:
+            result = self._folders.get(folder, None)
+            if result is None:
+                result = self._gate(1)
+                self._folders[folder] = result
+            result["users"] += 1
+        try:
+            await self._acquire(result)
+        except BaseException:
+            self._forget_folder(folder, result)
+            raise
+
+        return result
+
+    def _release_folder(self, folder: str, gate: Dict):
+        """
+        Releases the write lock of given folder.
+        :param folder: The normalized folder.
+        :type folder: str
+        :param gate: The gate of the folder.
+        :type gate: Dict
+        """
+        self._release(gate)
+        self._forget_folder(folder, gate)
+
+    def _forget_folder(self, folder: str, gate: Dict):
+        """
+        Drops the lock of given folder when nobody uses it anymore.
+        :param folder: The normalized folder.
+        :type folder: str
+        :param gate: The gate of the folder.
+        :type gate: Dict
+        """
+        with self._mutex:
+            gate["users"] -= 1
+            if gate["users"] == 0 and self._folders.get(folder, None) is gate:
+                del self._folders[folder]
+
+    @asynccontextmanager
+    async def slot(self, folder: str, args: List[str]):
+        """
+        Waits until given command can run, and holds its slot meanwhile.
+        :param folder: The folder the command runs in.
+        :type folder: str
+        :param args: The command-line args.
+        :type args: List[str]
+        """
+        path = os.path.realpath(folder)
+        write = self.is_write(args)
+        started = time.monotonic()
+        with self._mutex:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        gate = None
+        try:
+            if write:
+                gate = await self._acquire_folder(path)
+            try:
+                await self._acquire(self._processes)
+            except BaseException:
+                if gate is not None:
+                    self._release_folder(path, gate)
+                raise
+        finally:
+            with self._mutex:
+                self._queued -= 1
+        self._record_wait(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release(self._processes)
+            if gate is not None:
+                self._release_folder(path, gate)
+
+    def _record_wait(self, elapsed: float):
+        """
+        Accumulates the time a command spent waiting for its slot.
+        :param elapsed: The wait, in seconds.
+        :type elapsed: float
+        """
+        with self._mutex:
+            self._waits += 1
+            self._total_wait += elapsed
+            self._max_wait = max(self._max_wait, elapsed)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Retrieves the scheduler metrics.
+        :return: A dictionary with the queue depth, running processes and waits.
+        :rtype: Dict[str, float]
+        """
+        return {
+            "queue_depth": self._queued,
+            "max_queue_depth": self._max_queued,
+            "running": self._processes["held"],
+            "max_processes": self._processes["capacity"],
+            "locked_folders": len(self._folders),
+            "waits": self._waits,
+            "wait_seconds_total": self._total_wait,
+            "wait_seconds_max": self._max_wait,
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,181 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_span.py
+
+This file declares the GitSpan class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from pythoneda.shared import BaseObject
+import time
+from typing import Dict
+
+
+class GitSpan(BaseObject):
+    """
+    A timed section of work, part of a trace.
+
+    Class name: GitSpan
+
+    Responsibilities:
+        - Measures the duration of a piece of work.
+        - Links to its parent span, and shares its trace id.
+        - Carries attributes describing the work, and its outcome.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTracer: Creates the spans.
+    """
+
+    def __init__(self, name: str, parent=None, attributes: Dict = None):
+        """
+        Creates a new GitSpan instance, starting it.
+        :param name: The span name.
+        :type name: str
+        :param parent: The parent span, if any.
+        :type parent: pythoneda.shared.git.GitSpan
+        :param attributes: The attributes.
+        :type attributes: Dict
+        """
+        super().__init__()
+        self._name = name
+        self._span_id = os.urandom(8).hex()
+        if parent is None:
+            self._trace_id = os.urandom(16).hex()
+            self._parent_id = None
+        else:
+            self._trace_id = parent.trace_id
+            self._parent_id = parent.span_id
+        self._attributes = dict(attributes or {})
+        self._outcome = "ok"
+        self._start = time.time()
+        self._started = time.perf_counter()
+        self._duration = None
+
+    @property
+    def name(self) -> str:
+        """
+        Retrieves the span name.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def trace_id(self) -> str:
+        """
+        Retrieves the id of the trace the span belongs to.
+        :return: Such id.
+        :rtype: str
+        """
+        return self._trace_id
+
+    @property
+    def span_id(self) -> str:
+        """
+        Retrieves the span id.
+        :return: Such id.
+        :rtype: str
+        """
+        return self._span_id
+
+    @property
+    def parent_id(self) -> str:
+        """
+        Retrieves the id of the parent span.
+        :return: Such id, or None for root spans.
+        :rtype: str
+        """
+        return self._parent_id
+
+    @property
+    def attributes(self) -> Dict:
+        """
+        Retrieves the attributes.
+        :return: Such attributes.
+        :rtype: Dict
+        """
+        return self._attributes
+
+    @property
+    def outcome(self) -> str:
+        """
+        Retrieves the outcome.
+        :return: "ok", or the name of the exception raised.
+        :rtype: str
+        """
+        return self._outcome
+
+    @property
+    def duration(self) -> float:
+        """
+        Retrieves the duration.
+        :return: Such duration in seconds, or None if still running.
+        :rtype: float
+        """
+        return self._duration
+
+    def set_attribute(self, name: str, value):
+        """
+        Annotates the span.
+        :param name: The attribute name.
+        :type name: str
+        :param value: The value, serializable as JSON.
+        :type value: object
+        """
+        self._attributes[name] = value
+
+    def fail(self, error: BaseException):
+        """
+        Marks the span as failed.
+        :param error: The error.
+        :type error: BaseException
+        """
+        self._outcome = type(error).__name__
+
+    def finish(self):
+        """
+        Ends the span.
+        """
+        if self._duration is None:
+            self._duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict:
+        """
+        Retrieves the span as a dictionary.
+        :return: Such dictionary.
+        :rtype: Dict
+        """
+        return {
+            "trace_id": self._trace_id,
+            "span_id": self._span_id,
+            "parent_id": self._parent_id,
+            "name": self._name,
+            "start": self._start,
+            "duration": self._duration,
+            "outcome": self._outcome,
+            "attributes": self._attributes,
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,63 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_span_exporter.py
+
+This file declares the GitSpanExporter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+from .git_span import GitSpan
+from pythoneda.shared import BaseObject
+
+
+class GitSpanExporter(BaseObject, abc.ABC):
+    """
+    Sends finished spans somewhere.
+
+    Class name: GitSpanExporter
+
+    Responsibilities:
+        - Defines the interface of span exporters.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTracer: Hands finished spans to its exporter.
+    """
+
+    @abc.abstractmethod
+    def export(self, span: GitSpan):
+        """
+        Exports given span.
+        :param span: The finished span.
+        :type span: pythoneda.shared.git.GitSpan
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Releases any resources held by the exporter.
+        """
+        pass
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -19,6 +19,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
 from .git_stash_pop_failed import GitStashPopFailed
 from .git_stash_push_failed import GitStashPushFailed
@@ -38,13 +39,15 @@ class GitStash(GitOperation):
         - pythoneda.shared.git.GitStashFailed: If the operation fails.
     """
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitStash instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def push(self, message: str = None) -> str:
         """
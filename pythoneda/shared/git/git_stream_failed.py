@@ -0,0 +1,83 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_stream_failed.py
+
+This file defines the GitStreamFailed exception class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+from typing import List
+
+
+class GitStreamFailed(Exception, BaseObject):
+    """
+    A streamed git command exited with an error.
+
+    Class name: GitStreamFailed
+
+    Responsibilities:
+        - Represent the error when a streamed git command fails.
+
+    Collaborators:
+        - None
+    """
+
+    def __init__(self, args: List[str], folder: str, code: int, message: str):
+        """
+        Creates a new GitStreamFailed instance.
+        :param args: The command-line args.
+        :type args: List[str]
+        :param folder: The folder with the cloned repository.
+        :type folder: str
+        :param code: The exit code.
+        :type code: int
+        :param message: The error message.
+        :type message: str
+        """
+        super().__init__(
+            f'"{" ".join(args)}" in folder {folder} failed ({code}): {message}'
+        )
+        self._code = code
+        self._output = message
+
+    @property
+    def code(self) -> int:
+        """
+        Retrieves the exit code of the git command.
+        :return: Such code.
+        :rtype: int
+        """
+        return self._code
+
+    @property
+    def output(self) -> str:
+        """
+        Retrieves the error output of the git command.
+        :return: Such output.
+        :rtype: str
+        """
+        return self._output
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
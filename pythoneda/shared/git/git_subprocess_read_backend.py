@@ -0,0 +1,273 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_subprocess_read_backend.py
+
+This file declares the GitSubprocessReadBackend class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_diff_failed import GitDiffFailed
+from .git_for_each_ref_failed import GitForEachRefFailed
+from .git_read_backend import GitReadBackend
+from .git_repo_registry import GitRepoRegistry
+from .git_tag_index import GitTagIndex
+from typing import Dict, List, Tuple
+
+
+class GitSubprocessReadBackend(GitReadBackend):
+    """
+    Answers read-only queries through GitPython and the git binary.
+
+    Class name: GitSubprocessReadBackend
+
+    Responsibilities:
+        - Supports every read operation, as the fallback backend.
+        - Lists tags with a single "git for-each-ref".
+        - Runs git through an operation, so it gets scheduled, timed out,
+          recorded and replayed.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRepoRegistry: Provides the git.Repo handles.
+        - pythoneda.shared.git.GitOperation: Runs git.
+    """
+
+    OPERATIONS = frozenset(
+        [
+            GitReadBackend.TAG_NAMES,
+            GitReadBackend.TAGS,
+            GitReadBackend.HEAD_COMMIT,
+            GitReadBackend.REMOTE_URLS,
+            GitReadBackend.CURRENT_BRANCH,
+            GitReadBackend.DIFF,
+            GitReadBackend.TAG_REFS,
+        ]
+    )
+
+    PRIORITY = 100
+
+    # semver versions start with a digit: the rest never reach python
+    VERSION_PATTERNS = ["refs/tags/[0-9]*"]
+
+    # the smallest number of tags fetched when only the latest ones are wanted
+    WINDOW = 32
+
+    @property
+    def repo(self):
+        """
+        Retrieves the GitPython repository.
+        :return: Such instance.
+        :rtype: git.Repo
+        """
+        return GitRepoRegistry.instance().get(self.folder)
+
+    def tag_names(self) -> List[str]:
+        """
+        Retrieves the names of all tags.
+        :return: Such names.
+        :rtype: List[str]
+        """
+        return [tag.name for tag in self.repo.tags]
+
+    def _for_each_ref(
+        self, fields: List[str], options: List[str], patterns: List[str] = None
+    ) -> List[List[str]]:
+        """
+        Lists the tags through "git for-each-ref", with NUL-separated fields.
+        :param fields: The format fields, e.g. "refname:strip=2".
+        :type fields: List[str]
+        :param options: Additional options, such as the sort order.
+        :type options: List[str]
+        :param patterns: The patterns of the refs to list. Defaults to all tags.
+        :type patterns: List[str]
+        :return: The fields of each tag.
+        :rtype: List[List[str]]
+        :raise pythoneda.shared.git.GitForEachRefFailed: If git fails.
+        """
+        outcome = self.runner.run_blocking(
+            [
+                "git",
+                "for-each-ref",
+                "--format=" + "%00".join(f"%({field})" for field in fields),
+                *options,
+                *(patterns or ["refs/tags"]),
+            ]
+        )
+        if not outcome.succeeded:
+            GitSubprocessReadBackend.logger().error(outcome.stderr)
+            raise GitForEachRefFailed(self.folder, outcome.stderr)
+        output = outcome.stdout_bytes.decode("utf-8", "surrogateescape")
+
+        # only "\n" ends a ref: str.splitlines() would also split on the
+        # U+2028 and alike a refname or subject may contain
+        return [line.split("\0") for line in output.split("\n") if line]
+
+    def tags(self) -> List[Tuple[str, str, int]]:
+        """
+        Retrieves the tags pointing to commits, sorted by name.
+        :return: A list of (name, peeled commit sha, commit timestamp) tuples.
+        :rtype: List[Tuple[str, str, int]]
+        """
+        result = []
+        for (
+            name,
+            kind,
+            sha,
+            peeled_kind,
+            peeled,
+            date,
+            peeled_date,
+        ) in self._for_each_ref(
+            [
+                "refname:strip=2",
+                "objecttype",
+                "objectname",
+                "*objecttype",
+                "*objectname",
+                "committerdate:unix",
+                "*committerdate:unix",
+            ],
+            ["--sort=refname"],
+        ):
+            if kind == "commit":
+                result.append((name, sha, int(date)))
+            elif peeled_kind == "commit":
+                result.append((name, peeled, int(peeled_date)))
+
+        return result
+
+    def tag_refs(self, limit: int = None) -> List[Tuple[str, str, int, str]]:
+        """
+        Retrieves the valid semver tags, latest first, as GitTag.latest_tag()
+        ranks them.
+        With a limit, git lists only the highest tags by version, in a window
+        widened until it holds enough valid semver tags.
+        :param limit: The maximum number of tags to retrieve, or None for all.
+        :type limit: int
+        :return: A list of (object sha, peeled sha, tagger timestamp or None
+          for lightweight tags, name) tuples.
+        :rtype: List[Tuple[str, str, int, str]]
+        """
+        count = None
+        if limit is not None:
+            count = max(2 * limit, self.__class__.WINDOW)
+        while True:
+            options = ["--sort=refname"]
+            if count is not None:
+                options = ["--sort=-v:refname", f"--count={count}"]
+            refs = self._for_each_ref(
+                ["objectname", "*objectname", "taggerdate:unix", "refname:strip=2"],
+                options,
+                self.__class__.VERSION_PATTERNS,
+            )
+            ranked = []
+            for sha, peeled, date, name in refs:
+                key = GitTagIndex.sort_key(name)
+                if key is not None:
+                    ranked.append(
+                        (key, (sha, peeled or sha, int(date) if date else None, name))
+                    )
+            if count is None or len(refs) < count or self._ranked(ranked, limit):
+                break
+            count *= 4
+
+        # git's version sort ranks names such as "1.x" or "1.0" too, and
+        # differs from semver in prereleases and build numbers, so the tags are
+        # filtered and ranked here instead; both sorts are stable, keeping the
+        # lowest name first among equal versions
+        ranked.sort(key=lambda entry: entry[1][3])
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+
+        return [entry for (_, entry) in ranked]
+
+    @staticmethod
+    def _ranked(window: List[Tuple[Tuple, Tuple]], limit: int) -> bool:
+        """
+        Checks whether a window of tags, in git's descending version order,
+        holds the latest ones. Git and semver agree on tags of different
+        major.minor.patch versions, so it does once the window ends below the
+        version of the last wanted tag.
+        :param window: The (sort key, tag) tuples of the valid semver tags.
+        :type window: List[Tuple[Tuple, Tuple]]
+        :param limit: The number of tags wanted.
+        :type limit: int
+        :return: True in such case.
+        :rtype: bool
+        """
+        if limit < 1:
+            return True
+        if len(window) < limit:
+            return False
+        keys = sorted((key for (key, _) in window), reverse=True)
+
+        return window[-1][0][:3] < keys[limit - 1][:3]
+
+    def head_commit(self) -> str:
+        """
+        Retrieves the commit HEAD points to.
+        :return: Its sha.
+        :rtype: str
+        """
+        return self.repo.head.commit.hexsha
+
+    def remote_urls(self) -> Dict[str, List[str]]:
+        """
+        Retrieves the remote urls.
+        :return: For each remote repository, a list with its urls.
+        :rtype: Dict[str, List[str]]
+        """
+        result = {}
+        for remote in self.repo.remotes:
+            result[remote.name] = list(remote.urls)
+
+        return result
+
+    def current_branch(self) -> str:
+        """
+        Retrieves the current branch.
+        :return: Its name.
+        :rtype: str
+        """
+        return self.repo.active_branch.name
+
+    def diff(self, old: str, new: str) -> str:
+        """
+        Retrieves the diff between two revisions.
+        :param old: The old revision.
+        :type old: str
+        :param new: The new revision.
+        :type new: str
+        :return: The diff, as a patch.
+        :rtype: str
+        :raise pythoneda.shared.git.GitDiffFailed: If git fails.
+        """
+        outcome = self.runner.run_blocking(["git", "diff", old, new])
+        if not outcome.succeeded:
+            GitSubprocessReadBackend.logger().error(outcome.stderr)
+            raise GitDiffFailed(self.folder)
+
+        return outcome.stdout
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
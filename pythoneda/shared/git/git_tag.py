@@ -19,13 +19,20 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+from .git_execution_context import GitExecutionContext
 from .git_operation import GitOperation
+from .git_read_backend import GitReadBackend
+from .git_remote_tags import GitRemoteTags
 from .git_tag_failed import GitTagFailed
-from .invalid_github_credentials import InvalidGithubCredentials
-from packaging import version
+from .git_tag_commit_index import GitTagCommitIndex
+from .git_tag_index import GitTagIndex
+from .github_client import GithubClient
+import asyncio
+import os
 import re
-import requests
 import semver
+import tempfile
+from typing import Any, Dict, Iterable, List, Tuple
 
 
 class GitTag(GitOperation):
@@ -36,18 +43,30 @@ class GitTag(GitOperation):
 
     Responsibilities:
         - Provides the "git tag" operation.
+        - Creates many tags at once, atomically.
 
     Collaborators:
-        - None
+        - pythoneda.shared.git.GitTagIndex: Ranks the tags.
+        - pythoneda.shared.git.GitTagCommitIndex: Finds the tags of a commit.
+        - pythoneda.shared.git.GitRemoteTags: Checks tags in remote repositories.
+        - pythoneda.shared.git.GithubClient: Lists the tags of GitHub repositories.
     """
 
-    def __init__(self, folder: str):
+    GITHUB_GRAPHQL_BATCH = 50
+
+    GITHUB_GRAPHQL_PAGE = 100
+
+    _uninstrumented = ("is_valid_version",)
+
+    def __init__(self, folder: str, context: GitExecutionContext = None):
         """
         Creates a new GitTag instance for given folder.
         :param folder: The cloned repository.
         :type folder: str
+        :param context: The execution context, or None for the default one.
+        :type context: pythoneda.shared.git.GitExecutionContext
         """
-        super().__init__(folder)
+        super().__init__(folder, context=context)
 
     async def tag(self, tag: str, message: str = "no message") -> bool:
         """
@@ -67,63 +86,165 @@ class GitTag(GitOperation):
 
         return True
 
+    async def create_many(self, tags: List[Tuple[str, str, str]]) -> Dict[str, str]:
+        """
+        Creates many tags in a local repository, all or none of them.
+        Targets are resolved through the shared "git cat-file --batch" worker,
+        the annotated tag objects are written by a single "git hash-object",
+        and the refs are created in a single "git update-ref --stdin"
+        transaction, which fails if any of them exists already.
+        :param tags: The (name, target, message) tuples. A None message creates
+          a lightweight tag.
+        :type tags: List[Tuple[str, str, str]]
+        :return: The object each new ref points to, by tag name.
+        :rtype: Dict[str, str]
+        :raise pythoneda.shared.git.GitTagFailed: If any tag cannot be created,
+          or any name contains whitespace or control characters.
+        """
+        result = {}
+
+        names = [name for (name, _, _) in tags]
+        if not names:
+            return result
+        if len(set(names)) != len(names):
+            raise GitTagFailed(" ".join(names), self.folder, "duplicated tag names")
+        # names go verbatim into the tag objects and the update-ref script, so
+        # whitespace and control characters could inject headers or commands;
+        # git rejects any other invalid name within the transaction
+        invalid = [
+            name for name in names if not name or re.search(r"[\x00-\x20\x7f]", name)
+        ]
+        if invalid:
+            raise GitTagFailed(
+                " ".join(names), self.folder, f"invalid tag names: {invalid!r}"
+            )
+
+        headers = await asyncio.gather(
+            *[self.read_object_header(target) for (_, target, _) in tags]
+        )
+        missing = [tags[i][1] for (i, header) in enumerate(headers) if header is None]
+        if missing:
+            raise GitTagFailed(
+                " ".join(names), self.folder, f"unknown targets: {' '.join(missing)}"
+            )
+
+        annotated = [
+            i for (i, (_, _, message)) in enumerate(tags) if message is not None
+        ]
+        objects = [header[0] for header in headers]
+        if annotated:
+            tagger = await self._tagger()
+            with tempfile.TemporaryDirectory(prefix="pythoneda-tags-") as folder:
+                paths = []
+                for i in annotated:
+                    (name, _, message) = tags[i]
+                    (sha, kind, _) = headers[i]
+                    if not message.endswith("\n"):
+                        message = message + "\n"
+                    path = os.path.join(folder, str(i))
+                    with open(path, "w", encoding="utf-8") as file:
+                        file.write(
+                            f"object {sha}\ntype {kind}\ntag {name}\n"
+                            f"tagger {tagger}\n\n{message}"
+                        )
+                    paths.append(path)
+                (code, stdout, stderr) = await self.run(
+                    ["git", "hash-object", "-t", "tag", "-w", "--stdin-paths"],
+                    input="".join(f"{path}\n" for path in paths).encode("utf-8"),
+                )
+            if code != 0:
+                GitTag.logger().error(stderr)
+                raise GitTagFailed(" ".join(names), self.folder, stderr)
+            for i, sha in zip(annotated, stdout.split()):
+                objects[i] = sha
+
+        transaction = ["start"]
+        transaction.extend(
+            f"create refs/tags/{name} {sha}" for (name, sha) in zip(names, objects)
+        )
+        transaction.extend(["prepare", "commit", ""])
+        (code, stdout, stderr) = await self.run(
+            ["git", "update-ref", "--stdin"],
+            input="\n".join(transaction).encode("utf-8"),
+        )
+        if code != 0:
+            GitTag.logger().error(stderr)
+            raise GitTagFailed(" ".join(names), self.folder, stderr)
+
+        result = dict(zip(names, objects))
+
+        return result
+
+    async def _tagger(self) -> str:
+        """
+        Retrieves the tagger line of new annotated tags, as "git tag" writes it,
+        honoring the configuration and environment of the execution context.
+        :return: The name, the email, the timestamp and the timezone offset.
+        :rtype: str
+        :raise pythoneda.shared.git.GitTagFailed: If git has no identity.
+        """
+        (code, stdout, stderr) = await self.run(["git", "var", "GIT_COMMITTER_IDENT"])
+        if code != 0:
+            GitTag.logger().error(stderr)
+            raise GitTagFailed("", self.folder, stderr)
+
+        return stdout.strip()
+
     def latest_tag(self) -> str:
         """
         Retrieves the latest tag.
         :return: Such name.
         :rtype: str
         """
-        result = None
-        versions = []
-        for tag in self.repo.tags:
-            try:
-                version_info = semver.VersionInfo.parse(tag.name)
-                build = 0
-                match = re.search(r"\+build\.(\d+)", tag.name)
-                if match:
-                    build = int(match.group(1))
+        # the index lists the tags again only when they change
+        return GitTagIndex.for_folder(self.folder).latest(
+            lambda: [name for (_, _, _, name) in self.tag_refs()]
+        )
 
-                versions.append((version_info, build, tag.name))
-            except ValueError:
-                pass
-
-        if versions:
-            versions.sort(key=lambda v: (v[0], v[1]), reverse=True)
-            result = versions[0][2]
-
-        return result
+    def tag_refs(self, limit: int = None) -> List[Tuple[str, str, int, str]]:
+        """
+        Retrieves the valid semver tags, latest first, in a single
+        "git for-each-ref" run through this operation.
+        :param limit: The maximum number of tags to retrieve, or None for all.
+        :type limit: int
+        :return: A list of (object sha, peeled sha, tagger timestamp or None
+          for lightweight tags, name) tuples.
+        :rtype: List[Tuple[str, str, int, str]]
+        """
+        return self.backend_for(GitReadBackend.TAG_REFS).tag_refs(limit)
 
     def current_tag(self) -> str:
         """
         Retrieves the current tag, i.e., the most recent tag pointing to the
-        same commit as HEAD.
+        same commit as HEAD. All of them share the commit date, so it's the
+        first one by name.
         :return: The current tag.
         :rtype: str
         """
         result = None
 
-        # Get the commit object for HEAD
-        head_commit = self.repo.head.commit
+        tags = self.tags_at(self.backend_for(GitReadBackend.HEAD_COMMIT).head_commit())
+        if tags:
+            result = tags[0]
 
-        # Initialize variables to keep track of the most recent tag and its commit date
-        most_recent_date = None
-
-        # Iterate through the tags
-        for tag_ref in self.repo.tags:
-            # Get the commit object for the tag
-            tag_commit = tag_ref.commit
+        return result
 
-            # Check if the tag points to the same commit as HEAD
-            if tag_commit == head_commit and self.is_valid_version(tag_ref.name):
-                # Update the most recent tag and date if this tag is more recent
-                if (
-                    most_recent_date is None
-                    or tag_commit.committed_datetime > most_recent_date
-                ):
-                    result = tag_ref.name
-                    most_recent_date = tag_commit.committed_datetime
+    def tags_at(self, rev: str) -> List[str]:
+        """
+        Retrieves the valid semver tags pointing to given commit, through an
+        index kept fresh across calls.
+        :param rev: The commit, as a full sha or any revision GitPython resolves.
+        :type rev: str
+        :return: The tag names, sorted.
+        :rtype: List[str]
+        """
+        commit = rev
+        if not re.fullmatch(r"[0-9a-f]{40}|[0-9a-f]{64}", rev):
+            commit = self.repo.commit(rev).hexsha
 
-        return result
+        return GitTagCommitIndex.for_folder(self.folder).tags_at(
+            commit, lambda: self.backend_for(GitReadBackend.TAGS).tags()
+        )
 
     def is_valid_version(self, tag: str) -> bool:
         """
@@ -147,7 +268,8 @@ class GitTag(GitOperation):
         cls, token: str, owner: str, repo: str, hashValue: str
     ) -> str:
         """
-        Retrieves the highest gitHub tag pointing to given hash.
+        Retrieves the highest gitHub tag pointing to given hash, from
+        synchronous code, as fetch_latest_github_tag() does.
         :param token: The gitHub token.
         :type token: str
         :param owner: The repository owner.
@@ -158,41 +280,183 @@ class GitTag(GitOperation):
         :type hashValue: str
         :return: The highest tag pointing to given commit, or None if none found.
         :rtype: Union(str,None)
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
         """
-        result = None
-        # GitHub API URL for tags
-        url = f"https://api.github.com/repos/{owner}/{repo}/tags"
+        return cls._blocking(cls.fetch_latest_github_tag(token, owner, repo, hashValue))
+
+    @classmethod
+    async def fetch_latest_github_tag(
+        cls, token: str, owner: str, repo: str, hashValue: str
+    ) -> str:
+        """
+        Retrieves the highest gitHub tag pointing to given hash, going through
+        all pages of tags and revalidating the cached ones.
+        :param token: The gitHub token.
+        :type token: str
+        :param owner: The repository owner.
+        :type owner: str
+        :param repo: The repository name.
+        :type repo: str
+        :param hashValue: The commit hash.
+        :type hashValue: str
+        :return: The highest tag pointing to given commit, or None if none found.
+        :rtype: Union(str,None)
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
+        """
+        # The commit filter runs as each page arrives, so only matching tags
+        # are kept, however many pages the repository has.
+        names = []
+        async for page in GithubClient.instance().pages(
+            f"/repos/{owner}/{repo}/tags", token
+        ):
+            names.extend(
+                tag["name"] for tag in page if tag["commit"]["sha"] == hashValue
+            )
+
+        return cls._highest_version(names)
 
-        # Headers for authentication
-        headers = {"Authorization": f"token {token}"}
+    @classmethod
+    def latest_github_tags(
+        cls, token: str, lookups: Iterable[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Any]:
+        """
+        Retrieves the highest gitHub tag pointing to each given hash, from
+        synchronous code, as fetch_latest_github_tags() does.
+        :param token: The gitHub token.
+        :type token: str
+        :param lookups: The (owner, repository name, commit hash) tuples.
+        :type lookups: Iterable[Tuple[str, str, str]]
+        :return: The highest tag pointing to each commit, or None if none found
+          or the repository does not exist, by lookup.
+        :rtype: Dict[Tuple[str, str, str], Any]
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
+        """
+        return cls._blocking(cls.fetch_latest_github_tags(token, lookups))
 
-        # Fetch the tags
-        response = requests.get(url, headers=headers)
-        tags = response.json()
+    @classmethod
+    async def fetch_latest_github_tags(
+        cls, token: str, lookups: Iterable[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Any]:
+        """
+        Retrieves the highest gitHub tag pointing to each given hash, as
+        fetch_latest_github_tag() does, with a few aliased GraphQL queries instead of
+        one REST listing per repository.
+        Each query covers up to GITHUB_GRAPHQL_BATCH repositories, and only the
+        repositories with more tags than fit in a page get queried again.
+        :param token: The gitHub token.
+        :type token: str
+        :param lookups: The (owner, repository name, commit hash) tuples.
+        :type lookups: Iterable[Tuple[str, str, str]]
+        :return: The highest tag pointing to each commit, or None if none found
+          or the repository does not exist, by lookup.
+        :rtype: Dict[Tuple[str, str, str], Any]
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
+        """
+        names = {lookup: [] for lookup in lookups}
+        # each repository is listed once, however many commits are looked up
+        pending = {(owner, repo): None for (owner, repo, _) in names}
+        client = GithubClient.instance()
+        size = cls.GITHUB_GRAPHQL_BATCH
+        while pending:
+            repos = list(pending.items())
+            pending = {}
+            for start in range(0, len(repos), size):
+                chunk = repos[start : start + size]
+                variables = {}
+                for index, ((owner, repo), cursor) in enumerate(chunk):
+                    variables[f"o{index}"] = owner
+                    variables[f"n{index}"] = repo
+                    variables[f"c{index}"] = cursor
+                response = await client.graphql(
+                    cls._github_tags_query(len(chunk)), token, variables
+                )
+                for index, (key, _) in enumerate(chunk):
+                    data = response["data"].get(f"r{index}", None)
+                    if data is None:
+                        GitTag.logger().warning(
+                            f"Cannot list the tags of {key[0]}/{key[1]}: "
+                            f"{response.get('errors', None)}"
+                        )
+                        continue
+                    refs = data["refs"]
+                    for node in refs["nodes"]:
+                        # peel annotated tags down to their commit
+                        target = node["target"] or {}
+                        while "target" in target:
+                            target = target["target"] or {}
+                        found = names.get(key + (target.get("oid", None),), None)
+                        if found is not None:
+                            found.append(node["name"])
+                    if refs["pageInfo"]["hasNextPage"]:
+                        pending[key] = refs["pageInfo"]["endCursor"]
+
+        return {
+            lookup: cls._highest_version(found) for (lookup, found) in names.items()
+        }
 
-        if isinstance(tags, dict) and tags.get("message", None) == "Bad credentials":
-            GitTag.logger().error("Invalid credentials")
-            raise InvalidGithubCredentials(url)
+    @classmethod
+    def _github_tags_query(cls, count: int) -> str:
+        """
+        Builds a GraphQL query listing a page of tags of several repositories,
+        aliased r0, r1..., with variables $o<n>, $n<n> and $c<n> for the owner,
+        the name and the cursor of each one.
+        :param count: The number of repositories.
+        :type count: int
+        :return: The query.
+        :rtype: str
+        """
+        variables = ", ".join(
+            f"$o{index}: String!, $n{index}: String!, $c{index}: String"
+            for index in range(count)
+        )
+        repositories = "\n".join(
+            f"  r{index}: repository(owner: $o{index}, name: $n{index}) {{\n"
+            f'    refs(refPrefix: "refs/tags/", first: {cls.GITHUB_GRAPHQL_PAGE}, '
+            f"after: $c{index}) {{\n"
+            "      pageInfo { hasNextPage endCursor }\n"
+            "      nodes { name target { oid "
+            "... on Tag { target { oid ... on Tag { target { oid } } } } } }\n"
+            "    }\n"
+            "  }"
+            for index in range(count)
+        )
+
+        return f"query({variables}) {{\n{repositories}\n}}"
 
-        # Filter tags pointing to the commit
-        commit_tags = [tag for tag in tags if tag["commit"]["sha"] == hashValue]
+    @classmethod
+    def _highest_version(cls, names: Iterable[str]) -> Any:
+        """
+        Retrieves the highest of given tags, ignoring the invalid versions.
+        :param names: The tag names.
+        :type names: Iterable[str]
+        :return: The highest one, as a packaging Version, or None if none is
+          valid.
+        :rtype: packaging.version.Version
+        """
+        # imported here so using tags locally does not pay for it
+        from packaging import version
 
-        # Parse versions and sort them
-        valid_versions = []
-        for tag in commit_tags:
+        result = None
+        for name in names:
             try:
-                # Append the parsed version
-                valid_versions.append(version.parse(tag["name"]))
+                candidate = version.parse(name)
             except version.InvalidVersion:
                 # Ignore invalid semantic versions
-                pass
-
-        # Sort versions
-        valid_versions.sort()
-
-        # Highest version
-        if valid_versions:
-            result = valid_versions[-1]
+                continue
+            if result is None or candidate > result:
+                result = candidate
 
         return result
 
@@ -200,21 +464,39 @@ class GitTag(GitOperation):
     async def tag_exists(cls, url: str, tag: str) -> bool:
         """
         Checks whether a tag exists in given repository.
+        The tags of each remote are listed once and cached for a while.
         :param url: The url of the repository.
         :type url: str
         :param tag: The tag to check.
         :type tag: str
         :return: True in such case.
         :rtype: bool
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If the repository
+          cannot be listed.
         """
-        result = False
-        (code, stdout, stderr) = await self.run(["git", "tag", "-m", message, tag])
-        if code == 0:
-            result = True
-        else:
-            GitTag.logger().error(stderr)
-            raise GitTagFailed(tag, self.folder, stderr)
-        return result
+        return await GitRemoteTags().exists(url, tag)
+
+    @classmethod
+    async def tags_exist(
+        cls, urls: List[str], tags: List[str]
+    ) -> Dict[str, Dict[str, bool]]:
+        """
+        Checks whether each tag exists in each repository, with a single
+        "git ls-remote" per repository at most.
+        :param urls: The urls of the repositories.
+        :type urls: List[str]
+        :param tags: The tags to check.
+        :type tags: List[str]
+        :return: For each url, whether each tag exists.
+        :rtype: Dict[str, Dict[str, bool]]
+        :raise pythoneda.shared.git.GitLsRemoteFailed: If a repository cannot
+          be listed.
+        """
+        found = await GitRemoteTags().existing(urls, tags)
+
+        return {
+            url: {tag: tag in names for tag in tags} for (url, names) in found.items()
+        }
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -0,0 +1,133 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_tag_commit_index.py
+
+This file declares the GitTagCommitIndex class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .git_refs_fingerprint import GitRefsFingerprint
+from .git_tag_index import GitTagIndex
+import os
+from pythoneda.shared import BaseObject
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+class GitTagCommitIndex(BaseObject):
+    """
+    A per-repository index from commits to the valid semver tags pointing to them.
+
+    Class name: GitTagCommitIndex
+
+    Responsibilities:
+        - Builds the index in a single pass over the tags.
+        - Rebuilds it when the refs fingerprint changes.
+        - Answers which tags point to any given commit.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRefsFingerprint: Detects tag changes.
+        - pythoneda.shared.git.GitTagIndex: Tells valid semver tags apart.
+        - pythoneda.shared.git.GitTag: Uses it to retrieve the current tag.
+    """
+
+    _indexes: Dict[str, "GitTagCommitIndex"] = {}
+
+    _lock = threading.Lock()
+
+    def __init__(self, folder: str):
+        """
+        Creates a new GitTagCommitIndex instance.
+        :param folder: The cloned repository.
+        :type folder: str
+        """
+        super().__init__()
+        self._fingerprint = GitRefsFingerprint(folder)
+        self._stamp = None
+        self._commits: Dict[str, List[str]] = {}
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def for_folder(cls, folder: str):
+        """
+        Retrieves the index of given repository, shared within the process.
+        :param folder: The cloned repository.
+        :type folder: str
+        :return: The index.
+        :rtype: pythoneda.shared.git.GitTagCommitIndex
+        """
+        key = os.path.realpath(folder)
+        with cls._lock:
+            result = cls._indexes.get(key, None)
+            if result is None:
+                result = cls(folder)
+                cls._indexes[key] = result
+
+        return result
+
+    def build(self, tags: Iterable[Tuple[str, str, int]]):
+        """
+        Replaces the index with given tags; tags which are not valid semver
+        are left out.
+        :param tags: The (name, peeled commit sha, commit timestamp) tuples,
+          sorted by name.
+        :type tags: Iterable[Tuple[str, str, int]]
+        """
+        commits = {}
+        for name, commit, _ in tags:
+            if GitTagIndex.sort_key(name) is not None:
+                commits.setdefault(commit, []).append(name)
+        self._commits = commits
+
+    def refresh(self, tags: Callable[[], Iterable[Tuple[str, str, int]]]):
+        """
+        Rebuilds the index if the refs changed since last time.
+        :param tags: Retrieves the (name, peeled commit sha, commit timestamp)
+          tuples, sorted by name; called only if needed.
+        :type tags: Callable[[], Iterable[Tuple[str, str, int]]]
+        """
+        with self._refresh_lock:
+            stamp = self._fingerprint.compute()
+            if stamp != self._stamp:
+                self.build(tags())
+                self._stamp = stamp
+
+    def tags_at(
+        self, commit: str, tags: Callable[[], Iterable[Tuple[str, str, int]]]
+    ) -> List[str]:
+        """
+        Retrieves the valid semver tags pointing to given commit.
+        :param commit: The commit sha.
+        :type commit: str
+        :param tags: Retrieves the (name, peeled commit sha, commit timestamp)
+          tuples, sorted by name; called only if they changed.
+        :type tags: Callable[[], Iterable[Tuple[str, str, int]]]
+        :return: The tag names, sorted.
+        :rtype: List[str]
+        """
+        self.refresh(tags)
+
+        return list(self._commits.get(commit, []))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
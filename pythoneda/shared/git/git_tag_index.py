@@ -0,0 +1,265 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_tag_index.py
+
+This file declares the GitTagIndex class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+from .git_refs_fingerprint import GitRefsFingerprint
+import os
+from pythoneda.shared import BaseObject
+import re
+import semver
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, Tuple, Union
+
+
+class GitTagIndex(BaseObject):
+    """
+    A per-repository index of tags, parsed into sortable semver keys.
+
+    Class name: GitTagIndex
+
+    Responsibilities:
+        - Keeps the sort key of each tag, parsing only tags not seen before.
+        - Refreshes itself when the refs fingerprint changes.
+        - Persists itself within the user's cache folder, so new processes
+          start warm.
+        - Answers the latest tag.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRefsFingerprint: Detects tag changes.
+        - pythoneda.shared.git.GitTag: Uses it to retrieve the latest tag.
+    """
+
+    FORMAT = 2
+
+    _indexes: Dict[str, "GitTagIndex"] = {}
+
+    _lock = threading.Lock()
+
+    def __init__(self, folder: str):
+        """
+        Creates a new GitTagIndex instance, loading the persisted index if any.
+        :param folder: The cloned repository.
+        :type folder: str
+        """
+        super().__init__()
+        self._fingerprint = GitRefsFingerprint(folder)
+        key = hashlib.sha256(self._fingerprint.common_dir.encode("utf-8")).hexdigest()
+        self._path = os.path.join(self.__class__.default_folder(), f"{key}.json")
+        self._stamp = None
+        self._keys: Dict[str, Union[Tuple, None]] = {}
+        self._latest = None
+        self._refresh_lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_folder(cls, folder: str):
+        """
+        Retrieves the index of given repository, shared within the process.
+        :param folder: The cloned repository.
+        :type folder: str
+        :return: The index.
+        :rtype: pythoneda.shared.git.GitTagIndex
+        """
+        key = os.path.realpath(folder)
+        with cls._lock:
+            result = cls._indexes.get(key, None)
+            if result is None:
+                result = cls(folder)
+                cls._indexes[key] = result
+
+        return result
+
+    @classmethod
+    def default_folder(cls) -> str:
+        """
+        Retrieves the folder the indexes are persisted to, following the XDG
+        convention.
+        :return: Such folder.
+        :rtype: str
+        """
+        base = os.environ.get("XDG_CACHE_HOME", None) or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        return os.path.join(base, "pythoneda", "tags")
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the file the index is persisted to.
+        :return: Such file.
+        :rtype: str
+        """
+        return self._path
+
+    @staticmethod
+    def sort_key(name: str) -> Union[Tuple, None]:
+        """
+        Parses a tag into a key sorting as semver precedence, then by the
+        "+build.N" number.
+        :param name: The tag.
+        :type name: str
+        :return: The key, or None if the tag is not a valid semver.
+        :rtype: Union[Tuple, None]
+        """
+        try:
+            version = semver.VersionInfo.parse(name)
+        except ValueError:
+            return None
+        prerelease = ()
+        if version.prerelease:
+            prerelease = tuple(
+                (0, int(part)) if part.isdigit() else (1, part)
+                for part in version.prerelease.split(".")
+            )
+        build = 0
+        match = re.search(r"\+build\.(\d+)", name)
+        if match:
+            build = int(match.group(1))
+
+        return (
+            version.major,
+            version.minor,
+            version.patch,
+            0 if prerelease else 1,
+            prerelease,
+            build,
+        )
+
+    @classmethod
+    def _thaw(cls, value):
+        """
+        Converts the lists of a key loaded from JSON back into tuples.
+        :param value: The loaded key.
+        :type value: object
+        :return: The key.
+        :rtype: object
+        """
+        if isinstance(value, list):
+            return tuple(cls._thaw(item) for item in value)
+        return value
+
+    def _load(self):
+        """
+        Loads the persisted index, ignoring it if unreadable or outdated.
+        """
+        try:
+            with open(self._path, encoding="utf-8") as file:
+                data = json.load(file)
+            if (
+                data.get("format", None) == self.__class__.FORMAT
+                and data.get("repository", None) == self._fingerprint.common_dir
+            ):
+                self._stamp = data["fingerprint"]
+                self._keys = {
+                    name: self._thaw(key) for name, key in data["tags"].items()
+                }
+        except (OSError, ValueError, KeyError):
+            self._stamp = None
+            self._keys = {}
+
+    def _save(self):
+        """
+        Persists the index atomically; failures only cost a cold start.
+        """
+        data = {
+            "format": self.__class__.FORMAT,
+            "repository": self._fingerprint.common_dir,
+            "fingerprint": self._stamp,
+            "tags": self._keys,
+        }
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            (fd, temporary) = tempfile.mkstemp(
+                dir=os.path.dirname(self._path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(temporary, self._path)
+        except OSError as err:
+            self.__class__.logger().debug(f"Could not save {self._path}: {err}")
+
+    def update(self, names: Iterable[str]) -> bool:
+        """
+        Brings the index in line with given tags, parsing only new ones.
+        :param names: All the current tags.
+        :type names: Iterable[str]
+        :return: True if the index changed.
+        :rtype: bool
+        """
+        current = set(names)
+        removed = [name for name in self._keys if name not in current]
+        added = [name for name in current if name not in self._keys]
+        for name in removed:
+            del self._keys[name]
+        for name in added:
+            self._keys[name] = self.sort_key(name)
+        if removed or added:
+            self._latest = None
+
+        return bool(removed or added)
+
+    def refresh(self, names: Callable[[], Iterable[str]]):
+        """
+        Updates and persists the index if the refs changed since last time.
+        :param names: Retrieves all the current tags; called only if needed.
+        :type names: Callable[[], Iterable[str]]
+        """
+        with self._refresh_lock:
+            stamp = self._fingerprint.compute()
+            if stamp != self._stamp:
+                self.update(names())
+                self._stamp = stamp
+                self._save()
+
+    def latest(self, names: Callable[[], Iterable[str]]) -> str:
+        """
+        Retrieves the latest tag: highest semver precedence, then highest build
+        number, then lowest name.
+        :param names: Retrieves all the current tags; called only if they changed.
+        :type names: Callable[[], Iterable[str]]
+        :return: Such tag, or None if no tag is a valid semver.
+        :rtype: str
+        """
+        self.refresh(names)
+        result = self._latest
+        if result is None:
+            best = None
+            for name, key in self._keys.items():
+                if key is None:
+                    continue
+                if best is None or key > best or (key == best and name < result):
+                    best = key
+                    result = name
+            self._latest = result
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
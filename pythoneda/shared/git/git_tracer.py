@@ -0,0 +1,256 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/git_tracer.py
+
+This file declares the GitTracer class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from contextlib import contextmanager
+import contextvars
+import functools
+from .git_span import GitSpan
+from .git_span_exporter import GitSpanExporter
+import inspect
+from pythoneda.shared import BaseObject
+from typing import Callable, Dict, Iterator
+
+
+class GitTracer(BaseObject):
+    """
+    Creates nested spans around git work.
+
+    Class name: GitTracer
+
+    Responsibilities:
+        - Opens spans as children of the current one, across asyncio tasks.
+        - Instruments methods so each call gets its span.
+        - Hands finished spans to the configured exporter; without one,
+          tracing costs nothing.
+
+    Collaborators:
+        - pythoneda.shared.git.GitSpan: The spans.
+        - pythoneda.shared.git.GitSpanExporter: Receives finished spans.
+    """
+
+    _singleton = None
+
+    _current = contextvars.ContextVar("pythoneda_shared_git_span", default=None)
+
+    def __init__(self):
+        """
+        Creates a new GitTracer instance.
+        """
+        super().__init__()
+        self._exporter = None
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide tracer.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GitTracer
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @property
+    def exporter(self) -> GitSpanExporter:
+        """
+        Retrieves the exporter.
+        :return: Such exporter, or None if tracing is disabled.
+        :rtype: pythoneda.shared.git.GitSpanExporter
+        """
+        return self._exporter
+
+    def set_exporter(self, exporter: GitSpanExporter):
+        """
+        Changes the exporter, closing the previous one.
+        :param exporter: The exporter, or None to disable tracing.
+        :type exporter: pythoneda.shared.git.GitSpanExporter
+        """
+        previous = self._exporter
+        self._exporter = exporter
+        if previous is not None and previous is not exporter:
+            previous.close()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Checks whether spans are recorded.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._exporter is not None
+
+    def current(self) -> GitSpan:
+        """
+        Retrieves the span of the running task.
+        :return: Such span, or None.
+        :rtype: pythoneda.shared.git.GitSpan
+        """
+        return self.__class__._current.get()
+
+    def start(self, name: str, attributes: Dict = None) -> GitSpan:
+        """
+        Starts a child of the current span, without making it current.
+        :param name: The span name.
+        :type name: str
+        :param attributes: The attributes.
+        :type attributes: Dict
+        :return: The span, or None if tracing is disabled.
+        :rtype: pythoneda.shared.git.GitSpan
+        """
+        result = None
+        if self._exporter is not None:
+            result = GitSpan(name, self.current(), attributes)
+
+        return result
+
+    def end(self, span: GitSpan, error: BaseException = None):
+        """
+        Ends given span, and exports it.
+        :param span: The span, or None.
+        :type span: pythoneda.shared.git.GitSpan
+        :param error: The error the work failed with, if any.
+        :type error: BaseException
+        """
+        if span is None:
+            return
+        if error is not None:
+            span.fail(error)
+        span.finish()
+        exporter = self._exporter
+        if exporter is not None:
+            try:
+                exporter.export(span)
+            except Exception as err:
+                self.__class__.logger().warning(f"Could not export span: {err}")
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[GitSpan]:
+        """
+        Runs the enclosed block within a child of the current span.
+        :param name: The span name.
+        :type name: str
+        :param attributes: The attributes.
+        :type attributes: Dict
+        :return: The span, or None if tracing is disabled.
+        :rtype: Iterator[pythoneda.shared.git.GitSpan]
+        """
+        span = self.start(name, attributes)
+        if span is None:
+            yield None
+            return
+        token = self.__class__._current.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            self.__class__._current.reset(token)
+            self.end(span, error)
+
+    @classmethod
+    def traced(cls, function: Callable, name: str = None) -> Callable:
+        """
+        Wraps a function so each call runs within its own span.
+        :param function: The function.
+        :type function: Callable
+        :param name: The span name. Defaults to the qualified function name.
+        :type name: str
+        :return: The wrapper.
+        :rtype: Callable
+        """
+        if name is None:
+            name = function.__qualname__
+        tracer = cls.instance
+
+        if inspect.isasyncgenfunction(function):
+
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                # async generators run in their caller's context, so their
+                # span is never made current
+                span = tracer().start(name)
+                error = None
+                stream = function(*args, **kwargs)
+                try:
+                    async for item in stream:
+                        yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as err:
+                    error = err
+                    raise
+                finally:
+                    await stream.aclose()
+                    tracer().end(span, error)
+
+        elif inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if not tracer().enabled:
+                    return await function(*args, **kwargs)
+                with tracer().span(name):
+                    return await function(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not tracer().enabled:
+                    return function(*args, **kwargs)
+                with tracer().span(name):
+                    return function(*args, **kwargs)
+
+        return wrapper
+
+    @classmethod
+    def instrument(cls, target: type):
+        """
+        Traces the public methods a class defines.
+        Names starting with "set_", and those listed in the class'
+        _uninstrumented attribute, are left alone.
+        :param target: The class.
+        :type target: type
+        """
+        skipped = getattr(target, "_uninstrumented", ())
+        for name, member in list(vars(target).items()):
+            if name.startswith("_") or name.startswith("set_") or name in skipped:
+                continue
+            span = f"{target.__name__}.{name}"
+            if isinstance(member, classmethod):
+                wrapped = classmethod(cls.traced(member.__func__, span))
+            elif inspect.isfunction(member):
+                wrapped = cls.traced(member, span)
+            else:
+                continue
+            setattr(target, name, wrapped)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,405 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/github_client.py
+
+This file declares the GithubClient class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .github_api_failed import GithubApiFailed
+from .github_rate_limiter import GithubRateLimiter
+from .github_response_cache import GithubResponseCache
+from .invalid_github_credentials import InvalidGithubCredentials
+from pythoneda.shared import BaseObject
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from urllib.parse import urlencode
+
+
+class GithubClient(BaseObject):
+    """
+    A client of GitHub's REST API.
+
+    Class name: GithubClient
+
+    Responsibilities:
+        - Keeps a pooled, keep-alive HTTP session.
+        - Revalidates cached responses with If-None-Match, so unchanged pages
+          cost a 304.
+        - Follows the Link header through all the pages of a listing.
+        - Runs GraphQL queries.
+        - Stays within the rate limits, spreading requests across tokens.
+        - Sends the requests from worker threads, so waiting for GitHub never
+          blocks the event loop.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubResponseCache: Keeps the responses.
+        - pythoneda.shared.git.GithubRateLimiter: Paces the requests.
+        - pythoneda.shared.git.GitTag: Looks up tags through it.
+        - pythoneda.shared.git.InvalidGithubCredentials: If GitHub rejects the
+          token.
+        - pythoneda.shared.git.GithubApiFailed: If GitHub answers with an error.
+    """
+
+    PAGE_SIZE = 100
+
+    POOL_SIZE = 10
+
+    TIMEOUT = 30.0
+
+    GRAPHQL_PATH = "/graphql"
+
+    _api_url = "https://api.github.com"
+
+    _cache_folder = None
+
+    _tokens: List[str] = []
+
+    _singleton = None
+
+    def __init__(self):
+        """
+        Creates a new GithubClient instance.
+        """
+        super().__init__()
+        self._session = None
+        self._cache = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide client.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GithubClient
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @classmethod
+    def api_url(cls) -> str:
+        """
+        Retrieves the base url of the API.
+        :return: Such url.
+        :rtype: str
+        """
+        return cls._api_url
+
+    @classmethod
+    def set_api_url(cls, url: str):
+        """
+        Changes the base url of the API, e.g. to a GitHub Enterprise server or
+        to a local stand-in.
+        :param url: The url.
+        :type url: str
+        """
+        cls._api_url = url.rstrip("/")
+
+    @classmethod
+    def cache_folder(cls) -> str:
+        """
+        Retrieves the folder responses are cached in.
+        :return: Such folder.
+        :rtype: str
+        """
+        return cls._cache_folder or GithubResponseCache.default_folder()
+
+    @classmethod
+    def set_cache_folder(cls, folder: str):
+        """
+        Changes the folder responses are cached in.
+        :param folder: The folder, or None for the default one.
+        :type folder: str
+        """
+        cls._cache_folder = folder
+        if cls._singleton is not None:
+            cls._singleton._cache = None
+
+    @classmethod
+    def tokens(cls) -> List[str]:
+        """
+        Retrieves the tokens requests without a token of their own are spread
+        across.
+        :return: Such tokens.
+        :rtype: List[str]
+        """
+        return cls._tokens
+
+    @classmethod
+    def set_tokens(cls, tokens: List[str]):
+        """
+        Changes the tokens requests without a token of their own are spread
+        across. Responses are cached under the token each one was sent with.
+        :param tokens: The tokens.
+        :type tokens: List[str]
+        """
+        cls._tokens = list(tokens)
+
+    @property
+    def session(self):
+        """
+        Retrieves the HTTP session, creating it on first access.
+        :return: Such session.
+        :rtype: requests.Session
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    # imported here so using tags locally does not pay for them
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.__class__.POOL_SIZE,
+                        pool_maxsize=self.__class__.POOL_SIZE,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers["Accept"] = "application/vnd.github+json"
+                    self._session = session
+        return self._session
+
+    @property
+    def cache(self) -> GithubResponseCache:
+        """
+        Retrieves the response cache.
+        :return: Such cache.
+        :rtype: pythoneda.shared.git.GithubResponseCache
+        """
+        if self._cache is None:
+            self._cache = GithubResponseCache(self.__class__.cache_folder())
+        return self._cache
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def url(self, path: str, params: Dict[str, Any] = None) -> str:
+        """
+        Builds the url of given API path.
+        :param path: The path, such as "/repos/{owner}/{repo}/tags", or a full url.
+        :type path: str
+        :param params: The query parameters, if any.
+        :type params: Dict[str, Any]
+        :return: The url.
+        :rtype: str
+        """
+        result = path
+        if path.startswith("/"):
+            result = self.__class__.api_url() + path
+        if params:
+            separator = "&" if "?" in result else "?"
+            result = f"{result}{separator}{urlencode(params)}"
+
+        return result
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        token: str,
+        resource: str,
+        scheme: str,
+        revalidate: bool = False,
+        **kwargs,
+    ) -> Tuple[Any, str, Dict[str, Any]]:
+        """
+        Sends a request within the rate limits, waiting for the budget of the
+        usable tokens to allow it, and retrying it if GitHub rate-limits it.
+        The caller's token is the only usable one; without it, the configured
+        tokens are, so a token never reaches repositories it was not meant for.
+        :param method: The HTTP method.
+        :type method: str
+        :param url: The url.
+        :type url: str
+        :param token: The GitHub token of the caller, or None.
+        :type token: str
+        :param resource: The rate-limit resource, such as "core" or "graphql".
+        :type resource: str
+        :param scheme: The authorization scheme.
+        :type scheme: str
+        :param revalidate: Whether to send the ETag of the response cached for
+          the token used, if any.
+        :type revalidate: bool
+        :param kwargs: Further arguments of the request.
+        :type kwargs: Dict
+        :return: A tuple with the response, the token it was sent with, and the
+          cached response it revalidated, if any.
+        :rtype: Tuple[requests.Response, str, Dict[str, Any]]
+        """
+        limiter = GithubRateLimiter.instance()
+        headers = kwargs.pop("headers", {})
+        candidates = [token] if token else list(self.__class__.tokens()) or [None]
+        while True:
+            spent = await limiter.acquire(candidates, resource)
+            headers.pop("Authorization", None)
+            if spent:
+                headers["Authorization"] = f"{scheme} {spent}"
+            cached = None
+            headers.pop("If-None-Match", None)
+            if revalidate:
+                cached = self.cache.get(url, spent)
+                if cached is not None and cached.get("etag", None):
+                    headers["If-None-Match"] = cached["etag"]
+            try:
+                response = await asyncio.to_thread(
+                    self.session.request,
+                    method,
+                    url,
+                    headers=headers,
+                    timeout=self.__class__.TIMEOUT,
+                    **kwargs,
+                )
+            except BaseException:
+                # no answer will tell the budget how many requests are left
+                limiter.release(spent, resource)
+                raise
+            text = ""
+            if response.status_code in (403, 429) or resource == "graphql":
+                text = response.text
+            if not limiter.update(
+                spent, resource, response.status_code, response.headers, text
+            ):
+                return (response, spent, cached)
+
+    async def get(self, url: str, token: str = None) -> Tuple[Any, str]:
+        """
+        Retrieves a resource, revalidating its cached copy if any.
+        :param url: The url.
+        :type url: str
+        :param token: The GitHub token, or None for anonymous access.
+        :type token: str
+        :return: A tuple with the parsed body and the url of the next page, or
+          None if it's the last one.
+        :rtype: Tuple[Any, str]
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
+        """
+        (response, spent, cached) = await self._request(
+            "GET", url, token, "core", "token", revalidate=True
+        )
+        if response.status_code == 304 and cached is not None:
+            return (cached["body"], cached.get("next", None))
+
+        if response.status_code == 401:
+            GithubClient.logger().error("Invalid credentials")
+            raise InvalidGithubCredentials(url)
+        if response.status_code >= 300:
+            message = response.text
+            try:
+                message = response.json().get("message", message)
+            except (ValueError, AttributeError):
+                pass
+            raise GithubApiFailed(url, response.status_code, message)
+
+        body = response.json()
+        next = response.links.get("next", {}).get("url", None)
+        etag = response.headers.get("ETag", None)
+        if etag:
+            self.cache.put(url, spent, etag, body, next)
+
+        return (body, next)
+
+    async def graphql(
+        self, query: str, token: str, variables: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs a GraphQL query.
+        :param query: The query.
+        :type query: str
+        :param token: The GitHub token. GraphQL does not allow anonymous access.
+        :type token: str
+        :param variables: The values of the query variables, if any.
+        :type variables: Dict[str, Any]
+        :return: The parsed response, with its "data" and, if some part of the
+          query failed, "errors" entries.
+        :rtype: Dict[str, Any]
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error, or the query fails as a whole.
+        """
+        url = self.url(self.__class__.GRAPHQL_PATH)
+        (response, _, _) = await self._request(
+            "POST",
+            url,
+            token,
+            "graphql",
+            "bearer",
+            json={"query": query, "variables": variables or {}},
+        )
+        if response.status_code == 401:
+            GithubClient.logger().error("Invalid credentials")
+            raise InvalidGithubCredentials(url)
+        if response.status_code >= 300:
+            raise GithubApiFailed(url, response.status_code, response.text)
+
+        result = response.json()
+        if result.get("data", None) is None:
+            raise GithubApiFailed(
+                url,
+                response.status_code,
+                "; ".join(
+                    error.get("message", "") for error in result.get("errors", [])
+                ),
+            )
+
+        return result
+
+    async def pages(
+        self, path: str, token: str = None, params: Dict[str, Any] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Retrieves all the pages of a listing, one at a time.
+        :param path: The API path of the listing.
+        :type path: str
+        :param token: The GitHub token, or None for anonymous access.
+        :type token: str
+        :param params: Extra query parameters, if any.
+        :type params: Dict[str, Any]
+        :return: An asynchronous iterator over the parsed pages.
+        :rtype: AsyncIterator[Any]
+        :raise pythoneda.shared.git.InvalidGithubCredentials: If the token is
+          rejected.
+        :raise pythoneda.shared.git.GithubApiFailed: If GitHub answers with an
+          error.
+        """
+        url = self.url(
+            path, dict({"per_page": self.__class__.PAGE_SIZE}, **(params or {}))
+        )
+        while url is not None:
+            (page, url) = await self.get(url, token)
+            yield page
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
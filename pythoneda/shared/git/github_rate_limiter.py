@@ -0,0 +1,342 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/github_rate_limiter.py
+
+This file declares the GithubRateLimiter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .github_token_budget import GithubTokenBudget
+import hashlib
+from pythoneda.shared import BaseObject
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Set, Tuple
+
+
+class GithubRateLimiter(BaseObject):
+    """
+    Paces GitHub API requests within the budget of each token.
+
+    Class name: GithubRateLimiter
+
+    Responsibilities:
+        - Keeps a budget per token and rate-limit resource.
+        - Picks, among the usable tokens, the one that can make a request first.
+        - Waits for the budget to allow a request, instead of failing, without
+          blocking the event loop of the waiting coroutine.
+        - Detects primary and secondary rate-limit responses.
+        - Exposes the rate-limit state as metrics.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubTokenBudget: The budget of each token.
+        - pythoneda.shared.git.GithubClient: Asks it before each request.
+        - pythoneda.shared.git.GitMetrics: Exports its metrics as gauges.
+    """
+
+    SECONDARY_WAIT = 60.0
+
+    _singleton = None
+
+    def __init__(self):
+        """
+        Creates a new GithubRateLimiter instance.
+        """
+        super().__init__()
+        self._budgets: Dict[Tuple[str, str], GithubTokenBudget] = {}
+        self._condition = threading.Condition()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._primary_limited = 0
+        self._secondary_limited = 0
+
+    @classmethod
+    def instance(cls):
+        """
+        Retrieves the process-wide limiter.
+        :return: Such instance.
+        :rtype: pythoneda.shared.git.GithubRateLimiter
+        """
+        if cls._singleton is None:
+            cls._singleton = cls()
+        return cls._singleton
+
+    @staticmethod
+    def label(token: str) -> str:
+        """
+        Builds a label identifying given token without disclosing it.
+        :param token: The token, or None for anonymous access.
+        :type token: str
+        :return: The label.
+        :rtype: str
+        """
+        result = "anonymous"
+        if token:
+            result = hashlib.sha256(token.encode("utf-8")).hexdigest()[:8]
+
+        return result
+
+    def budget(self, token: str, resource: str = "core") -> GithubTokenBudget:
+        """
+        Retrieves the budget of given token.
+        :param token: The token, or None for anonymous access.
+        :type token: str
+        :param resource: The rate-limit resource, such as "core" or "graphql".
+        :type resource: str
+        :return: The budget.
+        :rtype: pythoneda.shared.git.GithubTokenBudget
+        """
+        with self._condition:
+            result = self._budgets.get((token, resource), None)
+            if result is None:
+                result = GithubTokenBudget(f"{resource}_{self.__class__.label(token)}")
+                self._budgets[(token, resource)] = result
+
+        return result
+
+    def _choose(self, budgets: List[GithubTokenBudget]) -> Tuple[float, int]:
+        """
+        Picks the budget free first; among those, the one with most requests
+        left. Must be called holding the condition.
+        :param budgets: The budgets of the usable tokens.
+        :type budgets: List[pythoneda.shared.git.GithubTokenBudget]
+        :return: How long until it can make a request, and its index.
+        :rtype: Tuple[float, int]
+        """
+        best = None
+        for index, budget in enumerate(budgets):
+            key = (
+                budget.delay(),
+                -(budget.remaining if budget.remaining is not None else 1 << 30),
+                index,
+            )
+            if best is None or key < best:
+                best = key
+        (delay, _, index) = best
+
+        return (delay, index)
+
+    def _waiting(self, resource: str, delay: float):
+        """
+        Accounts for a request having to wait. Must be called holding the
+        condition.
+        :param resource: The rate-limit resource.
+        :type resource: str
+        :param delay: How long it has to wait, at least.
+        :type delay: float
+        """
+        self._waits += 1
+        if delay > 1.0:
+            GithubRateLimiter.logger().warning(
+                f"GitHub {resource} rate limit reached, waiting {delay:.0f}s"
+            )
+
+    async def acquire(self, tokens: List[str], resource: str = "core") -> str:
+        """
+        Waits, without blocking the event loop, until one of given tokens can
+        make a request, and spends it.
+        :param tokens: The usable tokens.
+        :type tokens: List[str]
+        :param resource: The rate-limit resource, such as "core" or "graphql".
+        :type resource: str
+        :return: The token to make the request with.
+        :rtype: str
+        """
+        budgets = [self.budget(token, resource) for token in tokens]
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        waited = False
+        try:
+            while True:
+                with self._condition:
+                    (delay, index) = self._choose(budgets)
+                    if delay <= 0:
+                        budgets[index].spend()
+                        return tokens[index]
+                    if not waited:
+                        waited = True
+                        self._waiting(resource, delay)
+                    waiter[1].clear()
+                    self._waiters.add(waiter)
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                with self._condition:
+                    self._wait_seconds += time.monotonic() - started
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+
+    def acquire_blocking(self, tokens: List[str], resource: str = "core") -> str:
+        """
+        Waits until one of given tokens can make a request, and spends it, from
+        synchronous code, as acquire() does.
+        :param tokens: The usable tokens.
+        :type tokens: List[str]
+        :param resource: The rate-limit resource, such as "core" or "graphql".
+        :type resource: str
+        :return: The token to make the request with.
+        :rtype: str
+        """
+        budgets = [self.budget(token, resource) for token in tokens]
+        waited = False
+        with self._condition:
+            while True:
+                (delay, index) = self._choose(budgets)
+                if delay <= 0:
+                    budgets[index].spend()
+                    return tokens[index]
+                if not waited:
+                    waited = True
+                    self._waiting(resource, delay)
+                started = time.monotonic()
+                self._condition.wait(delay)
+                self._wait_seconds += time.monotonic() - started
+
+    def _notify(self):
+        """
+        Wakes up the requests waiting for a budget, in any thread or event
+        loop. Must be called holding the condition.
+        """
+        self._condition.notify_all()
+        for loop, event in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # its loop is closed
+                self._waiters.discard((loop, event))
+
+    def release(self, token: str, resource: str = "core"):
+        """
+        Gives back the request acquired for given token, when it got no answer.
+        :param token: The token the request was acquired for.
+        :type token: str
+        :param resource: The rate-limit resource, such as "core" or "graphql".
+        :type resource: str
+        """
+        budget = self.budget(token, resource)
+        with self._condition:
+            budget.release()
+            self._notify()
+
+    def update(
+        self,
+        token: str,
+        resource: str,
+        status: int,
+        headers: Mapping[str, str],
+        text: str = "",
+    ) -> bool:
+        """
+        Updates the budget of given token with a response.
+        :param token: The token the request was made with.
+        :type token: str
+        :param resource: The rate-limit resource the request was billed to.
+        :type resource: str
+        :param status: The HTTP status.
+        :type status: int
+        :param headers: The response headers.
+        :type headers: Mapping[str, str]
+        :param text: The response body.
+        :type text: str
+        :return: True if the request was rejected by a rate limit, and should
+          be retried.
+        :rtype: bool
+        """
+        result = False
+        budget = self.budget(token, headers.get("X-RateLimit-Resource", resource))
+        now = time.time()
+        with self._condition:
+            try:
+                budget.observe(
+                    int(headers["X-RateLimit-Limit"]),
+                    int(headers["X-RateLimit-Remaining"]),
+                    float(headers["X-RateLimit-Reset"]),
+                )
+            except (KeyError, ValueError):
+                budget.unmetered()
+            if status in (403, 429):
+                retry_after = headers.get("Retry-After", None)
+                if retry_after is not None:
+                    budget.block(now + float(retry_after))
+                    self._secondary_limited += 1
+                    result = True
+                elif headers.get("X-RateLimit-Remaining", None) == "0":
+                    self._primary_limited += 1
+                    result = True
+                elif "secondary rate limit" in text.lower():
+                    budget.block(now + self.__class__.SECONDARY_WAIT)
+                    self._secondary_limited += 1
+                    result = True
+            elif resource == "graphql" and "RATE_LIMITED" in text:
+                # GraphQL reports an exhausted budget as an error in a 200
+                if budget.reset is not None:
+                    budget.block(budget.reset)
+                else:
+                    budget.block(now + self.__class__.SECONDARY_WAIT)
+                self._primary_limited += 1
+                result = True
+            self._notify()
+
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Retrieves the rate-limit metrics.
+        :return: A dictionary with the waits and the rate-limited responses,
+          and the requests made, the remaining ones, the pace and the blocking
+          of each token and resource, as samples labelled "token" and
+          "resource".
+        :rtype: Dict[str, Any]
+        """
+        requests = []
+        rates = []
+        blocked = []
+        remaining = []
+        with self._condition:
+            result = {
+                "waits": self._waits,
+                "wait_seconds_total": self._wait_seconds,
+                "primary_limited": self._primary_limited,
+                "secondary_limited": self._secondary_limited,
+            }
+            now = time.time()
+            for (token, resource), budget in self._budgets.items():
+                labels = {"token": self.__class__.label(token), "resource": resource}
+                requests.append((labels, budget.requests))
+                rates.append((labels, budget.rate))
+                blocked.append((labels, max(0.0, budget.blocked_until - now)))
+                if budget.remaining is not None:
+                    remaining.append((labels, budget.remaining))
+        result["requests"] = requests
+        result["rate"] = rates
+        result["blocked_seconds"] = blocked
+        result["remaining"] = remaining
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
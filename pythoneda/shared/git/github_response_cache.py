@@ -0,0 +1,147 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/github_response_cache.py
+
+This file declares the GithubResponseCache class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import os
+from pythoneda.shared import BaseObject
+import tempfile
+from typing import Any, Dict, Union
+
+
+class GithubResponseCache(BaseObject):
+    """
+    An on-disk cache of GitHub API responses, revalidated with their ETags.
+
+    Class name: GithubResponseCache
+
+    Responsibilities:
+        - Keeps the ETag, the body and the next page link of each response.
+        - Keys responses by url and token, without storing the token.
+        - Writes entries atomically, so concurrent processes never read halves.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubClient: Sends conditional requests with it.
+    """
+
+    def __init__(self, folder: str):
+        """
+        Creates a new GithubResponseCache instance.
+        :param folder: The folder to keep the responses in.
+        :type folder: str
+        """
+        super().__init__()
+        self._folder = folder
+
+    @classmethod
+    def default_folder(cls) -> str:
+        """
+        Retrieves the default cache folder, following the XDG convention.
+        :return: Such folder.
+        :rtype: str
+        """
+        base = os.environ.get("XDG_CACHE_HOME", None) or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        return os.path.join(base, "pythoneda", "github")
+
+    @property
+    def folder(self) -> str:
+        """
+        Retrieves the folder the responses are kept in.
+        :return: Such folder.
+        :rtype: str
+        """
+        return self._folder
+
+    def _path(self, url: str, token: str) -> str:
+        """
+        Retrieves the file of the response of given url for given token.
+        :param url: The url.
+        :type url: str
+        :param token: The token, or None.
+        :type token: str
+        :return: The file.
+        :rtype: str
+        """
+        key = hashlib.sha256(f"{token or ''}\n{url}".encode("utf-8")).hexdigest()
+
+        return os.path.join(self._folder, f"{key}.json")
+
+    def get(self, url: str, token: str) -> Union[Dict[str, Any], None]:
+        """
+        Retrieves the cached response of given url.
+        :param url: The url.
+        :type url: str
+        :param token: The token the response was fetched with, or None.
+        :type token: str
+        :return: A dictionary with the "etag", "body" and "next" entries, or
+          None if not cached.
+        :rtype: Union[Dict[str, Any], None]
+        """
+        result = None
+        try:
+            with open(self._path(url, token), "r", encoding="utf-8") as file:
+                result = json.load(file)
+        except (OSError, ValueError):
+            result = None
+        if result is not None and result.get("url", None) != url:
+            result = None
+
+        return result
+
+    def put(self, url: str, token: str, etag: str, body: Any, next: str = None):
+        """
+        Caches a response.
+        :param url: The url.
+        :type url: str
+        :param token: The token the response was fetched with, or None.
+        :type token: str
+        :param etag: The ETag of the response.
+        :type etag: str
+        :param body: The parsed body.
+        :type body: Any
+        :param next: The url of the next page, if any.
+        :type next: str
+        """
+        path = self._path(url, token)
+        try:
+            os.makedirs(self._folder, exist_ok=True)
+            (fd, temporary) = tempfile.mkstemp(dir=self._folder, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(
+                    {"url": url, "etag": etag, "next": next, "body": body},
+                    file,
+                    separators=(",", ":"),
+                )
+            os.replace(temporary, path)
+        except OSError as err:
+            self.__class__.logger().debug(f"Could not save {path}: {err}")
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
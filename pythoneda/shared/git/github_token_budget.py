@@ -0,0 +1,246 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/git/github_token_budget.py
+
+This file declares the GithubTokenBudget class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+import time
+
+
+class GithubTokenBudget(BaseObject):
+    """
+    The GitHub API budget of a token, for one rate-limit resource.
+
+    Class name: GithubTokenBudget
+
+    Responsibilities:
+        - Keeps the limit, remaining requests and reset time GitHub reports.
+        - Paces requests with a token bucket, slowing down to make the
+          remaining requests last until the reset when they run low.
+        - Blocks the token until the reset, or until GitHub allows it again.
+        - Counts requests in flight against the remaining ones, probing with a
+          single request while the limit is unknown.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubRateLimiter: Keeps a budget per token.
+    """
+
+    BURST = 15.0
+
+    # GitHub's secondary rate limit allows 900 points per minute to REST
+    RATE = 15.0
+
+    LOW_WATER = 0.1
+
+    ANSWER_WAIT = 1.0
+
+    def __init__(self, label: str):
+        """
+        Creates a new GithubTokenBudget instance.
+        :param label: The label identifying the token, without disclosing it.
+        :type label: str
+        """
+        super().__init__()
+        self._label = label
+        self._limit = None
+        self._remaining = None
+        self._reset = None
+        self._rate = self.__class__.RATE
+        self._level = self.__class__.BURST
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._requests = 0
+        self._unmetered = False
+
+    @property
+    def label(self) -> str:
+        """
+        Retrieves the label of the token.
+        :return: Such label.
+        :rtype: str
+        """
+        return self._label
+
+    @property
+    def limit(self) -> int:
+        """
+        Retrieves the number of requests allowed per window.
+        :return: Such number, or None if GitHub did not tell yet.
+        :rtype: int
+        """
+        return self._limit
+
+    @property
+    def remaining(self) -> int:
+        """
+        Retrieves the number of requests left in the current window.
+        :return: Such number, or None if GitHub did not tell yet.
+        :rtype: int
+        """
+        return self._remaining
+
+    @property
+    def reset(self) -> float:
+        """
+        Retrieves when the current window ends.
+        :return: Such time, in seconds since the epoch, or None if unknown.
+        :rtype: float
+        """
+        return self._reset
+
+    @property
+    def rate(self) -> float:
+        """
+        Retrieves the pace requests are allowed at.
+        :return: Such pace, in requests per second.
+        :rtype: float
+        """
+        return self._rate
+
+    @property
+    def blocked_until(self) -> float:
+        """
+        Retrieves until when the token cannot be used.
+        :return: Such time, in seconds since the epoch.
+        :rtype: float
+        """
+        return self._blocked_until
+
+    @property
+    def requests(self) -> int:
+        """
+        Retrieves the number of requests made with the token.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._requests
+
+    def _refill(self):
+        """
+        Adds the requests earned since the last refill to the bucket.
+        """
+        now = time.monotonic()
+        self._level = min(
+            self.__class__.BURST, self._level + (now - self._refilled_at) * self._rate
+        )
+        self._refilled_at = now
+
+    def delay(self) -> float:
+        """
+        Retrieves how long until the token can make a request.
+        :return: Such time, in seconds, or zero if it can make it now.
+        :rtype: float
+        """
+        self._refill()
+        now = time.time()
+        result = max(0.0, self._blocked_until - now)
+        if self._remaining is not None and self._remaining <= 0:
+            if self._reset is None:
+                # wait for the requests in flight to tell how many are left
+                result = max(result, self.__class__.ANSWER_WAIT)
+            elif self._reset > now:
+                result = max(result, self._reset - now)
+            else:
+                # a new window started
+                self._remaining = self._limit
+                self._reset = None
+        if self._level < 1.0:
+            result = max(result, (1.0 - self._level) / self._rate)
+
+        return result
+
+    def spend(self):
+        """
+        Takes a request from the bucket, and from the remaining ones, so
+        concurrent requests do not overdraw the window before GitHub answers.
+        """
+        self._refill()
+        self._level -= 1.0
+        self._requests += 1
+        if self._remaining is not None:
+            self._remaining -= 1
+        elif self._limit is None and not self._unmetered:
+            # probe the budget with a single request before sending more
+            self._remaining = 0
+
+    def release(self):
+        """
+        Gives back the remaining request spend() took for a request GitHub did
+        not answer, ending the probe if it was one.
+        """
+        if self._remaining is None:
+            return
+        if self._limit is None:
+            self._remaining = None
+        else:
+            self._remaining = min(self._limit, self._remaining + 1)
+
+    def observe(self, limit: int, remaining: int, reset: float):
+        """
+        Updates the budget with the rate-limit headers of a response.
+        :param limit: The number of requests allowed per window.
+        :type limit: int
+        :param remaining: The number of requests left in the window.
+        :type remaining: int
+        :param reset: When the window ends, in seconds since the epoch.
+        :type reset: float
+        """
+        if reset == self._reset and self._remaining is not None:
+            # responses can arrive out of order: keep the lowest count
+            remaining = min(remaining, self._remaining)
+        self._limit = limit
+        self._remaining = remaining
+        self._reset = reset
+        self._refill()
+        if remaining <= 0:
+            self.block(reset)
+        elif limit and remaining < limit * self.__class__.LOW_WATER:
+            # make what is left last until the window ends
+            self._rate = min(
+                self.__class__.RATE, remaining / max(reset - time.time(), 1.0)
+            )
+        else:
+            self._rate = self.__class__.RATE
+
+    def unmetered(self):
+        """
+        Notes GitHub answered without rate-limit headers, so requests are
+        paced by the bucket alone.
+        """
+        self._unmetered = True
+        if self._limit is None:
+            self._remaining = None
+
+    def block(self, until: float):
+        """
+        Prevents the token from being used until given time.
+        :param until: Such time, in seconds since the epoch.
+        :type until: float
+        """
+        self._blocked_until = max(self._blocked_until, until)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,145 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_add_batcher.py
+
+This file declares the GitAddBatcherTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import GitAdd, GitAddFailed
+import os
+import subprocess
+import tempfile
+import unittest
+
+
+class CountingGitAdd(GitAdd):
+    """
+    A GitAdd counting the git processes it spawns.
+
+    Class name: CountingGitAdd
+
+    Responsibilities:
+        - Records the args of each run.
+
+    Collaborators:
+        - pythoneda.shared.git.GitAdd: Runs git.
+    """
+
+    def __init__(self, folder: str, runs: list):
+        super().__init__(folder)
+        self._runs = runs
+
+    async def run(self, args, timeout=None, input=None, spillThreshold=None):
+        self._runs.append(args)
+        return await super().run(args, timeout, input, spillThreshold)
+
+
+class GitAddBatcherTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks concurrent adds share git processes.
+
+    Class name: GitAddBatcherTests
+
+    Responsibilities:
+        - Checks adds within a loop tick share one git process.
+        - Checks failures are attributed to the offending files only.
+        - Checks names with newlines are passed and reported verbatim.
+
+    Collaborators:
+        - pythoneda.shared.git.GitAddBatcher: The class under test.
+        - pythoneda.shared.git.GitAdd: Adds files through it.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        subprocess.run(
+            ["git", "init", "-q"], cwd=self.folder, check=True, capture_output=True
+        )
+        self.runs = []
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def create(self, *names: str):
+        for name in names:
+            with open(os.path.join(self.folder, name), "w") as file:
+                file.write(name)
+
+    def staged(self) -> list:
+        return sorted(
+            subprocess.run(
+                ["git", "ls-files", "-z"],
+                cwd=self.folder,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split("\0")[:-1]
+        )
+
+    async def add(self, *names: str) -> list:
+        return await asyncio.gather(
+            *[CountingGitAdd(self.folder, self.runs).add(name) for name in names],
+            return_exceptions=True,
+        )
+
+    async def test_adds_within_a_tick_share_one_process(self):
+        names = [f"file{index}" for index in range(20)]
+        self.create(*names)
+        results = await self.add(*names)
+
+        self.assertEqual(len(self.runs), 1)
+        self.assertTrue(all(isinstance(result, str) for result in results))
+        self.assertEqual(self.staged(), sorted(names))
+
+    async def test_failures_are_attributed_to_the_offending_files(self):
+        self.create("a", "b")
+        (first, missing, second) = await self.add("a", "missing", "b")
+
+        self.assertIsInstance(missing, GitAddFailed)
+        self.assertIn('"git add missing"', str(missing))
+        self.assertIn("did not match any files", missing.output)
+        self.assertEqual((first, second), ("", ""))
+        self.assertEqual(len(self.runs), 2)
+        self.assertEqual(self.staged(), ["a", "b"])
+
+    async def test_names_with_newlines_are_passed_verbatim(self):
+        self.create("new\nline", "plain")
+        (added, missing, plain) = await self.add("new\nline", "gone\nfile", "plain")
+
+        self.assertEqual((added, plain), ("", ""))
+        self.assertIsInstance(missing, GitAddFailed)
+        self.assertIn("gone\nfile", str(missing))
+        # the unmatched name is recognized, so the rest is retried as a batch
+        self.assertEqual(len(self.runs), 2)
+        self.assertIn("--pathspec-file-nul", self.runs[0])
+        self.assertEqual(self.staged(), ["new\nline", "plain"])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
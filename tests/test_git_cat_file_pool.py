@@ -0,0 +1,111 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_cat_file_pool.py
+
+This file declares the GitCatFilePoolTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import GitCatFilePool, GitExecutionContext
+import subprocess
+import tempfile
+import unittest
+
+
+class GitCatFilePoolTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks the sharing and restarting of cat-file workers.
+
+    Class name: GitCatFilePoolTests
+
+    Responsibilities:
+        - Checks workers are shared by equal execution contexts.
+        - Checks dead workers are forgotten and replaced.
+
+    Collaborators:
+        - pythoneda.shared.git.GitCatFilePool: The class under test.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        for args in (
+            ["init", "-q"],
+            ["commit", "-q", "--allow-empty", "-m", "first"],
+        ):
+            subprocess.run(
+                ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+                cwd=self.folder,
+                check=True,
+                capture_output=True,
+            )
+        self.head = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=self.folder,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        self.pool = GitCatFilePool()
+        self.context = GitExecutionContext(env={"PATH": "/usr/bin:/bin"})
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    async def test_equal_contexts_share_a_worker(self):
+        first = await self.pool.worker(self.folder, True, self.context)
+        other = GitExecutionContext(env={"PATH": "/usr/bin:/bin"})
+        self.assertIs(await self.pool.worker(self.folder, True, other), first)
+        different = self.context.derive(env={"GIT_TRACE": "0"})
+        self.assertIsNot(await self.pool.worker(self.folder, True, different), first)
+
+    async def test_killed_worker_is_evicted_and_restarted(self):
+        header = await self.pool.read_header(self.folder, "HEAD", self.context)
+        self.assertEqual(header, (self.head, "commit", header[2]))
+        worker = await self.pool.worker(self.folder, True, self.context)
+        worker._process.kill()
+        await asyncio.wait_for(worker._reader, 5)
+
+        self.assertFalse(worker.is_usable)
+        self.assertNotIn(worker, self.pool._workers.values())
+        header = await self.pool.read_header(self.folder, "HEAD", self.context)
+        self.assertEqual(header[0], self.head)
+        self.assertIsNot(
+            await self.pool.worker(self.folder, True, self.context), worker
+        )
+
+    async def test_closed_workers_are_forgotten(self):
+        await self.pool.read(self.folder, "HEAD", self.context)
+        await self.pool.close(self.folder)
+        self.assertEqual(self.pool._workers, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,94 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_failure_classifier.py
+
+This file declares the GitFailureClassifierTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.git import GitFailureClassifier, GitFailureKind
+import unittest
+
+
+class GitFailureClassifierTests(unittest.TestCase):
+    """
+    Checks how git failures are classified.
+
+    Class name: GitFailureClassifierTests
+
+    Responsibilities:
+        - Checks real git error outputs map to the expected kinds.
+
+    Collaborators:
+        - pythoneda.shared.git.GitFailureClassifier: The class under test.
+    """
+
+    def test_push_failing_with_a_server_error_is_transient(self):
+        stderr = (
+            "error: RPC failed; HTTP 502 curl 22 The requested URL returned "
+            "error: 502\n"
+            "send-pack: unexpected disconnect while reading sideband packet\n"
+            "fatal: the remote end hung up unexpectedly\n"
+            "Everything up-to-date\n"
+            "error: failed to push some refs to 'https://github.com/o/r.git'\n"
+        )
+        self.assertEqual(
+            GitFailureClassifier().classify(stderr), GitFailureKind.TRANSIENT
+        )
+
+    def test_push_hanging_up_is_transient(self):
+        stderr = (
+            "fatal: the remote end hung up unexpectedly\n"
+            "error: failed to push some refs to 'git@github.com:o/r.git'\n"
+        )
+        self.assertEqual(
+            GitFailureClassifier().classify(stderr), GitFailureKind.TRANSIENT
+        )
+
+    def test_rejected_push_is_a_conflict(self):
+        stderr = (
+            "To github.com:o/r.git\n"
+            " ! [rejected]        main -> main (fetch first)\n"
+            "error: failed to push some refs to 'github.com:o/r.git'\n"
+            "hint: Updates were rejected because the remote contains work that "
+            "you do not\n"
+        )
+        self.assertEqual(
+            GitFailureClassifier().classify(stderr), GitFailureKind.CONFLICT
+        )
+
+    def test_declined_push_is_fatal(self):
+        stderr = (
+            "remote: error: GH006: Protected branch update failed for "
+            "refs/heads/main.\n"
+            " ! [remote rejected] main -> main (protected branch hook declined)\n"
+            "error: failed to push some refs to 'github.com:o/r.git'\n"
+        )
+        self.assertEqual(GitFailureClassifier().classify(stderr), GitFailureKind.FATAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
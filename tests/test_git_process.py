@@ -0,0 +1,167 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_process.py
+
+This file declares the GitProcessTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import (
+    GitExecutionContext,
+    GitOperationTimedOut,
+    GitProcess,
+)
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+
+
+class GitProcessTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks how git processes are spawned, timed out and cancelled.
+
+    Class name: GitProcessTests
+
+    Responsibilities:
+        - Checks git runs in its own process group, within the caller's session.
+        - Checks timeouts and cancellations kill the whole process group.
+        - Checks what a timeout error carries.
+
+    Collaborators:
+        - pythoneda.shared.git.GitProcess: The class under test.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        subprocess.run(
+            ["git", "init", "-q"], cwd=self.folder, check=True, capture_output=True
+        )
+        self.pid_file = os.path.join(self.folder, "pid")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def process(self, script: str) -> GitProcess:
+        return GitProcess(
+            ["git", "-c", f"alias.script=!{script}", "script"],
+            self.folder,
+            GitExecutionContext(),
+        )
+
+    def background_pid(self) -> int:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if os.path.exists(self.pid_file):
+                with open(self.pid_file) as file:
+                    content = file.read().strip()
+                if content:
+                    return int(content)
+            time.sleep(0.01)
+        self.fail("the background process did not start")
+
+    def is_alive(self, pid: int) -> bool:
+        # orphans may stay zombies until their new parent reaps them
+        try:
+            with open(f"/proc/{pid}/stat") as file:
+                return file.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except FileNotFoundError:
+            return False
+        except OSError:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return False
+            return True
+
+    async def wait_until_dead(self, pid: int) -> bool:
+        for _ in range(100):
+            if not self.is_alive(pid):
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    async def test_git_runs_in_its_own_group_within_the_session(self):
+        process = self.process("sleep 30")
+        await process.start()
+        try:
+            self.assertEqual(os.getpgid(process.pid), process.pid)
+            self.assertEqual(os.getsid(process.pid), os.getsid(0))
+        finally:
+            await process.terminate(0)
+
+    async def test_timeout_kills_the_group_and_carries_the_partial_output(self):
+        process = self.process(
+            f"printf partial; sleep 30 & echo $! > {self.pid_file}; wait"
+        )
+        await process.start()
+        started = time.monotonic()
+        with self.assertRaises(GitOperationTimedOut) as raised:
+            await process.communicate(timeout=0.5)
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(raised.exception.timeout, 0.5)
+        self.assertEqual(raised.exception.stdout, "partial")
+        self.assertEqual(raised.exception.stdout_size, len(b"partial"))
+        self.assertEqual(raised.exception.stderr_size, 0)
+        self.assertTrue(await self.wait_until_dead(self.background_pid()))
+
+    async def test_timeout_caps_the_partial_output(self):
+        size = GitProcess.PARTIAL_OUTPUT * 3
+        for spillThreshold in (None, 1024):
+            with self.subTest(spillThreshold=spillThreshold):
+                process = self.process(
+                    f"head -c {size} /dev/zero | tr '\\0' x; printf end; sleep 30"
+                )
+                await process.start()
+                with self.assertRaises(GitOperationTimedOut) as raised:
+                    await process.communicate(timeout=1, spillThreshold=spillThreshold)
+
+                stdout = raised.exception.stdout
+                self.assertEqual(len(stdout), GitProcess.PARTIAL_OUTPUT)
+                self.assertTrue(stdout.endswith("xend"))
+                self.assertEqual(raised.exception.stdout_size, size + len("end"))
+
+    async def test_cancellation_kills_the_group(self):
+        process = self.process(f"sleep 30 & echo $! > {self.pid_file}; wait")
+        await process.start()
+        task = asyncio.create_task(process.communicate())
+        pid = await asyncio.get_running_loop().run_in_executor(
+            None, self.background_pid
+        )
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertIsNotNone(process.returncode)
+        self.assertTrue(await self.wait_until_dead(pid))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,175 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_read_backends.py
+
+This file declares the GitReadBackendsTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.git import (
+    GitPygit2ReadBackend,
+    GitReadBackend,
+    GitSubprocessReadBackend,
+)
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+
+class GitReadBackendsTests(unittest.TestCase):
+    """
+    Checks every read backend answers as the GitPython-based one.
+
+    Class name: GitReadBackendsTests
+
+    Responsibilities:
+        - Builds repositories in the states the backends must agree on.
+        - Compares the answers of each backend with the fallback one.
+
+    Collaborators:
+        - pythoneda.shared.git.GitSubprocessReadBackend: The reference.
+        - pythoneda.shared.git.GitPygit2ReadBackend: Checked when available.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self.git("init", "-q", "-b", "main")
+        for index in range(3):
+            with open(os.path.join(self.folder, "file"), "w") as file:
+                file.write(f"{index}\n")
+            self.git("add", "file")
+            self.git("commit", "-q", "-m", f"commit {index}")
+            self.git("tag", "-m", f"release {index}", f"0.{index}.0")
+        self.git("tag", "lightweight", "HEAD~1")
+        self.git("remote", "add", "origin", "https://example.com/a.git")
+        self.git("config", "--add", "remote.origin.url", "gh:o/b.git")
+        self.git("config", "url.https://github.com/.insteadOf", "gh:")
+        self.git("remote", "add", "mirror", "https://example.com/mirror.git")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=self.folder,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def backends(self):
+        return [backend for backend in (GitPygit2ReadBackend,) if backend.available()]
+
+    def answer(self, backend, operation: str, *args):
+        try:
+            return ("ok", getattr(backend(self.folder), operation)(*args))
+        except TypeError:
+            return ("TypeError", None)
+
+    def assert_parity(self, operation: str, *args):
+        expected = self.answer(GitSubprocessReadBackend, operation, *args)
+        for backend in self.backends():
+            with self.subTest(backend=backend.__name__, operation=operation):
+                self.assertEqual(self.answer(backend, operation, *args), expected)
+
+    def test_tags(self):
+        self.assert_parity(GitReadBackend.TAG_NAMES)
+        self.assert_parity(GitReadBackend.TAGS)
+        self.assert_parity(GitReadBackend.TAG_REFS)
+        self.assert_parity(GitReadBackend.TAG_REFS, 2)
+
+    def test_tag_refs_rank_only_semver_tags(self):
+        self.git("tag", "notsemver")
+        self.git("tag", "1.x")
+        self.git("tag", "0.2.0+build.12")
+        self.git("tag", "0.2.0+build.3")
+        self.git("tag", "0.2.0-rc.1", "HEAD~1")
+        names = [
+            name for (*_, name) in GitSubprocessReadBackend(self.folder).tag_refs()
+        ]
+        self.assertEqual(
+            names,
+            [
+                "0.2.0+build.12",
+                "0.2.0+build.3",
+                "0.2.0",
+                "0.2.0-rc.1",
+                "0.1.0",
+                "0.0.0",
+            ],
+        )
+        self.assertEqual(
+            [name for (*_, name) in GitSubprocessReadBackend(self.folder).tag_refs(1)],
+            ["0.2.0+build.12"],
+        )
+
+    def test_tag_refs_widen_the_window_until_the_latest_are_in(self):
+        for name in ("9.x", "9.0", "8", "1.0.0-rc.2", "1.0.0-rc.10", "1.0.0-1"):
+            self.git("tag", name)
+        self.git("tag", "1.0.0+build.2", "HEAD~1")
+        self.git("tag", "1.0.0+build.10", "HEAD~2")
+        backend = GitSubprocessReadBackend(self.folder)
+        expected = backend.tag_refs()
+        with mock.patch.object(GitSubprocessReadBackend, "WINDOW", 1):
+            for limit in range(len(expected) + 2):
+                with self.subTest(limit=limit):
+                    self.assertEqual(backend.tag_refs(limit), expected[:limit])
+
+    def test_head_commit(self):
+        self.assert_parity(GitReadBackend.HEAD_COMMIT)
+
+    def test_remote_urls_include_every_url(self):
+        self.assertEqual(
+            GitSubprocessReadBackend(self.folder).remote_urls()["origin"],
+            ["https://example.com/a.git", "https://github.com/o/b.git"],
+        )
+        self.assert_parity(GitReadBackend.REMOTE_URLS)
+
+    def test_current_branch(self):
+        self.assert_parity(GitReadBackend.CURRENT_BRANCH)
+
+    def test_current_branch_when_detached(self):
+        self.git("checkout", "-q", "--detach", "HEAD~1")
+        self.assertEqual(
+            self.answer(GitSubprocessReadBackend, GitReadBackend.CURRENT_BRANCH),
+            ("TypeError", None),
+        )
+        self.assert_parity(GitReadBackend.CURRENT_BRANCH)
+
+    def test_current_branch_when_unborn(self):
+        self.git("checkout", "-q", "--orphan", "fresh")
+        self.assert_parity(GitReadBackend.CURRENT_BRANCH)
+
+    def test_diff(self):
+        self.assert_parity(GitReadBackend.DIFF, "0.0.0", "0.2.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
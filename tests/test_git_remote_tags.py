@@ -0,0 +1,166 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_remote_tags.py
+
+This file declares the GitRemoteTagsTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import (
+    GitExecutionContext,
+    GitLsRemoteFailed,
+    GitRemoteTags,
+    GitTag,
+)
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+
+class CountingGitRemoteTags(GitRemoteTags):
+    """
+    A GitRemoteTags counting the listings it runs.
+    """
+
+    listings = 0
+
+    async def _list(self, url: str):
+        CountingGitRemoteTags.listings += 1
+        return await super()._list(url)
+
+
+class GitRemoteTagsTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks the tags of remotes are listed once, shared and cached for a while.
+
+    Class name: GitRemoteTagsTests
+
+    Responsibilities:
+        - Checks existing and missing tags, and unreachable remotes.
+        - Checks the cache honors its TTL, its bound and equal contexts.
+        - Checks concurrent requests share a single listing.
+
+    Collaborators:
+        - pythoneda.shared.git.GitRemoteTags: The class under test.
+        - pythoneda.shared.git.GitTag: Checks remote tags through it.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self.remote = os.path.join(self.folder, "remote.git")
+        self.git(self.folder, "init", "-q", "--bare", self.remote)
+        self.work = os.path.join(self.folder, "work")
+        self.git(self.folder, "clone", "-q", self.remote, self.work)
+        self.git(self.work, "commit", "-q", "--allow-empty", "-m", "first")
+        self.tag("0.1.0")
+        GitRemoteTags.invalidate()
+        CountingGitRemoteTags.listings = 0
+        self._ttl = GitRemoteTags.ttl()
+
+    def tearDown(self):
+        GitRemoteTags.set_ttl(self._ttl)
+        GitRemoteTags.invalidate()
+        self._folder.cleanup()
+
+    def git(self, folder: str, *args: str):
+        subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=folder,
+            check=True,
+            capture_output=True,
+        )
+
+    def tag(self, name: str):
+        self.git(self.work, "tag", "-m", name, name)
+        self.git(self.work, "push", "-q", "origin", name)
+
+    async def test_tag_exists(self):
+        self.assertTrue(await GitTag.tag_exists(self.remote, "0.1.0"))
+        self.assertFalse(await GitTag.tag_exists(self.remote, "0.2.0"))
+        self.assertEqual(
+            await GitTag.tags_exist([self.remote], ["0.1.0", "0.2.0"]),
+            {self.remote: {"0.1.0": True, "0.2.0": False}},
+        )
+
+    async def test_unreachable_remote_fails(self):
+        with self.assertRaises(GitLsRemoteFailed):
+            await GitRemoteTags(self.folder).tags(
+                os.path.join(self.folder, "missing.git")
+            )
+
+    async def test_tags_are_cached_until_they_expire(self):
+        remote = CountingGitRemoteTags(self.folder)
+        self.assertEqual(await remote.tags(self.remote), {"0.1.0"})
+        self.tag("0.2.0")
+        self.assertFalse(await remote.exists(self.remote, "0.2.0"))
+        self.assertEqual(CountingGitRemoteTags.listings, 1)
+        self.assertIn("0.2.0", await remote.tags(self.remote, refresh=True))
+        # listings made without a TTL expire right away
+        GitRemoteTags.set_ttl(0)
+        await remote.tags(self.remote, refresh=True)
+        self.tag("0.3.0")
+        self.assertTrue(await remote.exists(self.remote, "0.3.0"))
+        self.assertEqual(CountingGitRemoteTags.listings, 4)
+
+    async def test_equal_contexts_share_the_cache(self):
+        context = GitExecutionContext(env={"GIT_TERMINAL_PROMPT": "0"})
+        await CountingGitRemoteTags(self.folder, context).tags(self.remote)
+        other = GitExecutionContext(env={"GIT_TERMINAL_PROMPT": "0"})
+        await CountingGitRemoteTags(self.folder, other).tags(self.remote)
+        self.assertEqual(CountingGitRemoteTags.listings, 1)
+        different = context.derive(env={"GIT_TRACE": "0"})
+        await CountingGitRemoteTags(self.folder, different).tags(self.remote)
+        self.assertEqual(CountingGitRemoteTags.listings, 2)
+
+    async def test_concurrent_requests_share_a_listing(self):
+        remote = CountingGitRemoteTags(self.folder)
+        found = await asyncio.gather(*[remote.tags(self.remote) for _ in range(5)])
+        self.assertEqual(found, [frozenset({"0.1.0"})] * 5)
+        self.assertEqual(CountingGitRemoteTags.listings, 1)
+
+    async def test_cache_is_bounded(self):
+        remotes = [self.remote]
+        for index in range(2):
+            copy = os.path.join(self.folder, f"copy{index}.git")
+            self.git(self.folder, "clone", "-q", "--bare", self.remote, copy)
+            remotes.append(copy)
+        with mock.patch.object(GitRemoteTags, "MAX_ENTRIES", 2):
+            for url in remotes:
+                await CountingGitRemoteTags(self.folder).tags(url)
+            self.assertEqual(len(GitRemoteTags._cache), 2)
+            # the oldest remote was dropped
+            await CountingGitRemoteTags(self.folder).tags(remotes[-1])
+            self.assertEqual(CountingGitRemoteTags.listings, 3)
+            await CountingGitRemoteTags(self.folder).tags(remotes[0])
+            self.assertEqual(CountingGitRemoteTags.listings, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,146 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_scheduler.py
+
+This file declares the GitSchedulerTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import GitScheduler
+import tempfile
+import threading
+import unittest
+
+
+class GitSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks when the scheduler lets git commands run.
+
+    Class name: GitSchedulerTests
+
+    Responsibilities:
+        - Checks writes to a folder are serialized, and reads are not.
+        - Checks the global cap on live processes.
+        - Checks commands of other event loops share the same limits.
+
+    Collaborators:
+        - pythoneda.shared.git.GitScheduler: The class under test.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self.scheduler = GitScheduler(maxProcesses=2)
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    async def hold(self, args, started: list, release: asyncio.Event):
+        async with self.scheduler.slot(self.folder, args):
+            started.append(args[1])
+            await release.wait()
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_writes_to_a_folder_are_serialized(self):
+        started = []
+        release = asyncio.Event()
+        first = asyncio.create_task(self.hold(["git", "commit"], started, release))
+        await self.settle()
+        second = asyncio.create_task(self.hold(["git", "config"], started, release))
+        read = asyncio.create_task(self.hold(["git", "status"], started, release))
+        await self.settle()
+
+        self.assertEqual(started, ["commit", "status"])
+        self.assertEqual(self.scheduler.metrics()["queue_depth"], 1)
+        release.set()
+        await asyncio.gather(first, second, read)
+        self.assertEqual(started, ["commit", "status", "config"])
+        self.assertEqual(self.scheduler.metrics()["locked_folders"], 0)
+
+    async def test_live_processes_are_capped(self):
+        started = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self.hold(["git", "log"], started, release))
+            for _ in range(3)
+        ]
+        await self.settle()
+
+        self.assertEqual(len(started), 2)
+        self.assertEqual(self.scheduler.metrics()["running"], 2)
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(len(started), 3)
+        self.assertEqual(self.scheduler.metrics()["running"], 0)
+
+    async def test_cancelled_waiters_give_their_place_back(self):
+        started = []
+        release = asyncio.Event()
+        first = asyncio.create_task(self.hold(["git", "add"], started, release))
+        await self.settle()
+        waiting = asyncio.create_task(self.hold(["git", "add"], started, release))
+        await self.settle()
+        waiting.cancel()
+        release.set()
+        await first
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+        self.assertEqual(started, ["add"])
+        self.assertEqual(self.scheduler.metrics()["running"], 0)
+        self.assertEqual(self.scheduler.metrics()["locked_folders"], 0)
+
+    async def test_other_loops_wait_for_the_folder_lock(self):
+        started = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(self.hold(["git", "tag"], started, release))
+        await self.settle()
+
+        def other_loop():
+            async def write():
+                async with self.scheduler.slot(self.folder, ["git", "tag"]):
+                    started.append("other")
+
+            asyncio.run(write())
+
+        thread = threading.Thread(target=other_loop)
+        thread.start()
+        await asyncio.sleep(0.2)
+        self.assertEqual(started, ["tag"])
+        release.set()
+        await holder
+        await asyncio.get_running_loop().run_in_executor(None, thread.join, 5)
+
+        self.assertEqual(started, ["tag", "other"])
+        self.assertEqual(self.scheduler.metrics()["running"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
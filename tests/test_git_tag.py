@@ -0,0 +1,138 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_tag.py
+
+This file declares the GitTagTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.git import GitTag, GitTagFailed
+import subprocess
+import tempfile
+import unittest
+
+
+class GitTagTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks tags are created all or none at a time.
+
+    Class name: GitTagTests
+
+    Responsibilities:
+        - Checks lightweight and annotated tags are created in one go.
+        - Checks a conflict or an unsafe name leaves every ref untouched.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTag: The class under test.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self.git("init", "-q")
+        self.git("config", "user.name", "a")
+        self.git("config", "user.email", "a@b")
+        self.git("commit", "-q", "--allow-empty", "-m", "first")
+        self.git("commit", "-q", "--allow-empty", "-m", "second")
+        self.git("tag", "0.1.0", "HEAD~1")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=self.folder,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def tags(self):
+        return self.git("tag", "--list").split()
+
+    async def test_create_many_creates_every_tag(self):
+        head = self.git("rev-parse", "HEAD")
+        created = await GitTag(self.folder).create_many(
+            [("0.2.0", "HEAD", "second release"), ("latest", head, None)]
+        )
+        self.assertEqual(self.tags(), ["0.1.0", "0.2.0", "latest"])
+        self.assertEqual(created["latest"], head)
+        self.assertEqual(self.git("cat-file", "-t", created["0.2.0"]), "tag")
+        self.assertEqual(self.git("rev-parse", "0.2.0^{commit}"), head)
+        self.assertEqual(
+            self.git("tag", "-l", "--format=%(contents:subject)", "0.2.0"),
+            "second release",
+        )
+
+    async def test_create_many_creates_none_on_conflict(self):
+        with self.assertRaises(GitTagFailed):
+            await GitTag(self.folder).create_many(
+                [
+                    ("0.2.0", "HEAD", "second release"),
+                    ("0.1.0", "HEAD", None),
+                    ("0.3.0", "HEAD", None),
+                ]
+            )
+        self.assertEqual(self.tags(), ["0.1.0"])
+        self.assertEqual(
+            self.git("rev-parse", "0.1.0"), self.git("rev-parse", "HEAD~1")
+        )
+
+    async def test_create_many_creates_none_on_unknown_targets(self):
+        with self.assertRaises(GitTagFailed):
+            await GitTag(self.folder).create_many(
+                [("0.2.0", "HEAD", None), ("0.3.0", "0" * 40, None)]
+            )
+        self.assertEqual(self.tags(), ["0.1.0"])
+
+    async def test_create_many_rejects_unsafe_names(self):
+        for name in (
+            "0.2.0\ntagger evil <e@vil> 0 +0000",
+            "0.2.0 0000000000000000000000000000000000000000",
+            "",
+            "0.2.0\x00",
+        ):
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(GitTagFailed, "invalid tag names"):
+                    await GitTag(self.folder).create_many(
+                        [("0.2.0", "HEAD", None), (name, "HEAD", "message")]
+                    )
+                self.assertEqual(self.tags(), ["0.1.0"])
+
+    async def test_create_many_rejects_invalid_and_duplicated_names(self):
+        for tags in (
+            [("0.2.0", "HEAD", None), ("bad..name", "HEAD", None)],
+            [("0.2.0", "HEAD", None), ("0.2.0", "HEAD~1", None)],
+        ):
+            with self.subTest(tags=tags):
+                with self.assertRaises(GitTagFailed):
+                    await GitTag(self.folder).create_many(tags)
+                self.assertEqual(self.tags(), ["0.1.0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,107 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_tag_commit_index.py
+
+This file declares the GitTagCommitIndexTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.git import GitTag, GitTagCommitIndex
+import os
+import subprocess
+import tempfile
+import unittest
+
+
+class GitTagCommitIndexTests(unittest.TestCase):
+    """
+    Checks the tags of a commit are found through the reverse index.
+
+    Class name: GitTagCommitIndexTests
+
+    Responsibilities:
+        - Checks annotated tags are found under the commit they point to.
+        - Checks the index follows moved and deleted tags.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTagCommitIndex: The class under test.
+        - pythoneda.shared.git.GitTag: Answers current_tag and tags_at with it.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self.git("init", "-q")
+        self.git("commit", "-q", "--allow-empty", "-m", "first")
+        self.git("tag", "-m", "first release", "0.1.0")
+        self.git("commit", "-q", "--allow-empty", "-m", "second")
+        self.git("tag", "-m", "second release", "0.2.0")
+        self.git("tag", "-m", "a rebuild", "0.2.0+build.1")
+        self.git("tag", "0.1.1")
+        self.git("tag", "-m", "not a version", "release")
+        # an annotated tag of another annotated tag still peels to the commit
+        self.git("tag", "-m", "nested", "0.2.1", "0.2.0")
+
+    def tearDown(self):
+        GitTagCommitIndex._indexes.pop(os.path.realpath(self.folder), None)
+        self._folder.cleanup()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=self.folder,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def test_current_tag_finds_annotated_tags_of_head(self):
+        tag = GitTag(self.folder)
+        self.assertEqual(tag.current_tag(), "0.1.1")
+        self.assertEqual(
+            tag.tags_at(self.git("rev-parse", "HEAD")),
+            ["0.1.1", "0.2.0", "0.2.0+build.1", "0.2.1"],
+        )
+        self.assertEqual(tag.tags_at(self.git("rev-parse", "HEAD~1")), ["0.1.0"])
+
+    def test_tags_at_follows_moved_and_deleted_tags(self):
+        tag = GitTag(self.folder)
+        first = self.git("rev-parse", "HEAD~1")
+        self.assertEqual(tag.tags_at(first), ["0.1.0"])
+        self.git("tag", "-f", "-m", "moved", "0.1.1", first)
+        self.assertEqual(tag.tags_at(first), ["0.1.0", "0.1.1"])
+        self.git("tag", "-d", "0.1.0")
+        self.git("pack-refs", "--all")
+        self.assertEqual(tag.tags_at(first), ["0.1.1"])
+        self.assertEqual(tag.current_tag(), "0.2.0")
+
+    def test_current_tag_is_none_without_tags_at_head(self):
+        self.git("commit", "-q", "--allow-empty", "-m", "third")
+        self.assertIsNone(GitTag(self.folder).current_tag())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,134 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_git_tag_index.py
+
+This file declares the GitTagIndexTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.git import GitTag, GitTagIndex
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+
+class GitTagIndexTests(unittest.TestCase):
+    """
+    Checks the persistent semver tag index stays in line with the tags.
+
+    Class name: GitTagIndexTests
+
+    Responsibilities:
+        - Checks the latest tag follows created, deleted and packed tags.
+        - Checks unchanged refs are not listed again, even across processes.
+
+    Collaborators:
+        - pythoneda.shared.git.GitTagIndex: The class under test.
+        - pythoneda.shared.git.GitTag: Feeds the index.
+    """
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.folder = self._folder.name
+        self._cache = tempfile.TemporaryDirectory()
+        self._environment = mock.patch.dict(
+            os.environ, {"XDG_CACHE_HOME": self._cache.name}
+        )
+        self._environment.start()
+        self.git("init", "-q")
+        self.git("commit", "-q", "--allow-empty", "-m", "first")
+        self.git("tag", "0.1.0")
+        self.git("tag", "-m", "annotated", "0.2.0")
+
+    def tearDown(self):
+        GitTagIndex._indexes.pop(os.path.realpath(self.folder), None)
+        self._environment.stop()
+        self._cache.cleanup()
+        self._folder.cleanup()
+
+    def git(self, *args: str):
+        subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=self.folder,
+            check=True,
+            capture_output=True,
+        )
+
+    def test_latest_tag_follows_created_and_deleted_tags(self):
+        tag = GitTag(self.folder)
+        self.assertEqual(tag.latest_tag(), "0.2.0")
+        self.git("tag", "0.10.0")
+        self.assertEqual(tag.latest_tag(), "0.10.0")
+        self.git("tag", "-d", "0.10.0")
+        self.assertEqual(tag.latest_tag(), "0.2.0")
+
+    def test_latest_tag_follows_packed_tags(self):
+        tag = GitTag(self.folder)
+        self.git("tag", "1.0.0")
+        self.git("pack-refs", "--all")
+        self.assertEqual(tag.latest_tag(), "1.0.0")
+        # deleting a packed tag only rewrites packed-refs
+        self.git("tag", "-d", "1.0.0")
+        self.assertEqual(tag.latest_tag(), "0.2.0")
+        self.git("tag", "1.1.0")
+        self.git("pack-refs", "--all")
+        self.assertEqual(tag.latest_tag(), "1.1.0")
+
+    def test_unchanged_refs_are_not_listed_again(self):
+        calls = []
+
+        def names():
+            calls.append(1)
+            return ["0.1.0", "0.2.0"]
+
+        index = GitTagIndex(self.folder)
+        self.assertEqual(index.latest(names), "0.2.0")
+        self.assertEqual(index.latest(names), "0.2.0")
+        self.assertEqual(len(calls), 1)
+        # a fresh instance, as in another process, reuses the persisted index
+        self.assertTrue(os.path.isfile(index.path))
+        self.assertEqual(GitTagIndex(self.folder).latest(names), "0.2.0")
+        self.assertEqual(len(calls), 1)
+        self.git("tag", "0.3.0")
+        self.assertEqual(
+            GitTagIndex(self.folder).latest(lambda: ["0.1.0", "0.2.0", "0.3.0"]),
+            "0.3.0",
+        )
+
+    def test_latest_ranks_semver_then_build_number(self):
+        names = ["1.0.0-rc.2", "1.0.0-rc.10", "0.9.0", "1.0.0+build.3"]
+        index = GitTagIndex(self.folder)
+        self.assertEqual(index.latest(lambda: names), "1.0.0+build.3")
+        index.update(names + ["1.0.0+build.12", "not-a-version"])
+        self.assertEqual(index.latest(lambda: []), "1.0.0+build.12")
+        index.update(["1.0.0-rc.2", "1.0.0-rc.10", "not-a-version"])
+        self.assertEqual(index.latest(lambda: []), "1.0.0-rc.10")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,263 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_github_client.py
+
+This file declares the GithubClientTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pythoneda.shared.git import (
+    GitTag,
+    GithubClient,
+    GithubRateLimiter,
+)
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+class GithubStandIn(BaseHTTPRequestHandler):
+    """
+    A local stand-in for GitHub's API, answering with scripted responses.
+    """
+
+    responses = []
+
+    requests = []
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = self.rfile.read(length) if length else b""
+        self.__class__.requests.append((self.command, self.path, self.headers, body))
+        (status, headers, payload) = (200, {}, [])
+        if self.__class__.responses:
+            (status, headers, payload) = self.__class__.responses.pop(0)
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _answer
+
+    do_POST = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GithubClientTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks the GitHub client against a local stand-in server.
+
+    Class name: GithubClientTests
+
+    Responsibilities:
+        - Checks cached responses are revalidated with their ETag.
+        - Checks rate-limited requests wait and are retried.
+        - Checks requests are spread across the configured tokens.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubClient: The class under test.
+        - pythoneda.shared.git.GithubRateLimiter: Paces the requests.
+        - pythoneda.shared.git.GitTag: Looks up tags through the client.
+    """
+
+    def setUp(self):
+        GithubStandIn.responses = []
+        GithubStandIn.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GithubStandIn)
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._cache = tempfile.TemporaryDirectory()
+        self._api_url = GithubClient.api_url()
+        GithubClient.set_api_url(self.url)
+        GithubClient.set_cache_folder(self._cache.name)
+        GithubClient.set_tokens([])
+        GithubClient._singleton = None
+        GithubRateLimiter._singleton = None
+
+    def tearDown(self):
+        GithubClient.instance().close()
+        GithubClient._singleton = None
+        GithubRateLimiter._singleton = None
+        GithubClient.set_api_url(self._api_url)
+        GithubClient.set_cache_folder(None)
+        GithubClient.set_tokens([])
+        self.server.shutdown()
+        self.server.server_close()
+        self._cache.cleanup()
+
+    @staticmethod
+    def metered(remaining: int = 100, **headers) -> dict:
+        return dict(
+            {
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            },
+            **headers,
+        )
+
+    def authorizations(self):
+        return [headers.get("Authorization") for (_, _, headers, _) in self.requests]
+
+    @property
+    def requests(self):
+        return GithubStandIn.requests
+
+    async def test_pages_are_followed_and_revalidated(self):
+        tags = [
+            {"name": "1.0.0", "commit": {"sha": "a"}},
+            {"name": "1.1.0", "commit": {"sha": "b"}},
+        ]
+        link = f'<{self.url}/repos/o/r/tags?per_page=100&page=2>; rel="next"'
+        GithubStandIn.responses = [
+            (200, self.metered(ETag='"one"', Link=link), tags[:1]),
+            (
+                200,
+                self.metered(ETag='"two"'),
+                tags[1:] + [{"name": "x", "commit": {"sha": "a"}}],
+            ),
+            (304, self.metered(ETag='"one"'), None),
+            (304, self.metered(ETag='"two"'), None),
+        ]
+        self.assertEqual(
+            str(await GitTag.fetch_latest_github_tag("t", "o", "r", "a")), "1.0.0"
+        )
+        self.assertEqual(
+            str(await GitTag.fetch_latest_github_tag("t", "o", "r", "b")), "1.1.0"
+        )
+        self.assertEqual(len(self.requests), 4)
+        self.assertEqual(
+            [headers.get("If-None-Match") for (_, _, headers, _) in self.requests],
+            [None, None, '"one"', '"two"'],
+        )
+        self.assertEqual(self.authorizations(), ["token t"] * 4)
+
+    async def test_retry_after_waits_and_retries(self):
+        GithubStandIn.responses = [
+            (429, {"Retry-After": "0.3"}, {"message": "slow down"}),
+            (200, self.metered(), {"ok": True}),
+        ]
+        started = time.monotonic()
+        (body, _) = await GithubClient.instance().get(self.url + "/rate", "t")
+        self.assertEqual(body, {"ok": True})
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(GithubRateLimiter.instance().metrics()["secondary_limited"], 1)
+
+    async def test_secondary_limit_waits_and_retries(self):
+        GithubStandIn.responses = [
+            (
+                403,
+                self.metered(),
+                {"message": "You have exceeded a secondary rate limit."},
+            ),
+            (200, self.metered(), {"ok": True}),
+        ]
+        started = time.monotonic()
+        with mock.patch.object(GithubRateLimiter, "SECONDARY_WAIT", 0.3):
+            (body, _) = await GithubClient.instance().get(self.url + "/rate", "t")
+        self.assertEqual(body, {"ok": True})
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertEqual(GithubRateLimiter.instance().metrics()["secondary_limited"], 1)
+
+    async def test_graphql_rate_limited_waits_for_the_reset(self):
+        reset = time.time() + 0.4
+        GithubStandIn.responses = [
+            (
+                200,
+                {
+                    "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Remaining": "10",
+                    "X-RateLimit-Reset": repr(reset),
+                },
+                {"data": None, "errors": [{"type": "RATE_LIMITED"}]},
+            ),
+            (200, self.metered(), {"data": {"viewer": {"login": "a"}}}),
+        ]
+        result = await GithubClient.instance().graphql("{ viewer { login } }", "t")
+        self.assertEqual(result["data"], {"viewer": {"login": "a"}})
+        self.assertGreaterEqual(time.time(), reset)
+        self.assertEqual(self.authorizations(), ["bearer t"] * 2)
+        self.assertEqual(GithubRateLimiter.instance().metrics()["primary_limited"], 1)
+
+    async def test_requests_are_spread_across_tokens(self):
+        GithubClient.set_tokens(["first", "second"])
+        GithubStandIn.responses = [
+            (200, self.metered(remaining=0), {"n": 1}),
+            (200, self.metered(), {"n": 2}),
+            (200, self.metered(), {"n": 3}),
+        ]
+        client = GithubClient.instance()
+        await client.get(self.url + "/a")
+        await client.get(self.url + "/b")
+        await client.get(self.url + "/c")
+        # the first token ran out, so the others went with the second one
+        self.assertEqual(
+            self.authorizations(),
+            ["token first", "token second", "token second"],
+        )
+
+    async def test_waiting_does_not_block_the_event_loop(self):
+        GithubStandIn.responses = [
+            (429, {"Retry-After": "0.5"}, {"message": "slow down"}),
+            (200, self.metered(), {"ok": True}),
+        ]
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        ticker = asyncio.get_running_loop().create_task(tick())
+        try:
+            await GithubClient.instance().get(self.url + "/rate", "t")
+        finally:
+            ticker.cancel()
+        self.assertGreater(len(ticks), 5)
+
+    def test_latest_github_tag_from_synchronous_code(self):
+        GithubStandIn.responses = [
+            (200, self.metered(), [{"name": "2.0.0", "commit": {"sha": "c"}}])
+        ]
+        self.assertEqual(str(GitTag.latest_github_tag("t", "o", "r", "c")), "2.0.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
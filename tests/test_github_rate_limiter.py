@@ -0,0 +1,152 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_github_rate_limiter.py
+
+This file declares the GithubRateLimiterTests class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-git/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.git import GitMetrics, GithubRateLimiter, GithubTokenBudget
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+class GithubRateLimiterTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Checks requests are paced within the budget of each token.
+
+    Class name: GithubRateLimiterTests
+
+    Responsibilities:
+        - Checks the token bucket paces requests.
+        - Checks a single request probes an unknown budget, and that giving it
+          back wakes up the waiting ones.
+
+    Collaborators:
+        - pythoneda.shared.git.GithubRateLimiter: The class under test.
+        - pythoneda.shared.git.GithubTokenBudget: The budget of each token.
+    """
+
+    def setUp(self):
+        self.limiter = GithubRateLimiter()
+
+    async def test_requests_are_paced(self):
+        with mock.patch.object(GithubTokenBudget, "BURST", 1.0), mock.patch.object(
+            GithubTokenBudget, "RATE", 20.0
+        ):
+            self.limiter.budget("t").unmetered()
+            started = time.monotonic()
+            for _ in range(5):
+                self.assertEqual(await self.limiter.acquire(["t"]), "t")
+            elapsed = time.monotonic() - started
+        # one request at once, then one every 50ms
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertEqual(self.limiter.metrics()["waits"], 4)
+
+    async def test_a_single_request_probes_an_unknown_budget(self):
+        self.assertEqual(await self.limiter.acquire(["t"]), "t")
+        second = asyncio.get_running_loop().create_task(self.limiter.acquire(["t"]))
+        await asyncio.sleep(0.1)
+        self.assertFalse(second.done())
+        # the probe got no answer: the next request takes its place
+        self.limiter.release("t")
+        self.assertEqual(await asyncio.wait_for(second, 0.5), "t")
+
+    async def test_an_answer_ends_the_probe(self):
+        await self.limiter.acquire(["t"])
+        second = asyncio.get_running_loop().create_task(self.limiter.acquire(["t"]))
+        await asyncio.sleep(0.05)
+        headers = {
+            "X-RateLimit-Limit": "60",
+            "X-RateLimit-Remaining": "59",
+            "X-RateLimit-Reset": str(time.time() + 3600),
+        }
+        # answered from another thread, as requests are
+        threading.Thread(
+            target=self.limiter.update, args=("t", "core", 200, headers)
+        ).start()
+        self.assertEqual(await asyncio.wait_for(second, 0.5), "t")
+        self.assertEqual(self.limiter.budget("t").remaining, 58)
+
+    def test_acquire_blocking(self):
+        self.assertEqual(self.limiter.acquire_blocking(["t"]), "t")
+        threading.Timer(0.1, self.limiter.release, args=("t",)).start()
+        started = time.monotonic()
+        self.assertEqual(self.limiter.acquire_blocking(["t"]), "t")
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    async def test_exhausted_tokens_are_skipped(self):
+        self.limiter.update(
+            "first",
+            "core",
+            200,
+            {
+                "X-RateLimit-Limit": "60",
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(time.time() + 3600),
+            },
+        )
+        self.limiter.budget("second").unmetered()
+        for _ in range(3):
+            self.assertEqual(await self.limiter.acquire(["first", "second"]), "second")
+
+    async def test_metrics_are_labelled_by_token_and_resource(self):
+        await self.limiter.acquire(["secret"])
+        self.limiter.update(
+            "secret",
+            "graphql",
+            200,
+            {
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "4999",
+                "X-RateLimit-Reset": str(time.time() + 3600),
+            },
+        )
+        label = GithubRateLimiter.label("secret")
+        self.assertIn(
+            ({"token": label, "resource": "core"}, 1),
+            self.limiter.metrics()["requests"],
+        )
+        with mock.patch.object(GithubRateLimiter, "_singleton", self.limiter):
+            text = GitMetrics.instance().prometheus()
+        self.assertNotIn("secret", text)
+        self.assertEqual(text.count("# TYPE pythoneda_git_github_remaining gauge"), 1)
+        self.assertIn(
+            f'pythoneda_git_github_remaining{{resource="graphql",token="{label}"}} '
+            "4999\n",
+            text,
+        )
+        self.assertIn(
+            f'pythoneda_git_github_requests{{resource="core",token="{label}"}} 1\n',
+            text,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End: